@@ -1,8 +1,4 @@
 from supabase_client import supabase
-import time
-import uuid
-
-timestamp = int(time.time())
 
 # Sample LTK products with realistic data
 test_products = [
@@ -12,8 +8,8 @@ test_products = [
         "price": 198.00,
         "image_url": "https://placehold.co/800x1000/png?text=AGOLDE+Jeans",
         "image": "https://placehold.co/800x1000/png?text=AGOLDE+Jeans",
-        "affiliate_link": f"https://www.shopltk.com/explore/item/agolde-90s-pinch-waist-high-waist-straight-leg-jeans?id={uuid.uuid4()}",
-        "url": f"https://www.shopltk.com/explore/item/agolde-90s-pinch-waist-high-waist-straight-leg-jeans?id={uuid.uuid4()}",
+        "affiliate_link": "https://www.shopltk.com/explore/item/agolde-90s-pinch-waist-high-waist-straight-leg-jeans",
+        "url": "https://www.shopltk.com/explore/item/agolde-90s-pinch-waist-high-waist-straight-leg-jeans",
         "brand": "AGOLDE",
         "category": "Denim",
         "description": "The perfect vintage-inspired high-rise straight leg jeans",
@@ -26,8 +22,8 @@ test_products = [
         "price": 118.00,
         "image_url": "https://placehold.co/800x1000/png?text=Lululemon+Jacket",
         "image": "https://placehold.co/800x1000/png?text=Lululemon+Jacket",
-        "affiliate_link": f"https://www.shopltk.com/explore/item/lululemon-define-jacket?id={uuid.uuid4()}",
-        "url": f"https://www.shopltk.com/explore/item/lululemon-define-jacket?id={uuid.uuid4()}",
+        "affiliate_link": "https://www.shopltk.com/explore/item/lululemon-define-jacket",
+        "url": "https://www.shopltk.com/explore/item/lululemon-define-jacket",
         "brand": "Lululemon",
         "category": "Activewear",
         "description": "Slim-fit running jacket with thumbholes",
@@ -40,8 +36,8 @@ test_products = [
         "price": 30.00,
         "image_url": "https://placehold.co/800x1000/png?text=Olaplex+No.3",
         "image": "https://placehold.co/800x1000/png?text=Olaplex+No.3",
-        "affiliate_link": f"https://www.shopltk.com/explore/item/olaplex-no-3-hair-perfector?id={uuid.uuid4()}",
-        "url": f"https://www.shopltk.com/explore/item/olaplex-no-3-hair-perfector?id={uuid.uuid4()}",
+        "affiliate_link": "https://www.shopltk.com/explore/item/olaplex-no-3-hair-perfector",
+        "url": "https://www.shopltk.com/explore/item/olaplex-no-3-hair-perfector",
         "brand": "Olaplex",
         "category": "Beauty",
         "description": "Weekly at-home treatment that reduces breakage and strengthens hair",
@@ -54,12 +50,9 @@ def add_test_products():
     try:
         print("🔄 Adding test products to database...")
         
-        # First, delete existing products to avoid conflicts
-        supabase.table("products").delete().neq("id", 0).execute()
-        print("✅ Cleared existing products")
-        
+        # Upsert on url: reruns update the same rows instead of clearing the table
+        supabase.table("products").upsert(test_products, on_conflict="url").execute()
         for product in test_products:
-            response = supabase.table("products").insert(product).execute()
             print(f"✅ Added product: {product['title']}")
         
         print("\n✨ All test products added successfully!")
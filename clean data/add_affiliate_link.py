@@ -6,8 +6,10 @@ import pandas as pd
 
 
 def add_affiliate_link_column(filename: str) -> pd.DataFrame:
-    df = pd.read_csv(filename)
+    return add_affiliate_link_to_frame(pd.read_csv(filename))
 
+
+def add_affiliate_link_to_frame(df: pd.DataFrame) -> pd.DataFrame:
     # Ensure url column exists; if not, create empty so affiliate_link can be placed consistently
     if 'url' not in df.columns:
         df['url'] = ''
@@ -40,7 +42,6 @@ def process_files(filepaths: List[str], output_dir: str | None, in_place: bool,
             print(f"⚠️  Skipping missing file: {path}")
             continue
 
-        original_df = pd.read_csv(path)
         updated_df = add_affiliate_link_column(path)
 
         # Determine write target
@@ -0,0 +1,12 @@
+-- Prepare the products table for idempotent uploads (catalog_loader.py --mode upsert)
+-- Run this in your Supabase SQL Editor
+
+-- 1. Upserts resolve conflicts on url, which needs a unique index.
+--    If this fails because of existing duplicates, remove them first by
+--    keeping the oldest row per url:
+--    DELETE FROM products a USING products b WHERE a.url = b.url AND a.id > b.id;
+CREATE UNIQUE INDEX IF NOT EXISTS products_url_key ON products(url);
+
+-- 2. Hash of each row's content, so unchanged rows are never rewritten
+ALTER TABLE products ADD COLUMN IF NOT EXISTS content_hash TEXT;
+CREATE INDEX IF NOT EXISTS idx_products_content_hash ON products(content_hash);
@@ -0,0 +1,200 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import pandas as pd
+
+from data_cleaner import extract_products, extract_products_rowwise, format_cleaned_frame
+from revolve_data_cleaner import build_revolve_frame, finalize_revolve_frame
+from streaming import peak_memory_mb
+from synthetic_exports import generate_export
+
+DEFAULT_SIZES = [10_000, 100_000]
+SUITE_CLEANERS = ['clean_data', 'clean_revolve_data']
+
+
+def replicate(df: pd.DataFrame, rows: int) -> pd.DataFrame:
+    """Repeat a scrape export until it has at least `rows` rows"""
+    copies = max(1, -(-rows // len(df)))
+    return pd.concat([df] * copies, ignore_index=True).iloc[:rows]
+
+
+def time_extractor(extractor, df: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    extractor(df)
+    return time.perf_counter() - start
+
+
+def benchmark_clean_data(input_file: str, rows: int) -> None:
+    df = replicate(pd.read_csv(input_file), rows)
+    print(f"📊 Benchmarking clean_data on {len(df)} rows from {input_file}")
+
+    rowwise = extract_products_rowwise(df)
+    columnar = extract_products(df)
+    same = (
+        format_cleaned_frame(rowwise, current_time='').to_csv(index=False)
+        == format_cleaned_frame(columnar, current_time='').to_csv(index=False)
+    )
+    print(f"{'✅' if same else '❌'} Row-wise and columnar output identical: {same}")
+
+    for label, extractor in [('row-wise', extract_products_rowwise), ('columnar', extract_products)]:
+        elapsed = time_extractor(extractor, df)
+        print(f"  {label:<9} {elapsed:8.3f}s  {len(df) / elapsed:>12,.0f} rows/s")
+
+
+def run_stages(stages, value):
+    """Run (name, function) stages in order, timing each one"""
+    timings = {}
+    for name, stage in stages:
+        start = time.perf_counter()
+        value = stage(value)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def benchmark_case(cleaner, input_file, output_file):
+    """
+    Time one cleaner on one export, stage by stage.
+
+    Mirrors clean_data and clean_revolve_data so each stage can be timed.
+    Runs in its own process so peak RSS belongs to this case alone.
+    """
+    source = {}
+
+    def read(path):
+        df = pd.read_csv(path)
+        source['rows'] = len(df)
+        return df
+
+    if cleaner == 'clean_data':
+        stages = [
+            ('read', read),
+            ('extract', extract_products),
+            ('format', format_cleaned_frame),
+            ('write', lambda df: df.to_csv(output_file, index=False)),
+        ]
+    else:
+        stages = [
+            ('read', read),
+            ('build', lambda df: build_revolve_frame(df)),
+            ('dedupe', lambda df: df.drop_duplicates(subset=['brand', 'name'])),
+            ('finalize', finalize_revolve_frame),
+            ('write', lambda df: df.to_csv(output_file, index=False)),
+        ]
+
+    timings = run_stages(stages, input_file)
+    total = sum(timings.values())
+    return {
+        'cleaner': cleaner,
+        'rows': source['rows'],
+        'seconds': total,
+        'rows_per_s': source['rows'] / total,
+        'peak_rss_mb': peak_memory_mb(),
+        'stages': timings,
+    }
+
+
+def synthetic_export(cleaner, rows, data_dir, seed):
+    """Path of a cached synthetic export, generating it on first use"""
+    kind = 'products' if cleaner == 'clean_data' else 'revolve'
+    path = os.path.join(data_dir, f"synthetic_{kind}_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        print(f"🧪 Generating {rows} {kind} rows -> {path}")
+        generate_export(kind, path, rows, seed=seed)
+    return path
+
+
+def run_suite(sizes, data_dir, seed=0):
+    """Benchmark clean_data and clean_revolve_data on synthetic exports of each size"""
+    os.makedirs(data_dir, exist_ok=True)
+    # A fresh interpreter per case, so one case's memory does not count against the next
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for rows in sizes:
+        for cleaner in SUITE_CLEANERS:
+            input_file = synthetic_export(cleaner, rows, data_dir, seed)
+            output_file = os.path.join(data_dir, f"cleaned_{cleaner}_{rows}.csv")
+            with context.Pool(1) as pool:
+                result = pool.apply(benchmark_case, (cleaner, input_file, output_file))
+            results.append(result)
+
+            stages = '  '.join(f"{name} {seconds:.2f}s" for name, seconds in result['stages'].items())
+            print(f"  {cleaner:<18} {rows:>10,} rows  {result['rows_per_s']:>10,.0f} rows/s  "
+                  f"peak {result['peak_rss_mb']:>7,.0f} MB  | {stages}")
+    return results
+
+
+def find_regressions(results, baseline, max_regression):
+    """Cases whose rows/s fell more than `max_regression` below the baseline run"""
+    previous = {(case['cleaner'], case['rows']): case for case in baseline}
+    regressions = []
+    for case in results:
+        before = previous.get((case['cleaner'], case['rows']))
+        if before and case['rows_per_s'] < before['rows_per_s'] * (1 - max_regression):
+            regressions.append((case, before))
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure cleaner throughput in rows/s.")
+    parser.add_argument(
+        "--input",
+        default="Dupes I like - Sheet2.csv",
+        help="Scrape export to replicate for the benchmark.",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=100_000,
+        help="Number of rows to benchmark with.",
+    )
+    parser.add_argument(
+        "--suite",
+        action="store_true",
+        help="Benchmark clean_data and clean_revolve_data on synthetic exports instead.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs='+',
+        default=DEFAULT_SIZES,
+        help="Export sizes in rows for --suite, e.g. 10000 100000 1000000 10000000.",
+    )
+    parser.add_argument("--data-dir", default="benchmark_data", help="Where synthetic exports are cached.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic exports.")
+    parser.add_argument("--json", help="Write suite results to this JSON file.")
+    parser.add_argument("--baseline", help="Earlier --json results to compare against.")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Fail if rows/s drops by more than this fraction against --baseline (default: 0.2).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.suite:
+        benchmark_clean_data(args.input, args.rows)
+        sys.exit(0)
+
+    print(f"📊 Benchmarking cleaners on synthetic exports of {', '.join(f'{n:,}' for n in args.sizes)} rows")
+    results = run_suite(args.sizes, args.data_dir, args.seed)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.max_regression)
+        for case, before in regressions:
+            print(f"❌ {case['cleaner']} at {case['rows']:,} rows: {case['rows_per_s']:,.0f} rows/s "
+                  f"vs {before['rows_per_s']:,.0f} in {args.baseline}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No cleaner slowed down by more than {args.max_regression:.0%}")
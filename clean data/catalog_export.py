@@ -0,0 +1,247 @@
+import argparse
+import csv
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from catalog_loader import (
+    DEFAULT_KEY_ENV,
+    DEFAULT_TABLE,
+    PAGE_SIZE,
+    key_range,
+    keyset_pages,
+    shared_session,
+    supabase_credentials,
+    with_retries,
+)
+from catalog_store import pa, pq, require_pyarrow
+from json_payloads import dumps
+
+DEFAULT_WORKERS = 4
+# Copy buffer for stitching part files together
+COPY_BUFFER = 1 << 20
+
+
+class ExportError(Exception):
+    """An export that did not write every row the table holds"""
+
+
+class JsonlSink:
+    """One JSON object per line"""
+
+    def __init__(self, path, columns, key, header=True):
+        self.file = open(path, 'wb')
+
+    def write(self, rows):
+        self.file.write(b''.join(dumps(row) + b'\n' for row in rows))
+
+    def append(self, part):
+        with open(part, 'rb') as source:
+            shutil.copyfileobj(source, self.file, COPY_BUFFER)
+
+    def close(self):
+        self.file.close()
+
+
+class CsvSink(JsonlSink):
+    """CSV in projection order, nulls as empty cells as in the cleaned catalogs; parts carry no header"""
+
+    def __init__(self, path, columns, key, header=True):
+        self.columns = columns
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        if header:
+            self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows([row.get(col) for col in self.columns] for row in rows)
+
+    def append(self, part):
+        self.file.flush()
+        with open(part, 'rb') as source:
+            shutil.copyfileobj(source, self.file.buffer, COPY_BUFFER)
+
+
+class ParquetSink:
+    """Parquet with one row group per page: the key as int64 and every other column as text, as the API returns them"""
+
+    def __init__(self, path, columns, key, header=True):
+        require_pyarrow()
+        self.schema = pa.schema([(col, pa.int64() if col == key else pa.string()) for col in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        columns = {}
+        for field in self.schema:
+            values = [row.get(field.name) for row in rows]
+            if field.type == pa.string():
+                values = [value if value is None or isinstance(value, str) else dumps(value).decode() for value in values]
+            columns[field.name] = values
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+
+    def append(self, part):
+        for batch in pq.ParquetFile(part).iter_batches():
+            self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+
+
+SINKS = {
+    '.jsonl': JsonlSink,
+    '.csv': CsvSink,
+    '.parquet': ParquetSink,
+}
+
+
+def sink_class(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise SystemExit(f"❌ Output must end in {', '.join(SINKS)}")
+    return SINKS[extension]
+
+
+def key_bounds(session, table=DEFAULT_TABLE, key='id'):
+    """Smallest and largest key in the table, or None when it is empty"""
+    ends = []
+    for direction in ('asc', 'desc'):
+        rows = with_retries(lambda: session.select(table, key, order=f'{key}.{direction}', limit=1))
+        if not rows:
+            return None
+        ends.append(rows[0][key])
+    return tuple(ends)
+
+
+def key_ranges(low, high, parts):
+    """Split the keys low..high into up to `parts` (after, until] ranges of equal width"""
+    span = high - low + 1
+    parts = max(min(parts, span), 1)
+    edges = [low - 1 + span * i // parts for i in range(parts + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def export_range(session, sink, table, columns, key, after, until, page_size):
+    """
+    Stream one key range into a sink, a page at a time; returns the number of rows.
+
+    The rows written are checked against the table's exact count for the
+    range, so a short read (or rows written to the range meanwhile) raises
+    ExportError instead of leaving a silently incomplete export.
+    """
+    rows = 0
+    for page in keyset_pages(session, table, ','.join(columns), key, page_size, after, until):
+        sink.write(page)
+        rows += len(page)
+    expected = with_retries(lambda: session.count(table, key_range(key, after, until)))
+    if rows != expected:
+        raise ExportError(f"{key} {after + 1}..{until}: wrote {rows} rows but {table} holds {expected}")
+    return rows
+
+
+def export_table(session, path, table=DEFAULT_TABLE, columns=('*',), key='id', workers=DEFAULT_WORKERS,
+                 page_size=PAGE_SIZE):
+    """
+    Export a table to JSONL, CSV or Parquet, chosen by the output's extension.
+
+    The key range present when the export starts is split into `workers`
+    ranges, each walked with keyset pagination on `key` by its own thread
+    into its own part file; the parts are then appended in key order, so
+    the output is sorted by key. Memory holds one page per worker
+    whatever the table size. Rows added above the starting range during
+    the export are not included. Returns the number of rows written;
+    raises ExportError, leaving no output, when a range's rows do not
+    match its exact count.
+    """
+    columns = list(columns)
+    if columns != ['*'] and key not in columns:
+        columns.insert(0, key)
+    if columns == ['*']:
+        # A projection the sinks can lay out; probe one row for the table's columns
+        sample = with_retries(lambda: session.select(table, limit=1))
+        columns = list(sample[0]) if sample else [key]
+    sink = sink_class(path)
+
+    bounds = key_bounds(session, table, key)
+    ranges = key_ranges(*bounds, workers) if bounds else []
+    start = time.perf_counter()
+    if len(ranges) <= 1:
+        output = sink(path, columns, key)
+        try:
+            total = sum(export_range(session, output, table, columns, key, after, until, page_size) for after, until in ranges)
+        except BaseException:
+            output.close()
+            os.remove(path)
+            raise
+        output.close()
+    else:
+        session.reserve(len(ranges))
+        parts = [f"{path}.part{i}" for i in range(len(ranges))]
+
+        def run(i):
+            part = sink(parts[i], columns, key, header=False)
+            try:
+                rows = export_range(session, part, table, columns, key, *ranges[i], page_size)
+            finally:
+                part.close()
+            print(f"✅ Range {i + 1}/{len(ranges)} ({key} {ranges[i][0] + 1}..{ranges[i][1]}): {rows} rows")
+            return rows
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                total = sum(executor.map(run, range(len(ranges))))
+            output = sink(path, columns, key)
+            try:
+                for part in parts:
+                    output.append(part)
+            finally:
+                output.close()
+        finally:
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
+
+    elapsed = time.perf_counter() - start
+    print(f"🎉 Exported {total} rows of {table} to {path} in {elapsed:.1f}s "
+          f"({total / elapsed if elapsed else 0:.0f} rows/s, {session.requests_sent} requests)")
+    return total
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream a Supabase table to JSONL, CSV or Parquet with keyset pagination.")
+    parser.add_argument("output_file", help=f"Output path ending in {', '.join(SINKS)}.")
+    parser.add_argument("--table", default=DEFAULT_TABLE, help=f"Table to export (default: {DEFAULT_TABLE}).")
+    parser.add_argument("--columns", default='*', help="Comma-separated columns to export (default: all).")
+    parser.add_argument("--key", default='id', help="Unique, indexed integer column to paginate on (default: id).")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Key ranges exported in parallel (default: {DEFAULT_WORKERS}).",
+    )
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help=f"Rows per request (default: {PAGE_SIZE}).")
+    parser.add_argument("--key-env", default=DEFAULT_KEY_ENV, help=f"Environment variable holding the API key (default: {DEFAULT_KEY_ENV}).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sink_class(args.output_file)
+    url, key = supabase_credentials(args.key_env)
+    if not url or not key:
+        print("❌ Error: Missing Supabase credentials!")
+        print(f"Please set SUPABASE_URL and {args.key_env} environment variables")
+        raise SystemExit(1)
+    try:
+        export_table(
+            shared_session(url, key),
+            args.output_file,
+            args.table,
+            args.columns.split(','),
+            args.key,
+            args.workers,
+            args.page_size,
+        )
+    except ExportError as error:
+        print(f"❌ Export incomplete, nothing written: {error}")
+        raise SystemExit(1)
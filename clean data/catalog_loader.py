@@ -0,0 +1,949 @@
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # pragma: no cover - credentials then come from the environment only
+    load_dotenv = None
+
+from catalog_store import is_catalog_file, read_catalog_frame
+from json_payloads import MIN_COMPRESS_SIZE, column_records, compress, decompress, dumps, loads
+from upload_journal import DEFAULT_JOURNAL_FILE, UploadJournal, file_fingerprint
+from upload_metrics import DEFAULT_INTERVAL, DEFAULT_METRICS_FILE, DEFAULT_SUMMARY_FILE, UploadMetrics
+from url_index import DEFAULT_INDEX_FILE, UrlIndex, collapse_url_variants
+
+REST_PATH = '/rest/v1/'
+DEFAULT_TABLE = 'products'
+DEFAULT_KEY_ENV = 'SUPABASE_SERVICE_KEY'
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+# Seconds per insert request the batch size is tuned towards
+TARGET_LATENCY = 2.0
+DEFAULT_REJECT_FILE = 'upload_rejects.jsonl'
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 60
+# Batch requests in flight at once; 1 keeps the upload sequential
+DEFAULT_CONCURRENCY = 1
+
+# Replies worth retrying: the same request may well succeed a little later
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+# Free-text columns whose line breaks are flattened before upload
+TEXT_COLUMNS = ['name', 'title', 'description']
+# Longest value each VARCHAR column of the products table takes (create_products_table.sql)
+COLUMN_LIMITS = {'brand': 255, 'price': 50, 'category': 255, 'source': 255, 'color': 255}
+
+# insert sends every row; upsert sends only new or changed rows, keyed on CONFLICT_COLUMN
+LOAD_MODES = ['insert', 'upsert']
+CONFLICT_COLUMN = 'url'
+HASH_COLUMN = 'content_hash'
+# Columns that do not count as product content when hashing a row
+NON_CONTENT_COLUMNS = ['id', 'created_at', 'updated_at', HASH_COLUMN]
+# Hashes per lookup request, keeping the query well inside common URL length limits
+HASH_LOOKUP_SIZE = 300
+# Rows per page when walking a table by key; at most PostgREST's default max-rows, which caps every reply
+PAGE_SIZE = 1000
+
+# What each upload script loads; the scripts themselves are thin wrappers
+PRESETS = {
+    'all': {'files': ['cleaned_products.csv', 'cleaned_revolve_products.csv'], 'key_env': 'SUPABASE_SERVICE_KEY'},
+    'products': {'files': ['cleaned_products.csv'], 'key_env': 'SUPABASE_ANON_KEY'},
+    'revolve': {'files': ['cleaned_revolve_products.csv'], 'key_env': 'SUPABASE_ANON_KEY'},
+}
+
+# PostgREST/Postgres codes for a schema problem (unknown column or table), not a bad row
+SCHEMA_ERROR_CODES = {'PGRST204', 'PGRST205', '42703', '42P01'}
+
+# Errors from a keep-alive connection the server has already closed
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+# Replies to a gzipped body from a server that cannot read one: 415 Unsupported Media Type, or
+# PostgREST's invalid-body error; any other 400 is about the rows and says nothing about gzip
+GZIP_REFUSED_STATUS = 415
+GZIP_REFUSED_CODES = {'PGRST102'}
+
+
+class LoaderError(Exception):
+    """A PostgREST request that came back with an error status"""
+
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        super().__init__(f"HTTP {status}: {body[:500]}")
+
+
+class RestSession:
+    """
+    Pooled keep-alive connections to one Supabase PostgREST endpoint.
+
+    Every request borrows an idle connection and hands it back afterwards,
+    so a load pays one TLS handshake per connection rather than one per
+    batch or per file. Up to `pool_size` idle connections are kept; safe to
+    share between threads.
+
+    With `compress`, request bodies are gzipped until the server shows it
+    cannot read them, after which they go plain; replies are asked for
+    gzipped too.
+    """
+
+    def __init__(self, base_url, api_key, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, compress=True):
+        parts = urlsplit(base_url.rstrip('/'))
+        self.connection_class = http.client.HTTPConnection if parts.scheme == 'http' else http.client.HTTPSConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path + REST_PATH
+        self.timeout = timeout
+        self.headers = {
+            'apikey': api_key,
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip',
+        }
+        # None until the first compressed body shows whether the server takes gzip
+        self.gzip_accepted = None if compress else False
+        self.pool_size = pool_size
+        self.idle = []
+        self.lock = threading.Lock()
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    def reserve(self, connections):
+        """Keep at least this many idle connections, e.g. one per concurrent request"""
+        with self.lock:
+            self.pool_size = max(self.pool_size, connections)
+
+    def _connect(self):
+        with self.lock:
+            self.connections_opened += 1
+        return self.connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        """An idle connection and True, or a new one and False"""
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return self._connect(), False
+
+    def _release(self, connection, response):
+        with self.lock:
+            self.requests_sent += 1
+            if not response.will_close and len(self.idle) < self.pool_size:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Send one request on a pooled connection.
+
+        Returns the status, the response headers and the body, decompressed.
+        A reused connection that the server closed while idle is replaced
+        once.
+        """
+        headers = {**self.headers, **(headers or {})}
+        connection, reused = self._acquire()
+
+        while True:
+            try:
+                connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = decompress(response.read(), response.headers.get('Content-Encoding'))
+                break
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = self._connect(), False
+            except BaseException:
+                connection.close()
+                raise
+
+        self._release(connection, response)
+        return response.status, response.headers, data
+
+    def send(self, method, path, body=None, headers=None):
+        """
+        request(), with the body gzipped when the server takes it.
+
+        Until a compressed body has gone through, a reply saying the body
+        could not be read (415, or PostgREST's invalid-body error) is
+        retried plain; if the plain body is accepted, the server cannot
+        read gzip and later bodies are sent plain. Other refusals, such as
+        a row breaking a constraint, are returned as they are and leave
+        the question open.
+        """
+        if body is None or len(body) < MIN_COMPRESS_SIZE or self.gzip_accepted is False:
+            return self.request(method, path, body, headers)
+        reply = self.request(method, path, compress(body), {**(headers or {}), 'Content-Encoding': 'gzip'})
+        if self.gzip_accepted is None:
+            if reply[0] < 400:
+                self.gzip_accepted = True
+            elif gzip_refused(*reply):
+                reply = self.request(method, path, body, headers)
+                if reply[0] < 400:
+                    self.gzip_accepted = False
+        return reply
+
+    def json_request(self, method, path, payload=None, params=None, headers=None):
+        """
+        Send JSON, raise LoaderError on an error status and decode the JSON reply, if any.
+
+        `payload` may also be JSON already encoded to bytes.
+        """
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        body = payload if payload is None or isinstance(payload, bytes) else dumps(payload)
+        status, response_headers, data = self.send(method, path, body, headers)
+        if status >= 400:
+            raise LoaderError(status, data.decode('utf-8', 'replace'), response_headers)
+        return loads(data) if data else None
+
+    def insert(self, table, records):
+        """Insert a list of rows in one request, without echoing them back"""
+        return self.json_request('POST', table, records, headers={'Prefer': 'return=minimal'})
+
+    def upsert(self, table, records, on_conflict=CONFLICT_COLUMN):
+        """Insert rows, updating the existing row wherever `on_conflict` matches"""
+        return self.json_request(
+            'POST', table, records,
+            params={'on_conflict': on_conflict},
+            headers={'Prefer': 'resolution=merge-duplicates,return=minimal'},
+        )
+
+    def select(self, table, columns='*', **params):
+        """GET rows of a table; extra keyword arguments are PostgREST filters such as limit=1"""
+        return self.json_request('GET', table, params={'select': columns, **params})
+
+    def delete(self, table, **filters):
+        """DELETE the rows matching PostgREST filters such as id='in.(1,2)'"""
+        return self.json_request('DELETE', table, params=filters, headers={'Prefer': 'return=minimal'})
+
+    def count(self, table, params=()):
+        """Exact number of rows matching the PostgREST filter pairs in `params`, without fetching them"""
+        path = f"{table}?{urlencode([('select', '*'), ('limit', 0), *params])}"
+        status, response_headers, data = self.send('GET', path, headers={'Prefer': 'count=exact'})
+        if status >= 400:
+            raise LoaderError(status, data.decode('utf-8', 'replace'), response_headers)
+        total = content_range_total(response_headers.get('Content-Range'))
+        if total is None:
+            raise LoaderError(status, f"no exact count in Content-Range {response_headers.get('Content-Range')!r}",
+                              response_headers)
+        return total
+
+    def rpc(self, function, arguments=None):
+        return self.json_request('POST', f'rpc/{function}', arguments or {})
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+def gzip_refused(status, headers, data):
+    """True when a reply to a gzipped body says the server could not read the body at all"""
+    if status == GZIP_REFUSED_STATUS:
+        return True
+    return status == 400 and error_code(LoaderError(status, data.decode('utf-8', 'replace'))) in GZIP_REFUSED_CODES
+
+
+def content_range_total(header):
+    """The total of a Content-Range header such as 0-999/24000 or */0; None when it is unknown (*)"""
+    total = (header or '').rpartition('/')[2]
+    return int(total) if total.isdigit() else None
+
+
+def supabase_credentials(key_env=DEFAULT_KEY_ENV):
+    """SUPABASE_URL and the key named by `key_env`, from the environment or a .env file"""
+    if load_dotenv is not None:
+        load_dotenv()
+    return os.getenv('SUPABASE_URL'), os.getenv(key_env)
+
+
+@lru_cache(maxsize=None)
+def shared_session(url, key):
+    """One session per endpoint and key for the whole process, so every upload call reuses its connections"""
+    return RestSession(url, key)
+
+
+def read_frame(path):
+    """A cleaned catalog as strings and None: typed catalogs as stored, CSV cells verbatim"""
+    if is_catalog_file(path):
+        return read_catalog_frame(path)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def prepare_frame(df, url_index=None):
+    """
+    Clean a catalog frame for upload.
+
+    Keeps one row per canonical URL, under the real URL `url_index` first
+    saw it as (recording new ones when given), drops the id column so the database assigns it, flattens
+    line breaks in free-text columns and turns empty cells into None.
+    """
+    df = df.copy()
+    # One row per product, whichever tracking or colour variant of its URL was scraped
+    if 'url' in df.columns:
+        df = collapse_url_variants(df, url_index)
+    if 'id' in df.columns:
+        df = df.drop('id', axis=1)
+
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            text = df[col].astype(str).str.replace('\n', ' ').str.replace('\r', ' ').str.strip()
+            df[col] = text.where(df[col].notna(), None)
+
+    df = df.astype(object)
+    return df.where(df.notna() & (df != ''), None)
+
+
+def content_hashes(df):
+    """
+    Stable 64-bit hash (16 hex digits) of every row's content.
+
+    Every column except ids, timestamps and the hash itself is hashed, in
+    sorted column order, so the same content gets the same hash in every
+    run and on every machine.
+    """
+    columns = sorted(col for col in df.columns if col not in NON_CONTENT_COLUMNS)
+    parts = [df[col].astype(object).where(df[col].notna(), '\x00').astype(str) for col in columns]
+    text = parts[0].str.cat(parts[1:], sep='\x1f')
+    return pd.Series(
+        [hashlib.blake2b(row.encode('utf-8'), digest_size=8).hexdigest() for row in text],
+        index=df.index, dtype=object,
+    )
+
+
+def frame_records(df):
+    """Rows of a prepared frame as JSON-ready dicts, with nulls as None"""
+    return column_records(df)
+
+
+class RejectFile:
+    """
+    Dead-letter file of the rows the server refused, one JSON object per line.
+
+    Each line holds the row as sent, its position in the source, the
+    server's status, error code and message, when it was refused and the
+    batch it was refused in (`context`: table, mode, batch number and
+    size), so bad rows can be fixed and resent with replay_rejects.py
+    without rerunning the load. The file is only created once something
+    is rejected.
+    """
+
+    def __init__(self, path=DEFAULT_REJECT_FILE):
+        self.path = path
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def write(self, record, source, position, error, context=None):
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'source': source,
+            'position': position,
+            **(context or {}),
+            'status': error.status,
+            'code': error_code(error),
+            'error': error.body,
+            'row': record,
+        }
+        line = json.dumps(entry, default=str) + '\n'
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self.rows += 1
+
+    def entries(self):
+        """Every complete entry; a line torn by a crash is skipped"""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    def replace(self, entries):
+        """Swap the file's contents for `entries` in one rename; no entries removes the file"""
+        with self.lock:
+            if not entries:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            scratch = f"{self.path}.tmp"
+            with open(scratch, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(entry, default=str) + '\n' for entry in entries)
+            os.replace(scratch, self.path)
+
+
+def error_code(error):
+    """The Postgres or PostgREST error code in an error reply, e.g. 23505, or None"""
+    try:
+        return json.loads(error.body).get('code')
+    except (ValueError, AttributeError):
+        return None
+
+
+def is_row_error(error):
+    """
+    True when a failed insert was refused because of its rows.
+
+    Constraint and type errors come back as 4xx; auth, missing-table and
+    rate-limit replies would fail for any subset of the batch, so
+    splitting the batch cannot isolate anything. Neither can a schema
+    error such as an unknown column.
+    """
+    if not 400 <= error.status < 500 or error.status in (401, 403, 404, 429):
+        return False
+    return error_code(error) not in SCHEMA_ERROR_CODES
+
+
+def is_transient(error):
+    """True for network failures and replies that a later retry may get past"""
+    if isinstance(error, LoaderError):
+        return error.status in RETRY_STATUSES
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+def retry_after_seconds(error):
+    """Seconds the server asked us to wait in a Retry-After header, or None"""
+    value = getattr(error, 'headers', {}).get('Retry-After')
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, error=None):
+    """Retry-After when the server sent one, else capped exponential backoff with jitter"""
+    delay = retry_after_seconds(error)
+    if delay is not None:
+        return delay
+    return min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def with_retries(send, *args, retries=MAX_RETRIES, sleep=time.sleep):
+    """
+    Call `send(*args)`, retrying transient failures up to `retries` times.
+
+    An insert whose reply was lost may have been applied, so a retried
+    insert can come back as a duplicate-key refusal; retried upserts are
+    harmless.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return send(*args)
+        except (LoaderError, OSError, http.client.HTTPException) as error:
+            if attempt == retries or not is_transient(error):
+                raise
+            sleep(backoff_delay(attempt, error))
+
+
+def key_range(key, after=None, until=None):
+    """PostgREST filter pairs for the keys in (after, until]; either end may be open"""
+    bounds = []
+    if after is not None:
+        bounds.append((key, f'gt.{after}'))
+    if until is not None:
+        bounds.append((key, f'lte.{until}'))
+    return bounds
+
+
+def keyset_pages(session, table, columns, key='id', page_size=PAGE_SIZE, after=None, until=None, retries=MAX_RETRIES):
+    """
+    Walk a table in `key` order, one page of rows at a time.
+
+    Each page asks for the rows after the last key of the page before, so
+    every request is an index range scan and deep pages cost the same as
+    the first, unlike offset paging. `after` (exclusive) and `until`
+    (inclusive) bound the key range. `columns` must include `key`.
+
+    The server may return fewer rows than asked for (PostgREST's max-rows
+    caps every reply), so a short page does not mean the end; only an
+    empty one does.
+    """
+    while True:
+        params = [('select', columns), ('order', f'{key}.asc'), ('limit', page_size), *key_range(key, after, until)]
+        rows = with_retries(lambda: session.json_request('GET', table, params=params), retries=retries)
+        if not rows:
+            return
+        yield rows
+        after = rows[-1][key]
+
+
+class CatalogLoader:
+    """
+    Batched inserts into one table over a shared RestSession.
+
+    The batch size adapts to the server: it doubles while requests finish
+    under `target_latency` seconds and halves when they take longer. A
+    batch refused because of its rows is bisected until the bad rows are
+    isolated, costing O(log n) requests per bad row instead of one per
+    row; those rows go to `rejects`. Throttling, 5xx replies and network
+    errors are retried with backoff.
+
+    In 'upsert' mode rows carry a content hash and are written with ON
+    CONFLICT (url) DO UPDATE. Rows whose hash the table already holds are
+    skipped, so a rerun only writes what changed and never duplicates;
+    pass `check_existing=False` when the rows are already known to differ.
+
+    With `concurrency` above 1, up to that many batch requests are in
+    flight at once (see load_records_async).
+
+    With a `journal`, every acknowledged batch of a file is checkpointed;
+    with `resume`, rows a previous run of the same file already got
+    through are skipped.
+
+    URL variants are collapsed against `url_index` (see url_index.py), so
+    a product keeps one real URL across files and runs; without one they
+    are only collapsed within each frame.
+
+    Every stage is timed into `metrics` (see upload_metrics.py): read and
+    transform per file; hash lookups, serialization, each request attempt,
+    the journal ack and the whole batch per batch.
+
+    Counters accumulate across every file and frame loaded, so one loader
+    can report on a whole multi-file run.
+    """
+
+    def __init__(
+        self,
+        session,
+        table=DEFAULT_TABLE,
+        batch_size=DEFAULT_BATCH_SIZE,
+        max_batch_size=MAX_BATCH_SIZE,
+        target_latency=TARGET_LATENCY,
+        rejects=None,
+        concurrency=DEFAULT_CONCURRENCY,
+        ordered_by=None,
+        retries=MAX_RETRIES,
+        mode='insert',
+        check_existing=True,
+        journal=None,
+        resume=False,
+        metrics=None,
+        url_index=None,
+        verbose=True,
+    ):
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode {mode!r}; expected one of {LOAD_MODES}")
+        self.session = session
+        self.table = table
+        self.batch_size = batch_size
+        self.max_batch_size = max(max_batch_size, batch_size)
+        self.target_latency = target_latency
+        self.rejects = rejects if rejects is not None else RejectFile()
+        self.concurrency = max(concurrency, 1)
+        self.ordered_by = ordered_by
+        self.retries = retries
+        self.mode = mode
+        self.check_existing = check_existing
+        self.journal = journal
+        self.resume = resume
+        self.journal_key = None
+        self.metrics = metrics if metrics is not None else UploadMetrics(table)
+        self.metrics.set('concurrency', self.concurrency)
+        self.url_index = url_index
+        self.verbose = verbose
+        self.source = None
+        self.lock = threading.Lock()
+        self.rows_loaded = 0
+        self.rows_failed = 0
+        self.rows_unchanged = 0
+        self.batches = 0
+        self.requests = 0
+        session.reserve(self.concurrency)
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def check_table(self):
+        """Read one row, so bad credentials or a missing table fail before any upload"""
+        return with_retries(lambda: self.session.select(self.table, limit=1), retries=self.retries)
+
+    def adapt_batch_size(self, latency):
+        """Double the batch size after a fast request, halve it after a slow one"""
+        with self.lock:
+            if latency < self.target_latency:
+                self.batch_size = min(self.batch_size * 2, self.max_batch_size)
+            elif latency > self.target_latency:
+                self.batch_size = max(self.batch_size // 2, 1)
+
+    def _insert(self, batch):
+        with self.lock:
+            self.requests += 1
+        with self.metrics.time('serialize'):
+            body = dumps(batch)
+        with_retries(self._send, body, retries=self.retries)
+
+    def _send(self, body):
+        """One request attempt, timed on its own so backoff sleeps never count as request time"""
+        write = self.session.upsert if self.mode == 'upsert' else self.session.insert
+        with self.metrics.time('request'):
+            write(self.table, body)
+
+    def existing_hashes(self, hashes):
+        """The subset of `hashes` already present in the table, looked up in URL-sized chunks"""
+        hashes = list(hashes)
+        found = set()
+        for start in range(0, len(hashes), HASH_LOOKUP_SIZE):
+            chunk = ','.join(hashes[start:start + HASH_LOOKUP_SIZE])
+            with self.lock:
+                self.requests += 1
+            with self.metrics.time('lookup'):
+                rows = with_retries(
+                    lambda: self.session.select(self.table, HASH_COLUMN, **{HASH_COLUMN: f"in.({chunk})"}),
+                    retries=self.retries,
+                )
+            found.update(row[HASH_COLUMN] for row in rows)
+        return found
+
+    def _changed(self, batch, positions):
+        """Drop rows whose content the table already holds"""
+        existing = self.existing_hashes(record[HASH_COLUMN] for record in batch)
+        if not existing:
+            return batch, positions
+        keep = [i for i, record in enumerate(batch) if record[HASH_COLUMN] not in existing]
+        return [batch[i] for i in keep], [positions[i] for i in keep]
+
+    def insert_batch(self, batch, positions):
+        """
+        Insert one batch, isolating any rows the server refuses.
+
+        `positions` are the rows' positions in the source, for the reject
+        file. Returns how many rows were accepted. Safe to call from
+        several threads at once.
+        """
+        with self.lock:
+            self.batches += 1
+            number = self.batches
+        began = time.perf_counter()
+        unchanged = 0
+        sent, sent_positions = batch, positions
+        if self.mode == 'upsert' and self.check_existing:
+            sent, sent_positions = self._changed(batch, positions)
+            unchanged = len(batch) - len(sent)
+        try:
+            if sent:
+                self._insert(sent)
+            accepted = len(sent)
+        except LoaderError as error:
+            if not is_row_error(error):
+                raise
+            self.log(f"❌ Batch {number} refused ({error}), isolating bad rows...")
+            context = {'table': self.table, 'mode': self.mode, 'batch': number, 'batch_rows': len(sent)}
+            accepted = self._isolate(sent, sent_positions, error, context)
+        else:
+            # Only clean batches say anything about how long a batch takes
+            self.adapt_batch_size(time.perf_counter() - began)
+
+        with self.lock:
+            self.rows_loaded += accepted
+            self.rows_unchanged += unchanged
+            self.rows_failed += len(sent) - accepted
+        if self.journal is not None and self.journal_key:
+            with self.metrics.time('ack'):
+                self.journal.ack(self.journal_key, positions)
+        self.metrics.count('loaded', accepted)
+        self.metrics.count('unchanged', unchanged)
+        self.metrics.count('failed', len(sent) - accepted)
+        self.metrics.observe('batch', time.perf_counter() - began)
+        self.metrics.set('batch_size', self.batch_size)
+        skipped = f", {unchanged} unchanged" if unchanged else ""
+        self.log(f"✅ Uploaded batch {number} ({accepted}/{len(sent)} products{skipped}, "
+                 f"{time.perf_counter() - began:.2f}s)")
+        return accepted + unchanged
+
+    def _isolate(self, batch, positions, error, context):
+        """
+        Insert what can be inserted of a refused batch: a single row is
+        rejected, anything longer is split in two and each half retried.
+        """
+        if len(batch) == 1:
+            self.rejects.write(batch[0], self.source, positions[0], error, context)
+            self.log(f"  ❌ Rejected product {positions[0] + 1}: {error}")
+            return 0
+
+        loaded = 0
+        middle = len(batch) // 2
+        for part, part_positions in ((batch[:middle], positions[:middle]), (batch[middle:], positions[middle:])):
+            try:
+                self._insert(part)
+                loaded += len(part)
+            except LoaderError as part_error:
+                if not is_row_error(part_error):
+                    raise
+                loaded += self._isolate(part, part_positions, part_error, context)
+        return loaded
+
+    def _batches(self, records, positions):
+        """Cut rows into batches lazily, so every batch takes the current adaptive size"""
+        start = 0
+        while start < len(positions):
+            chunk = positions[start:start + self.batch_size]
+            start += len(chunk)
+            yield [records[i] for i in chunk], chunk
+
+    def load_records(self, records, positions=None):
+        """
+        Insert records in adaptive batches; returns how many were accepted.
+
+        `positions` limits the load to those rows, e.g. the ones a resumed
+        load has not sent yet.
+        """
+        positions = range(len(records)) if positions is None else positions
+        if self.concurrency > 1:
+            return asyncio.run(self.load_records_async(records, positions))
+        return sum(self.insert_batch(batch, chunk) for batch, chunk in self._batches(records, positions))
+
+    async def load_records_async(self, records, positions=None):
+        """
+        Insert records with up to `concurrency` batch requests in flight.
+
+        Requests run on pooled connections in worker threads while the
+        event loop hands out batches. Batches may finish in any order.
+        With `ordered_by`, rows are split into `concurrency` lanes by a
+        hash of that column and each lane sends its batches one after
+        another, so rows sharing a key are always sent in source order.
+        """
+        positions = range(len(records)) if positions is None else positions
+        if self.ordered_by:
+            lanes = [[] for _ in range(self.concurrency)]
+            for i in positions:
+                key = str(records[i].get(self.ordered_by)).encode()
+                lanes[zlib.crc32(key) % self.concurrency].append(i)
+            sources = [self._batches(records, lane) for lane in lanes]
+        else:
+            # One shared batch generator: each worker takes the next batch when it is free
+            sources = [self._batches(records, positions)] * self.concurrency
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            async def drain(batches):
+                loaded = 0
+                for batch, positions in batches:
+                    loaded += await loop.run_in_executor(executor, self.insert_batch, batch, positions)
+                return loaded
+
+            return sum(await asyncio.gather(*(drain(source) for source in sources)))
+
+    def prepare(self, df):
+        """prepare_frame, plus the content hash column in upsert mode"""
+        df = prepare_frame(df, self.url_index)
+        if self.url_index is not None:
+            self.url_index.save()
+        if self.mode == 'upsert':
+            df[HASH_COLUMN] = content_hashes(df)
+        return df
+
+    def load_frame(self, df):
+        with self.metrics.time('transform'):
+            records = frame_records(self.prepare(df))
+        return self.load_records(records)
+
+    def load_file(self, path):
+        """Read, clean and upload one catalog file; returns how many rows were accepted"""
+        self.source = path
+        self.log(f"📖 Reading {path}...")
+        with self.metrics.time('read'):
+            df = read_frame(path)
+        with self.metrics.time('transform'):
+            df = self.prepare(df)
+            records = frame_records(df)
+        self.log(f"📊 Found {len(df)} products to upload from {path}")
+
+        positions = None
+        if self.journal is not None:
+            self.journal_key = f"{self.table}:{file_fingerprint(path)}"
+            pending = self.journal.begin(self.journal_key, path, len(df), self.resume)
+            positions = range(len(df)) if pending.all() else np.flatnonzero(pending).tolist()
+            if len(positions) < len(df):
+                self.log(f"⏩ Resuming: {len(df) - len(positions)} of {len(df)} rows were already acknowledged")
+
+        rejected = self.rejects.rows
+        try:
+            loaded = self.load_records(records, positions)
+        finally:
+            key, self.journal_key = self.journal_key, None
+        if key:
+            self.journal.finish(key)
+        if self.rejects.rows > rejected:
+            self.log(f"📝 {self.rejects.rows - rejected} rejected rows written to {self.rejects.path}")
+        return loaded
+
+
+def open_loader(key_env=DEFAULT_KEY_ENV, url=None, key=None, **options):
+    """
+    A CatalogLoader on the shared session for these credentials.
+
+    Explicit `url` and `key` win over SUPABASE_URL and `key_env`. Returns
+    None, after saying what is missing, when there are no credentials.
+    Loads are journaled to upload_journal.jsonl unless another journal is
+    given, so an interrupted upload script can be resumed with
+    `catalog_loader.py --resume`, and URL variants are collapsed against
+    url_index.csv unless another index is given.
+    """
+    options.setdefault('journal', UploadJournal())
+    options.setdefault('url_index', UrlIndex())
+    env_url, env_key = supabase_credentials(key_env)
+    url, key = url or env_url, key or env_key
+    if not url or not key:
+        print("❌ Error: Missing Supabase credentials!")
+        print(f"Please set SUPABASE_URL and {key_env} environment variables")
+        return None
+    return CatalogLoader(shared_session(url, key), **options)
+
+
+def upload_files(paths, key_env=DEFAULT_KEY_ENV, **options):
+    """Upload several catalogs over one pooled session; returns the loader, or None without credentials"""
+    loader = open_loader(key_env, **options)
+    if loader is None:
+        return None
+
+    start = time.perf_counter()
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"❌ {path} not found! Skipping...")
+            continue
+        print(f"\n📁 Processing {path}...")
+        loader.load_file(path)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n🎉 Uploaded {loader.rows_loaded} products ({loader.rows_unchanged} unchanged, {loader.rows_failed} failed) "
+          f"in {elapsed:.1f}s over {loader.session.connections_opened} connection(s)")
+    loader.metrics.report()
+    return loader
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upload cleaned catalogs to Supabase over one pooled connection.")
+    parser.add_argument("input_files", nargs='*', help="Cleaned catalogs (CSV, Parquet or Arrow). Defaults to the preset's files.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default='all', help="Files and key to use (default: all).")
+    parser.add_argument("--table", default=DEFAULT_TABLE, help=f"Target table (default: {DEFAULT_TABLE}).")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows in the first insert request (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=MAX_BATCH_SIZE,
+        help=f"Largest batch the adaptive sizing may grow to (default: {MAX_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--target-latency",
+        type=float,
+        default=TARGET_LATENCY,
+        help=f"Seconds per request the batch size is tuned towards (default: {TARGET_LATENCY}).",
+    )
+    parser.add_argument(
+        "--reject-file",
+        default=DEFAULT_REJECT_FILE,
+        help=f"JSON lines file for rows the server refuses (default: {DEFAULT_REJECT_FILE}).",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=LOAD_MODES,
+        default='insert',
+        help="insert every row, or upsert on url and skip unchanged rows (needs add_content_hash.sql; default: insert).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Batch requests in flight at once (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--ordered-by",
+        help="Column whose rows must reach the server in file order, e.g. url (default: no ordering).",
+    )
+    parser.add_argument(
+        "--journal",
+        default=DEFAULT_JOURNAL_FILE,
+        help=f"Checkpoint journal of acknowledged batches (default: {DEFAULT_JOURNAL_FILE}).",
+    )
+    parser.add_argument(
+        "--url-index",
+        default=DEFAULT_INDEX_FILE,
+        help=f"Canonical URL index shared with url_index.py (default: {DEFAULT_INDEX_FILE}).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip rows that an interrupted load of the same file already got through.",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=DEFAULT_METRICS_FILE,
+        help=f"Prometheus textfile rewritten while the upload runs (default: {DEFAULT_METRICS_FILE}).",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"Seconds between rewrites of the metrics file (default: {DEFAULT_INTERVAL:g}).",
+    )
+    parser.add_argument(
+        "--summary-file",
+        default=DEFAULT_SUMMARY_FILE,
+        help=f"JSON summary of throughput and stage latencies written at exit (default: {DEFAULT_SUMMARY_FILE}).",
+    )
+    parser.add_argument("--key-env", help="Environment variable holding the API key (default: the preset's).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    preset = PRESETS[args.preset]
+    metrics = UploadMetrics(args.table).start(args.metrics_file, args.metrics_interval)
+    try:
+        loader = upload_files(
+            args.input_files or preset['files'],
+            key_env=args.key_env or preset['key_env'],
+            table=args.table,
+            batch_size=args.batch_size,
+            max_batch_size=args.max_batch_size,
+            target_latency=args.target_latency,
+            rejects=RejectFile(args.reject_file),
+            concurrency=args.concurrency,
+            ordered_by=args.ordered_by,
+            mode=args.mode,
+            journal=UploadJournal(args.journal),
+            url_index=UrlIndex(args.url_index),
+            resume=args.resume,
+            metrics=metrics,
+        )
+    finally:
+        metrics.stop()
+        metrics.write_summary(args.summary_file)
+    if loader is None or loader.rows_failed:
+        raise SystemExit(1)
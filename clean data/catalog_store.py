@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from prices import cents_to_price, parse_prices, to_usd_cents
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - CSV-only installs
+    pa = None
+    pq = None
+
+PARQUET_EXTENSIONS = ('.parquet',)
+ARROW_EXTENSIONS = ('.arrow', '.feather')
+
+# Metadata key recording which catalog columns the source frame actually had
+SOURCE_COLUMNS_KEY = b'threadtwin.columns'
+
+# Catalog fields derived from the source frame's price column
+PRICE_FIELDS = ('price_cents', 'currency', 'price_usd_cents')
+
+
+def catalog_schema():
+    """Fixed schema shared by cleaned_products and cleaned_revolve_products"""
+    require_pyarrow()
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('id', pa.int64()),
+        ('brand', dictionary),
+        ('name', pa.string()),
+        ('fabric', pa.string()),
+        ('price_cents', pa.int64()),
+        ('currency', dictionary),
+        ('price_usd_cents', pa.int64()),
+        ('url', pa.string()),
+        ('affiliate_link', pa.string()),
+        ('image', pa.string()),
+        ('category', dictionary),
+        ('source', dictionary),
+        ('description', pa.string()),
+        ('created_at', pa.timestamp('us')),
+        ('updated_at', pa.timestamp('us')),
+        ('title', pa.string()),
+        ('image_url', pa.string()),
+        ('color', pa.string()),
+    ])
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet/Arrow catalogs need pyarrow: pip install pyarrow")
+
+
+def is_catalog_file(path):
+    """True if the path should be read and written as a typed catalog instead of CSV"""
+    return path.lower().endswith(PARQUET_EXTENSIONS + ARROW_EXTENSIONS)
+
+
+def _string_array(values, arrow_type):
+    strings = values.astype('string')
+    strings = strings.mask(strings == '')
+    array = pa.array(strings, type=pa.string(), from_pandas=True)
+    if pa.types.is_dictionary(arrow_type):
+        array = array.dictionary_encode()
+    return array
+
+
+def to_arrow_table(df):
+    """
+    Convert a cleaned catalog frame to the fixed catalog schema.
+
+    Empty strings become nulls, prices become integer cents with their
+    currency and a USD equivalent, and timestamps become real timestamps.
+    Columns the frame lacks are written as nulls.
+    """
+    schema = catalog_schema()
+    prices = None
+    if 'price' in df.columns:
+        prices = parse_prices(df['price'])
+        prices['price_usd_cents'] = to_usd_cents(prices['price_cents'], prices['currency'])
+
+    arrays = []
+    for field in schema:
+        if field.name in PRICE_FIELDS:
+            if prices is None:
+                array = None
+            elif field.name == 'currency':
+                array = _string_array(prices['currency'], field.type)
+            else:
+                array = pa.array(prices[field.name], type=pa.int64(), from_pandas=True)
+        elif field.name not in df.columns:
+            array = None
+        elif field.name == 'id':
+            array = pa.array(pd.to_numeric(df['id'], errors='coerce').astype('Int64'), type=pa.int64(), from_pandas=True)
+        elif pa.types.is_timestamp(field.type):
+            times = pd.to_datetime(df[field.name], format='ISO8601', errors='coerce')
+            array = pa.array(times, type=field.type, from_pandas=True)
+        else:
+            array = _string_array(df[field.name], field.type)
+
+        if array is None:
+            array = pa.nulls(len(df), type=field.type)
+        arrays.append(array)
+
+    source_columns = []
+    for col in df.columns:
+        col = 'price_cents' if col == 'price' else col
+        if col in schema.names:
+            source_columns.append(col)
+    metadata = {SOURCE_COLUMNS_KEY: json.dumps(source_columns).encode()}
+    return pa.Table.from_arrays(arrays, schema=schema.with_metadata(metadata))
+
+
+def write_catalog(df, path):
+    """Write a cleaned catalog as Parquet (.parquet) or an Arrow IPC file (.arrow/.feather)"""
+    table = to_arrow_table(df)
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        pq.write_table(table, path)
+    else:
+        # Uncompressed so readers can memory-map it without copying
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    return table
+
+
+def read_catalog(path, columns=None):
+    """
+    Read a typed catalog through a memory map, loading only `columns`.
+
+    Defaults to the columns the catalog was written from.
+    """
+    require_pyarrow()
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        schema = pq.read_schema(path)
+        columns = columns or _source_columns(schema)
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns or _source_columns(table.schema))
+
+
+def _source_columns(schema):
+    metadata = schema.metadata or {}
+    if SOURCE_COLUMNS_KEY in metadata:
+        return json.loads(metadata[SOURCE_COLUMNS_KEY])
+    return schema.names
+
+
+def read_catalog_frame(path, columns=None):
+    """
+    Read a typed catalog into the shape the uploaders send to Supabase.
+
+    The price comes back as a "70.00" USD amount, as strip_price_signs
+    writes it (a bare amount cannot carry another currency), timestamps
+    as ISO strings and every null as None.
+    """
+    if columns is not None:
+        columns = ['price_cents' if col == 'price' else col for col in columns]
+    table = read_catalog(path, columns)
+
+    df = table.to_pandas()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+    if 'price_cents' in df.columns:
+        usd_cents = read_catalog(path, ['price_usd_cents']).column(0).to_pandas()
+        df['price_cents'] = cents_to_price(usd_cents)
+        df = df.rename(columns={'price_cents': 'price'})
+
+    return df.astype(object).where(df.notna(), None)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert a cleaned catalog CSV to Parquet or Arrow.")
+    parser.add_argument("input_file", help="Cleaned catalog CSV.")
+    parser.add_argument("output_file", help="Output path ending in .parquet, .arrow or .feather.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not is_catalog_file(args.output_file):
+        raise SystemExit("❌ Output must end in .parquet, .arrow or .feather")
+    df = pd.read_csv(args.input_file, dtype=str)
+    write_catalog(df, args.output_file)
+    print(f"✅ Wrote {len(df)} products to {args.output_file} ({os.path.getsize(args.output_file) / 1024:.0f} KB)")
@@ -0,0 +1,158 @@
+import argparse
+import time
+
+import pandas as pd
+
+from catalog_loader import (
+    CONFLICT_COLUMN,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_KEY_ENV,
+    DEFAULT_TABLE,
+    HASH_COLUMN,
+    PAGE_SIZE,
+    PRESETS,
+    frame_records,
+    keyset_pages,
+    open_loader,
+    read_frame,
+    with_retries,
+)
+from url_index import UrlIndex
+
+# What the sync needs to know about every remote row
+REMOTE_COLUMNS = ['id', CONFLICT_COLUMN, HASH_COLUMN, 'source']
+# Ids per DELETE request
+DELETE_BATCH_SIZE = 500
+# Deleting more than this share of the remote rows in scope needs --force
+MAX_DELETE_FRACTION = 0.2
+
+
+def remote_index(session, table=DEFAULT_TABLE, page_size=PAGE_SIZE):
+    """id, url, content hash and source of every remote row, read by keyset pagination on id"""
+    pages = keyset_pages(session, table, ','.join(REMOTE_COLUMNS), page_size=page_size)
+    frames = [pd.DataFrame(rows, columns=REMOTE_COLUMNS) for rows in pages]
+    if not frames:
+        return pd.DataFrame(columns=REMOTE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def local_catalog(loader, paths):
+    """Prepared, hashed rows of every local catalog, one row per url; rows without a url cannot be synced"""
+    df = pd.concat([loader.prepare(read_frame(path)) for path in paths], ignore_index=True)
+    df = df[df[CONFLICT_COLUMN].notna()]
+    return df.drop_duplicates(CONFLICT_COLUMN)
+
+
+def plan_sync(local, remote):
+    """
+    Split a local catalog into the writes that make the remote table match it.
+
+    Rows are matched on url with hash joins: local urls missing remotely
+    are inserts, matched rows whose content hash differs are updates and
+    remote urls missing locally are deletes. Deletes are limited to the
+    sources present in the local catalog, so syncing one retailer's file
+    never removes another retailer's products.
+    """
+    remote_hash = remote.drop_duplicates(CONFLICT_COLUMN, keep='last').set_index(CONFLICT_COLUMN)[HASH_COLUMN]
+    exists = local[CONFLICT_COLUMN].isin(remote_hash.index)
+    same = exists & (local[CONFLICT_COLUMN].map(remote_hash) == local[HASH_COLUMN])
+
+    in_scope = pd.Series(True, index=remote.index)
+    if 'source' in local.columns:
+        in_scope = remote['source'].isin(local['source'].dropna().unique())
+    gone = in_scope & ~remote[CONFLICT_COLUMN].isin(local[CONFLICT_COLUMN])
+
+    return {
+        'insert': local[~exists],
+        'update': local[exists & ~same],
+        'delete': remote.loc[gone, 'id'],
+        'unchanged': int(same.sum()),
+        'in_scope': int(in_scope.sum()),
+    }
+
+
+def delete_ids(loader, ids, batch_size=DELETE_BATCH_SIZE):
+    """Delete remote rows by id, `batch_size` ids per request"""
+    ids = [str(i) for i in ids]
+    for start in range(0, len(ids), batch_size):
+        chunk = ','.join(ids[start:start + batch_size])
+        with_retries(lambda: loader.session.delete(loader.table, id=f"in.({chunk})"), retries=loader.retries)
+    return len(ids)
+
+
+def sync_catalogs(loader, paths, page_size=PAGE_SIZE, delete=True, force=False, dry_run=False):
+    """
+    Make the remote table match the local catalogs, writing only the difference.
+
+    Returns the plan. Upserts run before deletes, so an interrupted sync
+    never leaves products missing. A plan that would delete more than
+    MAX_DELETE_FRACTION of the rows in scope, typically because a local
+    file is truncated, skips its deletes unless `force` is set.
+    """
+    start = time.perf_counter()
+    local = local_catalog(loader, paths)
+    remote = remote_index(loader.session, loader.table, page_size)
+    plan = plan_sync(local, remote)
+    print(f"🔍 {len(local)} local rows vs {len(remote)} remote rows ({time.perf_counter() - start:.1f}s)")
+    print(f"➕ {len(plan['insert'])} to insert, ✏️  {len(plan['update'])} to update, "
+          f"🗑️  {len(plan['delete'])} to delete, {plan['unchanged']} unchanged")
+    if dry_run:
+        return plan
+
+    loader.load_records(frame_records(pd.concat([plan['insert'], plan['update']])))
+
+    if delete and len(plan['delete']):
+        if not force and len(plan['delete']) > MAX_DELETE_FRACTION * plan['in_scope']:
+            print(f"⚠️  Skipping deletes: {len(plan['delete'])} of {plan['in_scope']} rows in scope "
+                  f"is more than {MAX_DELETE_FRACTION:.0%}; rerun with --force if that is intended")
+        else:
+            delete_ids(loader, plan['delete'])
+    print(f"✅ Synced in {time.perf_counter() - start:.1f}s")
+    return plan
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Push only what changed in the cleaned catalogs to the products table.")
+    parser.add_argument("input_files", nargs='*', help="Cleaned catalogs (CSV, Parquet or Arrow). Defaults to the preset's files.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default='all', help="Files and key to use (default: all).")
+    parser.add_argument("--table", default=DEFAULT_TABLE, help=f"Remote table (default: {DEFAULT_TABLE}).")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help=f"Rows per page of the remote index (default: {PAGE_SIZE}).")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows in the first upsert request (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Upsert requests in flight at once (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument("--no-delete", action="store_true", help="Never delete remote rows.")
+    parser.add_argument("--force", action="store_true", help=f"Delete even more than {MAX_DELETE_FRACTION:.0%} of the rows in scope.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without writing anything.")
+    parser.add_argument("--key-env", help=f"Environment variable holding the API key (default: the preset's, else {DEFAULT_KEY_ENV}).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    preset = PRESETS[args.preset]
+    loader = open_loader(
+        args.key_env or preset['key_env'],
+        table=args.table,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        mode='upsert',
+        # The plan already knows which rows differ
+        check_existing=False,
+        # A dry run plans against the saved ids without recording new ones
+        url_index=UrlIndex(read_only=args.dry_run),
+    )
+    if loader is None:
+        raise SystemExit(1)
+    sync_catalogs(loader, args.input_files or preset['files'], args.page_size, not args.no_delete, args.force, args.dry_run)
+    if loader.rows_failed:
+        raise SystemExit(1)
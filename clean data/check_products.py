@@ -6,6 +6,11 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+def total_rows(response, fallback):
+    """Row count from the Content-Range header of a Prefer: count=exact reply, e.g. 0-4/1234"""
+    total = response.headers.get('Content-Range', '').rpartition('/')[2]
+    return int(total) if total.isdigit() else fallback
+
 def check_products():
     """
     Check what products are currently in the database
@@ -26,16 +31,19 @@ def check_products():
         'Content-Type': 'application/json'
     }
     
-    # Try to get all products
+    # Fetch a sample and let PostgREST count the rest, instead of downloading the whole table
+    # (use catalog_export.py for a full copy)
     products_url = f"{supabase_url}/rest/v1/products"
+    sample_params = {'select': '*', 'order': 'id.asc', 'limit': 5}
     
     try:
-        response = requests.get(products_url, headers=headers)
+        response = requests.get(products_url, headers={**headers, 'Prefer': 'count=exact'}, params=sample_params)
         print(f"📊 Products Table Status: {response.status_code}")
         
-        if response.status_code == 200:
+        if response.status_code in (200, 206):
             products = response.json()
-            print(f"🎉 Success! Found {len(products)} products in the database")
+            total = total_rows(response, len(products))
+            print(f"🎉 Success! Found {total} products in the database")
             
             if products:
                 print("\n📋 Sample Products:")
@@ -48,8 +56,8 @@ def check_products():
                     print(f"Category: {product.get('category', 'N/A')}")
                     print(f"Source: {product.get('source', 'N/A')}")
                 
-                if len(products) > 5:
-                    print(f"\n... and {len(products) - 5} more products")
+                if total > len(products):
+                    print(f"\n... and {total - len(products)} more products")
             else:
                 print("📭 No products found in the database")
                 
@@ -72,12 +80,15 @@ def check_products():
         }
         
         try:
-            response = requests.get(products_url, headers=anon_headers)
+            response = requests.get(
+                products_url,
+                headers={**anon_headers, 'Prefer': 'count=exact'},
+                params={'select': 'id', 'limit': 1},
+            )
             print(f"📊 Anon Key Access: {response.status_code}")
             
-            if response.status_code == 200:
-                products = response.json()
-                print(f"✅ Anon key can read {len(products)} products")
+            if response.status_code in (200, 206):
+                print(f"✅ Anon key can read {total_rows(response, len(response.json()))} products")
             else:
                 print(f"❌ Anon key error: {response.text}")
                 
@@ -7,7 +7,7 @@ CREATE TABLE IF NOT EXISTS products (
     name TEXT,
     fabric TEXT,
     price VARCHAR(50),
-    url TEXT,
+    url TEXT UNIQUE,
     image TEXT,
     category VARCHAR(255),
     source VARCHAR(255),
@@ -17,7 +17,8 @@ CREATE TABLE IF NOT EXISTS products (
     title TEXT,
     image_url TEXT,
     color VARCHAR(255),
-    affiliate_link TEXT
+    affiliate_link TEXT,
+    content_hash TEXT
 );
 
 -- Disable Row Level Security for testing
@@ -26,4 +27,5 @@ ALTER TABLE products DISABLE ROW LEVEL SECURITY;
 -- Optional: Add some indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand);
 CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
-CREATE INDEX IF NOT EXISTS idx_products_source ON products(source); 
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_products_source ON products(source);
+CREATE INDEX IF NOT EXISTS idx_products_content_hash ON products(content_hash); 
\ No newline at end of file
@@ -1,17 +1,100 @@
+import argparse
 import pandas as pd
 import re
-from urllib.parse import urlparse
-import numpy as np
 from datetime import datetime
 
-def clean_data(input_file, output_file):
+from prices import usd_display_price, usd_display_prices
+from retailers import RETAILERS_BY_NAME, find_retailer, register_retailer, retailer_names
+from streaming import DEFAULT_CHUNK_SIZE, CsvAppender, peak_memory_mb, read_csv_chunks
+
+# Columns of cleaned_products.csv, in output order
+REQUIRED_COLUMNS = [
+    'id', 'brand', 'name', 'fabric', 'price', 'url', 'image', 
+    'category', 'source', 'description', 'created_at', 'updated_at', 
+    'title', 'image_url', 'color'
+]
+
+# Swatch labels on a Skims row name the colourways the product comes in, e.g. "Select heather-grey swatch";
+# the product slug ends with one of them
+SKIMS_SWATCH = re.compile(r'^Select (.+) swatch$')
+LULULEMON_COLOR = re.compile(r'color=(\d+)')
+FABRIC_KEYWORDS = ['polyamide', 'elastane', 'cotton', 'polyester']
+
+def clean_data(input_file, output_file, columnar=True):
     """
     Clean and transform the messy CSV data into the desired format
     """
     # Read the CSV file
     df = pd.read_csv(input_file)
     
-    # Initialize the cleaned dataframe with the desired columns
+    # Extract one product per usable row
+    if columnar:
+        products = extract_products(df)
+    else:
+        products = extract_products_rowwise(df)
+    
+    cleaned_df = format_cleaned_frame(products)
+    
+    # Save the cleaned data
+    cleaned_df.to_csv(output_file, index=False)
+    
+    print(f"Data cleaned successfully! Saved to {output_file}")
+    print(f"Total products processed: {len(cleaned_df)}")
+    
+    return cleaned_df
+
+def clean_data_streaming(input_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Clean the export chunk by chunk, appending each cleaned chunk to the output.
+    
+    Memory stays bounded by the chunk size instead of the file size. IDs
+    continue across chunks and every row shares one timestamp.
+    """
+    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    output = CsvAppender(output_file)
+    
+    for chunk in read_csv_chunks(input_file, chunk_size):
+        cleaned_chunk = format_cleaned_frame(
+            extract_products(chunk),
+            start_id=output.rows_written + 1,
+            current_time=current_time
+        )
+        output.write(cleaned_chunk)
+    
+    # Empty input still gets a header
+    if not output.started:
+        output.write(format_cleaned_frame(pd.DataFrame()))
+    
+    print(f"Data cleaned successfully! Saved to {output_file}")
+    print(f"Total products processed: {output.rows_written}")
+    
+    return output.rows_written
+
+def format_cleaned_frame(products, start_id=1, current_time=None):
+    """Add missing columns, sequential IDs and timestamps to extracted products"""
+    cleaned_df = products.copy()
+    
+    # Add missing columns with default values
+    for col in REQUIRED_COLUMNS:
+        if col not in cleaned_df.columns:
+            cleaned_df[col] = ''
+    
+    # Reorder columns
+    cleaned_df = cleaned_df[REQUIRED_COLUMNS]
+    
+    # Add sequential IDs
+    cleaned_df['id'] = range(start_id, start_id + len(cleaned_df))
+    
+    # Add timestamps
+    if current_time is None:
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cleaned_df['created_at'] = current_time
+    cleaned_df['updated_at'] = current_time
+    
+    return cleaned_df
+
+def extract_products_rowwise(df):
+    """Extract products one row at a time (original implementation)"""
     cleaned_data = []
     
     # Process each row
@@ -34,84 +117,216 @@ def clean_data(input_file, output_file):
         if product_info:
             cleaned_data.append(product_info)
     
-    # Create the cleaned dataframe
-    cleaned_df = pd.DataFrame(cleaned_data)
+    return pd.DataFrame(cleaned_data)
+
+def extract_products(df):
+    """
+    Extract products with whole-column string operations.
     
-    # Add missing columns with default values
-    required_columns = [
-        'id', 'brand', 'name', 'fabric', 'price', 'url', 'image', 
-        'category', 'source', 'description', 'created_at', 'updated_at', 
-        'title', 'image_url', 'color'
-    ]
+    Rows are split by retailer once, then each group is handled by the
+    retailer's columnar extractor. Produces the same values as
+    extract_products_rowwise.
+    """
+    first = df.iloc[:, 0]
     
-    for col in required_columns:
-        if col not in cleaned_df.columns:
-            cleaned_df[col] = ''
+    # Skip empty rows, header rows and anything that isn't a URL
+    keep = first.notna() & ~first.astype(str).str.contains('select-none', regex=False)
+    urls = first[keep].astype(str).str.strip()
+    urls = urls[urls.str.startswith('http')]
+    rows = df.loc[urls.index]
     
-    # Reorder columns
-    cleaned_df = cleaned_df[required_columns]
+    # Determine retailer based on URL
+    brands = retailer_names(urls)
     
-    # Add sequential IDs
-    cleaned_df['id'] = range(1, len(cleaned_df) + 1)
+    groups = []
+    for brand, group_urls in urls.groupby(brands, sort=False):
+        retailer = RETAILERS_BY_NAME.get(brand)
+        if retailer is not None:
+            groups.append(retailer.extract_columns(rows.loc[group_urls.index], group_urls))
     
-    # Add timestamps
-    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    cleaned_df['created_at'] = current_time
-    cleaned_df['updated_at'] = current_time
+    if not groups:
+        return pd.DataFrame()
     
-    # Save the cleaned data
-    cleaned_df.to_csv(output_file, index=False)
+    # Restore the original row order
+    return pd.concat(groups).sort_index(kind='stable')
+
+def product_frame(urls, **columns):
+    """Build a product frame in the same column order as the row-wise extractors"""
+    frame = pd.DataFrame({
+        'brand': '',
+        'name': '',
+        'fabric': '',
+        'price': '',
+        'url': urls,
+        'image': '',
+        'category': '',
+        'source': '',
+        'description': '',
+        'title': '',
+        'image_url': '',
+        'color': '',
+    }, index=urls.index)
+    for col, values in columns.items():
+        frame[col] = values
+    return frame
+
+def skims_colorway(slug, swatches):
+    """The colourway a Skims product slug ends with: the longest of the row's swatches that fits, else ''"""
+    fits = [swatch for swatch in swatches if slug.endswith('-' + swatch)]
+    return max(fits, key=len) if fits else ''
+
+def row_swatches(row, swatch_pattern=SKIMS_SWATCH):
+    """Colourway slugs named by the swatch cells of one export row"""
+    cells = (str(cell).strip() for cell in row if pd.notna(cell))
+    return [match.group(1) for match in map(swatch_pattern.match, cells) if match]
+
+def swatch_lists(rows, swatch_pattern=SKIMS_SWATCH):
+    """row_swatches for a group of rows, as one list per row"""
+    cells = rows.stack().astype(str).str.strip()
+    slugs = cells.str.extract(swatch_pattern, expand=False).dropna()
+    found = slugs.groupby(level=0).agg(list)
+    return pd.Series([found.get(label, []) for label in rows.index], index=rows.index, dtype=object)
+
+def extract_skims_columns(rows, urls, retailer):
+    """Extract Skims product information for a group of rows"""
+    # Product part of the URL, e.g. fits-everybody-t-shirt-bra-onyx
+    product_part = urls.str.split('/products/').str[1].str.split('?').str[0]
     
-    print(f"Data cleaned successfully! Saved to {output_file}")
-    print(f"Total products processed: {len(cleaned_df)}")
+    # The colourway is whichever of the row's own swatches the slug ends with
+    swatches = swatch_lists(rows, retailer.patterns['swatch'])
+    colorway = pd.Series(
+        [skims_colorway(slug, found) if isinstance(slug, str) else '' for slug, found in zip(product_part, swatches)],
+        index=urls.index,
+    )
+    stem = pd.Series(
+        [slug[:len(slug) - len(way) - 1] if way else slug for slug, way in zip(product_part, colorway)],
+        index=urls.index,
+    )
     
-    return cleaned_df
+    name = stem.str.replace('-', ' ', regex=False).str.title().fillna('')
+    color = colorway.str.replace('-', ' ', regex=False).str.title()
+    
+    image_url = column_as_str(rows, retailer.columns['image'])
+    
+    return product_frame(
+        urls,
+        brand='Skims',
+        name=name,
+        fabric=extract_fabric_column(rows),
+        price=extract_price_column(rows, retailer.columns['price']),
+        image=image_url,
+        source='Skims',
+        title=name,
+        image_url=image_url,
+        color=color,
+    )
+
+def extract_lululemon_columns(rows, urls, retailer):
+    """Extract Lululemon product information for a group of rows"""
+    name = column_as_str(rows, retailer.columns['name'])
+    image_url = column_as_str(rows, retailer.columns['image'])
+    color = urls.str.extract(retailer.patterns['color'], expand=False).fillna('')
+    
+    return product_frame(
+        urls,
+        brand='Lululemon',
+        name=name,
+        price=extract_price_column(rows, retailer.columns['price']),
+        image=image_url,
+        source='Lululemon',
+        title=name,
+        image_url=image_url,
+        color=color,
+    )
+
+def extract_revolve_columns(rows, urls, retailer):
+    """Extract Revolve product information for a group of rows"""
+    name = column_as_str(rows, retailer.columns['name'])
+    image_url = column_as_str(rows, retailer.columns['image'])
+    
+    return product_frame(
+        urls,
+        brand=column_as_str(rows, retailer.columns['brand']),
+        name=name,
+        price=extract_price_column(rows, retailer.columns['price']),
+        image=image_url,
+        source='Revolve',
+        title=name,
+        image_url=image_url,
+    )
+
+def column_as_str(rows, column_index):
+    """Return a column as strings, with '' for missing cells or columns"""
+    if rows.shape[1] <= column_index:
+        return pd.Series('', index=rows.index, dtype=object)
+    column = rows.iloc[:, column_index]
+    return column.astype(str).where(column.notna(), '')
+
+def extract_price_column(rows, price_column_index):
+    """Extract prices from a specific column as USD, such as "$54" or "$54.50"."""
+    if rows.shape[1] <= price_column_index:
+        return pd.Series('', index=rows.index, dtype=object)
+    return usd_display_prices(rows.iloc[:, price_column_index], always_cents=False).fillna('')
+
+def extract_fabric_column(rows):
+    """Return the first cell in each row that looks like a fabric composition"""
+    fabric = pd.Series('', index=rows.index, dtype=object)
+    unresolved = pd.Series(True, index=rows.index)
+    pattern = '|'.join(FABRIC_KEYWORDS)
+    
+    for i in range(rows.shape[1]):
+        column = rows.iloc[:, i]
+        if not pd.api.types.is_string_dtype(column.dtype):
+            continue
+        # .str methods return NaN for non-string cells
+        match = (
+            column.str.contains('%', regex=False, na=False)
+            & column.str.lower().str.contains(pattern, regex=True, na=False)
+            & unresolved
+        )
+        if match.any():
+            fabric[match] = column[match].str.strip()
+            unresolved &= ~match
+    
+    return fabric
 
 def extract_brand_from_url(url):
     """Extract brand name from URL"""
-    if 'skims.com' in url:
-        return 'Skims'
-    elif 'lululemon.com' in url:
-        return 'Lululemon'
-    elif 'revolve.com' in url:
-        return 'Revolve'
-    else:
-        return 'Unknown'
+    retailer = find_retailer(url)
+    return retailer.name if retailer else 'Unknown'
 
 def extract_product_info(row, brand):
     """Extract product information from a row based on brand"""
     try:
         url = str(row.iloc[0]).strip()
         
-        if brand == 'Skims':
-            return extract_skims_info(row, url)
-        elif brand == 'Lululemon':
-            return extract_lululemon_info(row, url)
-        elif brand == 'Revolve':
-            return extract_revolve_info(row, url)
-        else:
+        retailer = RETAILERS_BY_NAME.get(brand)
+        if retailer is None:
             return None
+        return retailer.extract_row(row, url)
     except Exception as e:
         print(f"Error processing row: {e}")
         return None
 
-def extract_skims_info(row, url):
+def extract_skims_info(row, url, retailer):
     """Extract Skims product information"""
     try:
+        # The colourway is whichever of the row's own swatches the URL ends with
+        colorway = extract_color_from_skims_url(url, row_swatches(row, retailer.patterns['swatch']))
+        
         # Extract name from URL
-        name = extract_name_from_skims_url(url)
+        name = extract_name_from_skims_url(url, colorway)
         
-        # Extract price (usually in column 15)
-        price = extract_price_from_row(row, 15)
+        # Extract price
+        price = extract_price_from_row(row, retailer.columns['price'])
         
-        # Extract image URL (usually in column 1)
-        image_url = str(row.iloc[1]) if len(row) > 1 and pd.notna(row.iloc[1]) else ''
+        # Extract image URL
+        image_url = cell_as_str(row, retailer.columns['image'])
         
         # Extract fabric info (if available)
         fabric = extract_fabric_info(row)
         
-        # Extract color from URL
-        color = extract_color_from_skims_url(url)
+        color = colorway.replace('-', ' ').title()
         
         return {
             'brand': 'Skims',
@@ -131,20 +346,20 @@ def extract_skims_info(row, url):
         print(f"Error extracting Skims info: {e}")
         return None
 
-def extract_lululemon_info(row, url):
+def extract_lululemon_info(row, url, retailer):
     """Extract Lululemon product information"""
     try:
-        # Extract name from row (usually in column 15)
-        name = str(row.iloc[15]) if len(row) > 15 and pd.notna(row.iloc[15]) else ''
+        # Extract name from row
+        name = cell_as_str(row, retailer.columns['name'])
         
-        # Extract price (usually in column 16)
-        price = extract_price_from_row(row, 16)
+        # Extract price
+        price = extract_price_from_row(row, retailer.columns['price'])
         
-        # Extract image URL (usually in column 1)
-        image_url = str(row.iloc[1]) if len(row) > 1 and pd.notna(row.iloc[1]) else ''
+        # Extract image URL
+        image_url = cell_as_str(row, retailer.columns['image'])
         
         # Extract color from URL
-        color = extract_color_from_lululemon_url(url)
+        color = extract_color_from_lululemon_url(url, retailer.patterns['color'])
         
         return {
             'brand': 'Lululemon',
@@ -164,20 +379,20 @@ def extract_lululemon_info(row, url):
         print(f"Error extracting Lululemon info: {e}")
         return None
 
-def extract_revolve_info(row, url):
+def extract_revolve_info(row, url, retailer):
     """Extract Revolve product information"""
     try:
-        # Extract name from row (usually in column 4)
-        name = str(row.iloc[4]) if len(row) > 4 and pd.notna(row.iloc[4]) else ''
+        # Extract name from row
+        name = cell_as_str(row, retailer.columns['name'])
         
-        # Extract brand from row (usually in column 5)
-        brand = str(row.iloc[5]) if len(row) > 5 and pd.notna(row.iloc[5]) else ''
+        # Extract brand from row
+        brand = cell_as_str(row, retailer.columns['brand'])
         
-        # Extract price (usually in column 6)
-        price = extract_price_from_row(row, 6)
+        # Extract price
+        price = extract_price_from_row(row, retailer.columns['price'])
         
-        # Extract image URL (usually in column 3)
-        image_url = str(row.iloc[3]) if len(row) > 3 and pd.notna(row.iloc[3]) else ''
+        # Extract image URL
+        image_url = cell_as_str(row, retailer.columns['image'])
         
         return {
             'brand': brand,
@@ -197,18 +412,25 @@ def extract_revolve_info(row, url):
         print(f"Error extracting Revolve info: {e}")
         return None
 
-def extract_name_from_skims_url(url):
-    """Extract product name from Skims URL"""
+def cell_as_str(row, column_index):
+    """Return a cell as a string, '' if it is missing"""
+    if len(row) > column_index and pd.notna(row.iloc[column_index]):
+        return str(row.iloc[column_index])
+    return ''
+
+def extract_name_from_skims_url(url, colorway=''):
+    """Extract product name from Skims URL, without its colourway slug"""
     try:
         # Extract the product name from the URL
         # Example: https://skims.com/products/fits-everybody-t-shirt-bra-onyx
         parts = url.split('/products/')
         if len(parts) > 1:
             product_part = parts[1].split('?')[0]  # Remove query parameters
+            # Remove color suffix
+            if colorway and product_part.endswith('-' + colorway):
+                product_part = product_part[:-len(colorway) - 1]
             # Convert hyphens to spaces and capitalize
             name = product_part.replace('-', ' ').title()
-            # Remove color suffix
-            name = re.sub(r'\s+(onyx|clay|ruby|snow-strawberry-print|etc)$', '', name, flags=re.IGNORECASE)
             return name
         return ''
     except:
@@ -218,11 +440,8 @@ def extract_price_from_row(row, price_column_index):
     """Extract price from a specific column"""
     try:
         if len(row) > price_column_index and pd.notna(row.iloc[price_column_index]):
-            price_str = str(row.iloc[price_column_index]).strip()
-            # Extract dollar amount
-            price_match = re.search(r'\$(\d+)', price_str)
-            if price_match:
-                return f"${price_match.group(1)}"
+            price = usd_display_price(row.iloc[price_column_index], always_cents=False)
+            return price or ''
         return ''
     except:
         return ''
@@ -236,36 +455,106 @@ def extract_fabric_info(row):
                 return cell.strip()
     return ''
 
-def extract_color_from_skims_url(url):
-    """Extract color from Skims URL"""
+def extract_color_from_skims_url(url, swatches=()):
+    """Colourway slug at the end of a Skims URL, picked from the row's swatches; '' when none fits"""
     try:
-        # Extract color from the end of the URL
-        color_match = re.search(r'-([^-]+)$', url.split('/products/')[1].split('?')[0])
-        if color_match:
-            color = color_match.group(1).replace('-', ' ').title()
-            return color
-        return ''
+        return skims_colorway(url.split('/products/')[1].split('?')[0], swatches)
     except:
         return ''
 
-def extract_color_from_lululemon_url(url):
+def extract_color_from_lululemon_url(url, color_pattern=LULULEMON_COLOR):
     """Extract color from Lululemon URL"""
     try:
         # Extract color from URL parameters
-        color_match = re.search(r'color=(\d+)', url)
+        color_match = color_pattern.search(url)
         if color_match:
             return color_match.group(1)
         return ''
     except:
         return ''
 
+def canonical_skims_url(parts, retailer, color=''):
+    """Drop the row's own colourway (its color column, e.g. "Heather Grey") from a Skims product slug"""
+    path = parts.path.rstrip('/')
+    suffix = '-' + color.strip().lower().replace(' ', '-')
+    if suffix != '-' and path.endswith(suffix):
+        path = path[:-len(suffix)]
+    return parts._replace(path=path, query='')
+
+def canonical_lululemon_url(parts, retailer, color=''):
+    """Drop the colour and size parameters from a Lululemon product URL"""
+    query = '&'.join(
+        param for param in parts.query.split('&')
+        if param and param.split('=')[0] not in ('color', 'sz')
+    )
+    return parts._replace(query=query)
+
+def canonical_revolve_url(parts, retailer, color=''):
+    """Drop Revolve's listing-page parameters (plpSrc, itrownum, itcurrpage, ...)"""
+    return parts._replace(query='')
+
+# Retailers, keyed by the domains of their product URLs.
+# Column positions are zero-based positions in the scrape export.
+register_retailer(
+    'Skims',
+    domains=['skims.com'],
+    columns={'image': 1, 'price': 15},
+    patterns={'swatch': SKIMS_SWATCH},
+    extract_row=extract_skims_info,
+    extract_columns=extract_skims_columns,
+    canonicalize=canonical_skims_url,
+)
+register_retailer(
+    'Lululemon',
+    domains=['lululemon.com'],
+    columns={'image': 1, 'name': 15, 'price': 16},
+    patterns={'color': LULULEMON_COLOR},
+    extract_row=extract_lululemon_info,
+    extract_columns=extract_lululemon_columns,
+    canonicalize=canonical_lululemon_url,
+)
+register_retailer(
+    'Revolve',
+    domains=['revolve.com'],
+    columns={'image': 3, 'name': 4, 'brand': 5, 'price': 6},
+    patterns={},
+    extract_row=extract_revolve_info,
+    extract_columns=extract_revolve_columns,
+    canonicalize=canonical_revolve_url,
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Clean a Skims/Lululemon/Revolve scrape export.")
+    parser.add_argument(
+        "input_file",
+        nargs="?",
+        default="Dupes I like - Sheet2.csv",
+        help="Scrape export to clean.",
+    )
+    parser.add_argument(
+        "output_file",
+        nargs="?",
+        default="cleaned_products.csv",
+        help="Where to write the cleaned CSV.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Stream the export in chunks of this many rows instead of loading it whole.",
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    # Clean the data
-    input_file = "/Users/briannabogos/clean data/Dupes I like - Sheet2.csv"
-    output_file = "cleaned_products.csv"
-    
-    cleaned_df = clean_data(input_file, output_file)
+    args = parse_args()
     
-    # Display first few rows
-    print("\nFirst 10 cleaned products:")
-    print(cleaned_df.head(10).to_string(index=False)) 
\ No newline at end of file
+    if args.chunk_size:
+        clean_data_streaming(args.input_file, args.output_file, args.chunk_size)
+        print(f"Peak memory: {peak_memory_mb():.1f} MB")
+    else:
+        # Clean the data
+        cleaned_df = clean_data(args.input_file, args.output_file)
+        
+        # Display first few rows
+        print("\nFirst 10 cleaned products:")
+        print(cleaned_df.head(10).to_string(index=False))
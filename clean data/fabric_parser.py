@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+# Canonical fibers, in fiber vector order; anything unrecognised counts as 'other'
+FIBERS = [
+    'cotton', 'polyester', 'polyamide', 'elastane', 'wool', 'cashmere',
+    'silk', 'linen', 'viscose', 'modal', 'lyocell', 'acrylic', 'other'
+]
+
+# Trade and regional names mapped to their canonical fiber
+FIBER_SYNONYMS = {
+    'nylon': 'polyamide',
+    'spandex': 'elastane',
+    'lycra': 'elastane',
+    'elastan': 'elastane',
+    'elasthane': 'elastane',
+    'rayon': 'viscose',
+    'tencel': 'lyocell',
+    'merino': 'wool',
+    'lambswool': 'wool',
+    'flax': 'linen',
+    'poly': 'polyester',
+    'pes': 'polyester',
+}
+
+# Fibers without a slot of their own in the vector; they count as 'other'
+OTHER_FIBERS = [
+    'bamboo', 'hemp', 'ramie', 'jute', 'alpaca', 'mohair', 'angora', 'camel', 'cupro', 'acetate',
+    'triacetate', 'polyurethane', 'polypropylene', 'elastomultiester', 'metallic', 'lurex', 'leather',
+]
+
+# Words that qualify a fiber without changing it, e.g. "recycled nylon"
+FIBER_QUALIFIERS = ['recycled', 'organic', 'virgin', 'pima', 'supima', 'mulberry', 'bci']
+
+_QUALIFIER = '(?:(?:' + '|'.join(FIBER_QUALIFIERS) + r')\s+)*'
+_KNOWN_FIBER = '|'.join(sorted(set(FIBERS[:-1]) | set(FIBER_SYNONYMS) | set(OTHER_FIBERS), key=len, reverse=True))
+# "76% polyamide" or "polyamide 76%", for known fiber names only, so text
+# like "save 20% today" or "20% off" is not read as a fiber
+COMPONENT_PATTERN = (
+    r'(?P<pct>\d+(?:\.\d+)?)\s*%\s*' + _QUALIFIER + r'(?P<fiber>' + _KNOWN_FIBER + r')\b'
+    r'|\b' + _QUALIFIER + r'(?P<fiber_first>' + _KNOWN_FIBER + r')\s*:?\s*(?P<pct_last>\d+(?:\.\d+)?)\s*%'
+)
+
+FIBER_INDEX = {fiber: i for i, fiber in enumerate(FIBERS)}
+
+
+def standard_fiber(word):
+    """A fiber's standard name: synonyms mapped, fibers without a vector slot kept as named"""
+    word = word.lower()
+    return FIBER_SYNONYMS.get(word, word)
+
+
+def canonical_fiber(word):
+    """Map a fiber name or synonym to its canonical name, or 'other'"""
+    word = standard_fiber(word)
+    return word if word in FIBER_INDEX else 'other'
+
+
+def parse_fabric_column(fabrics):
+    """
+    Split every fabric string in a column into (fiber, percent) components.
+
+    Returns a long frame with one row per component, in the order written:
+    `row` is the position of the source string, `fiber` the canonical
+    fiber, `name` its standard name and `percent` its share as written.
+    Strings without a percentage produce no rows.
+    """
+    components = fabrics.astype('string').str.lower().str.extractall(COMPONENT_PATTERN)
+    percent = pd.to_numeric(components['pct'].fillna(components['pct_last']))
+    fiber = components['fiber'].fillna(components['fiber_first'])
+
+    words = fiber.unique()
+    fibers = fiber.map({word: canonical_fiber(word) for word in words})
+    names = fiber.map({word: standard_fiber(word) for word in words})
+    rows = fabrics.index.get_indexer(components.index.get_level_values(0))
+    return pd.DataFrame({
+        'row': rows,
+        'fiber': fibers.to_numpy(dtype=object),
+        'name': names.to_numpy(dtype=object),
+        'percent': percent.to_numpy(dtype=float),
+    })
+
+
+def fiber_vectors(fabrics):
+    """
+    Fixed-width fiber vector for every fabric string in a column.
+
+    Returns a float32 array of shape (len(fabrics), len(FIBERS)) holding the
+    share of each fiber, scaled so every parsed row sums to 1. Rows with no
+    composition are all zeros. Multi-part labels such as
+    "Body: 80% nylon; Lining: 100% polyester" are pooled before scaling.
+    Each distinct string is parsed once.
+    """
+    codes, uniques = pd.factorize(pd.Series(fabrics).astype(object))
+    components = parse_fabric_column(pd.Series(uniques, dtype=object))
+
+    # One spare all-zero row for missing values (code -1)
+    vectors = np.zeros((len(uniques) + 1, len(FIBERS)), dtype=np.float64)
+    columns = components['fiber'].map(FIBER_INDEX).to_numpy(dtype=np.intp)
+    np.add.at(vectors, (components['row'].to_numpy(dtype=np.intp), columns), components['percent'].to_numpy())
+
+    totals = vectors.sum(axis=1, keepdims=True)
+    np.divide(vectors, totals, out=vectors, where=totals > 0)
+    return vectors.astype(np.float32)[codes]
+
+
+def fiber_vector_frame(fabrics):
+    """fiber_vectors as a frame with one column per fiber, aligned with `fabrics`"""
+    return pd.DataFrame(fiber_vectors(fabrics), index=fabrics.index, columns=FIBERS)
+
+
+def format_compositions(components):
+    """
+    Components as strings like "76% polyamide, 24% elastane", by source row.
+
+    Percentages and order are kept as written and fibers take their
+    standard names. Only single-part labels are formatted: rows whose
+    shares do not add up to 100, or that name a fiber twice (a shell and
+    a lining), are left out.
+    """
+    written = components['percent'].map('{:g}%'.format).astype(str) + ' ' + components['name']
+    rows = components['row']
+    total = components['percent'].groupby(rows).sum()
+    repeated = components.duplicated(['row', 'name']).groupby(rows).any()
+    text = written.groupby(rows).agg(', '.join)
+    return text[((total - 100).abs() < 0.5) & ~repeated]
+
+
+def normalize_fabric(df):
+    """
+    Rewrite the fabric column with standard fiber names.
+
+    Strings naming no fiber, multi-part labels and labels whose shares do
+    not add up to 100 are left as they are.
+    """
+    df = df.copy()
+    codes, uniques = pd.factorize(df['fabric'].astype(object))
+    compositions = format_compositions(parse_fabric_column(pd.Series(uniques, dtype=object)))
+    # One spare slot for missing values (code -1)
+    formatted = np.append(compositions.reindex(range(len(uniques))).to_numpy(dtype=object), None)[codes]
+    df['fabric'] = df['fabric'].where(pd.isna(formatted), formatted)
+    return df
+
+
+def fabric_similarity(vectors, other=None):
+    """
+    Cosine similarity between fiber vectors.
+
+    With one argument, returns the catalog's pairwise similarity matrix;
+    with two, the similarity of every row of `vectors` to every row of
+    `other`. Rows without a composition score 0 against everything.
+    """
+    other = vectors if other is None else other
+    left = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    right = other / np.maximum(np.linalg.norm(other, axis=1, keepdims=True), 1e-12)
+    return left @ right.T
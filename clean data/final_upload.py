@@ -1,75 +1,31 @@
-import pandas as pd
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-import numpy as np
 
-# Load environment variables
-load_dotenv()
+from catalog_loader import PRESETS, open_loader, prepare_frame
 
-def clean_data_for_upload(df):
-    """
-    Clean data for Supabase upload
-    """
-    # Remove id column
-    if 'id' in df.columns:
-        df = df.drop('id', axis=1)
-    
-    # Clean text fields
-    text_columns = ['name', 'title', 'description']
-    for col in text_columns:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.replace('\n', ' ').str.strip()
-    
-    # Replace NaN values with None
-    df = df.replace({np.nan: None})
-    
-    # Replace empty strings with None
-    df = df.replace('', None)
-    
-    return df
+PRESET = PRESETS['products']
+
+# Kept under its old name for callers of this script
+clean_data_for_upload = prepare_frame
 
 def upload_products():
     """
     Upload products to Supabase
     """
     try:
-        # Supabase configuration
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("❌ Error: Missing Supabase credentials!")
+        loader = open_loader(PRESET['key_env'])
+        if loader is None:
             return False
         
-        # Initialize Supabase client
-        supabase: Client = create_client(supabase_url, supabase_key)
-        
-        # Read and clean the CSV file
-        print("📖 Reading cleaned_products.csv...")
-        df = pd.read_csv("cleaned_products.csv")
-        
-        print("🧹 Cleaning data...")
-        df_clean = clean_data_for_upload(df)
-        
-        # Convert to records
-        records = df_clean.to_dict('records')
+        # Fail on a missing table before sending any data
+        print("🧪 Testing table access...")
+        loader.check_table()
         
-        print(f"📊 Preparing to upload {len(records)} products...")
-        
-        # Test with first record
-        print("🧪 Testing with first record...")
-        test_result = supabase.table('products').insert(records[0]).execute()
-        print("✅ First record uploaded successfully!")
-        
-        # Upload remaining records
-        print("🚀 Uploading remaining records...")
-        remaining_records = records[1:]
-        if remaining_records:
-            result = supabase.table('products').insert(remaining_records).execute()
-            print(f"✅ Uploaded {len(remaining_records)} more records!")
+        uploaded = loader.load_file(PRESET['files'][0])
+        if loader.rows_failed:
+            print(f"⚠️  {loader.rows_failed} products failed to upload")
+            return False
         
-        print(f"🎉 Successfully uploaded all {len(records)} products to Supabase!")
+        print(f"🎉 Successfully uploaded all {uploaded} products to Supabase!")
         print("✅ Check your Supabase dashboard to see the data!")
         
         return True
@@ -96,4 +52,4 @@ if __name__ == "__main__":
             print("\n🎉 Upload successful!")
             print("📱 Go to your Supabase dashboard > Table Editor > products")
         else:
-            print("\n❌ Upload failed. Please check the troubleshooting steps above.") 
\ No newline at end of file
+            print("\n❌ Upload failed. Please check the troubleshooting steps above.")
@@ -0,0 +1,178 @@
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_cleaner import REQUIRED_COLUMNS, extract_products, format_cleaned_frame
+from revolve_data_cleaner import EXPECTED_COLUMNS, build_revolve_frame, finalize_revolve_frame
+from streaming import key_hashes
+
+MANIFEST_COLUMNS = ['row_hash', 'key_hash', 'emitted']
+DEDUPE_SUBSET = ['brand', 'name']
+
+
+def manifest_path(output_file):
+    """Manifest file kept next to a cleaned CSV"""
+    base, _ = os.path.splitext(output_file)
+    return f"{base}.manifest.csv"
+
+
+def changes_path(output_file):
+    """Change set file kept next to a cleaned CSV"""
+    base, _ = os.path.splitext(output_file)
+    return f"{base}.changes.csv"
+
+
+def row_identities(hashes):
+    """
+    Identify rows by (content hash, occurrence), so identical source rows
+    are matched one-to-one between runs
+    """
+    occurrence = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+    return pd.MultiIndex.from_arrays([hashes, occurrence], names=['row_hash', 'occurrence'])
+
+
+def load_previous_run(output_file, columns):
+    """Load the manifest and cleaned CSV of the previous run, or empty ones"""
+    manifest_file = manifest_path(output_file)
+    if not (os.path.exists(manifest_file) and os.path.exists(output_file)):
+        manifest = pd.DataFrame({
+            'row_hash': np.empty(0, dtype=np.uint64),
+            'key_hash': np.empty(0, dtype=np.uint64),
+            'emitted': np.empty(0, dtype=bool),
+        })
+        return manifest, pd.DataFrame(columns=columns)
+
+    manifest = pd.read_csv(manifest_file, dtype={'row_hash': np.uint64, 'key_hash': np.uint64, 'emitted': bool})
+    # Read as text so unchanged rows are written back exactly as they were
+    previous = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+    previous.index = manifest.index[manifest['emitted']]
+    return manifest, previous
+
+
+def clean_changed_rows(cleaner, rows, taken, next_id, timestamp):
+    """
+    Clean only the given source rows.
+
+    `taken` holds the dedupe key hashes already claimed by unchanged
+    source rows, emitted or not. Returns the new output rows and the
+    dedupe key hash of every cleaned source row (0 for the products
+    cleaner, which does not deduplicate).
+    """
+    if cleaner == 'revolve':
+        built = build_revolve_frame(rows, timestamp)
+        keys = key_hashes(built, DEDUPE_SUBSET)
+        built = built.drop_duplicates(subset=DEDUPE_SUBSET)
+        # Keys already claimed by unchanged rows win, even by rows later dropped for a missing price
+        built = built[~np.isin(key_hashes(built, DEDUPE_SUBSET), taken)]
+        return finalize_revolve_frame(built), keys
+
+    products = extract_products(rows)
+    new_rows = format_cleaned_frame(products, start_id=next_id, current_time=timestamp)
+    new_rows.index = products.index
+    return new_rows, np.zeros(len(rows), dtype=np.uint64)
+
+
+def build_change_set(deleted, inserted):
+    """Label removed and added output rows; a url present in both is an update"""
+    updated_urls = set(deleted['url']) & set(inserted['url'])
+    deleted = deleted[~deleted['url'].isin(updated_urls)]
+    return pd.concat([
+        deleted.assign(change='delete'),
+        inserted.assign(change=np.where(inserted['url'].isin(updated_urls), 'update', 'insert')),
+    ], ignore_index=True)
+
+
+def clean_incremental(cleaner, input_file, output_file):
+    """
+    Re-clean only source rows that are new or changed since the last run.
+
+    A manifest next to the output records a content hash for every source
+    row and whether it produced an output row. Unchanged rows are copied
+    from the previous output, rows that vanished from the source are
+    dropped and new output rows are appended. The change set is written
+    next to the output for the uploaders.
+    """
+    columns = EXPECTED_COLUMNS if cleaner == 'revolve' else REQUIRED_COLUMNS
+    if cleaner == 'revolve':
+        timestamp = datetime.now().isoformat()
+    else:
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    source = pd.read_csv(input_file, dtype=str)
+    source_ids = row_identities(pd.util.hash_pandas_object(source, index=False).to_numpy())
+
+    manifest, previous = load_previous_run(output_file, columns)
+    manifest_ids = row_identities(manifest['row_hash'].to_numpy(dtype=np.uint64))
+
+    previous_position = manifest_ids.get_indexer(source_ids)
+    unchanged = previous_position >= 0
+    kept = manifest_ids.isin(source_ids)
+    departed = manifest[~kept]
+    vanished = departed[departed['emitted'].to_numpy()]
+
+    # A source row dropped as a duplicate has to be reconsidered once the
+    # row that claimed its key is gone, whether or not that row was emitted
+    reclaim = np.zeros(len(source), dtype=bool)
+    if cleaner == 'revolve' and len(departed):
+        position = previous_position[unchanged]
+        reclaim[unchanged] = (
+            ~manifest['emitted'].to_numpy()[position]
+            & np.isin(manifest['key_hash'].to_numpy()[position], departed['key_hash'].to_numpy())
+        )
+    to_clean = ~unchanged | reclaim
+    kept &= ~manifest_ids.isin(source_ids[reclaim])
+
+    kept_rows = previous[previous.index.isin(manifest.index[kept])]
+    deleted_rows = previous[previous.index.isin(vanished.index)]
+
+    next_id = 1
+    if cleaner != 'revolve' and len(previous):
+        next_id = int(pd.to_numeric(previous['id']).max()) + 1
+    taken = manifest['key_hash'].to_numpy(dtype=np.uint64)[kept]
+    new_rows, new_keys = clean_changed_rows(cleaner, source[to_clean], taken, next_id, timestamp)
+
+    # Patch the output: append when nothing was removed, rewrite otherwise
+    if len(deleted_rows) or previous.empty:
+        patched = pd.concat([kept_rows, new_rows[columns]]) if len(kept_rows) else new_rows[columns]
+        patched.to_csv(output_file, index=False)
+    elif len(new_rows):
+        new_rows[columns].to_csv(output_file, mode='a', header=False, index=False)
+
+    cleaned_manifest = pd.DataFrame({
+        'row_hash': source_ids.get_level_values('row_hash')[to_clean],
+        'key_hash': new_keys,
+        'emitted': source[to_clean].index.isin(new_rows.index),
+    })
+    pd.concat([manifest[kept], cleaned_manifest], ignore_index=True)[MANIFEST_COLUMNS].to_csv(
+        manifest_path(output_file), index=False
+    )
+
+    changes = build_change_set(deleted_rows[columns], new_rows[columns])
+    changes.to_csv(changes_path(output_file), index=False)
+
+    print(f"♻️  {int(unchanged.sum() - reclaim.sum())} unchanged rows reused, {int(to_clean.sum())} rows cleaned")
+    print(f"📝 {(changes['change'] == 'insert').sum()} inserts, {(changes['change'] == 'update').sum()} updates, "
+          f"{(changes['change'] == 'delete').sum()} deletes -> {changes_path(output_file)}")
+
+    return changes
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Clean only rows that changed since the last run.")
+    parser.add_argument("input_file", help="Scrape export to clean.")
+    parser.add_argument("output_file", help="Cleaned CSV to patch; its manifest is kept alongside.")
+    parser.add_argument(
+        "--cleaner",
+        choices=['products', 'revolve'],
+        default='products',
+        help="products uses data_cleaner, revolve uses revolve_data_cleaner.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    clean_incremental(args.cleaner, args.input_file, args.output_file)
@@ -0,0 +1,58 @@
+import gzip
+import json
+
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib encoder is used instead
+    orjson = None
+
+# Bodies smaller than this are sent as they are; gzip would barely shrink them
+MIN_COMPRESS_SIZE = 1024
+# zlib level 1..9; low levels already get most of the gain on repetitive JSON
+COMPRESS_LEVEL = 5
+
+
+def dumps(value):
+    """Compact UTF-8 JSON bytes; values JSON has no type for are written as text"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str).encode()
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def column_values(values):
+    """A column as Python objects with every kind of null (None, NaN, NaT, NA) as None, found once per column"""
+    array = values.to_numpy(dtype=object)
+    nulls = pd.isna(array)
+    if nulls.any():
+        # An object column comes back as the frame's own array; never write into it
+        array = array.copy()
+        array[nulls] = None
+    return array
+
+
+def column_records(df):
+    """
+    Rows of a frame as dicts, built from whole columns.
+
+    Much cheaper than DataFrame.to_dict('records'), which boxes and
+    checks every cell on its own.
+    """
+    columns = [str(col) for col in df.columns]
+    arrays = [column_values(df[col]) for col in df.columns]
+    return [dict(zip(columns, row)) for row in zip(*arrays)]
+
+
+def compress(body, level=COMPRESS_LEVEL):
+    """gzip a request body; mtime is pinned so equal bodies compress to equal bytes"""
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def decompress(body, encoding):
+    """A response body as sent before any Content-Encoding the server applied"""
+    return gzip.decompress(body) if encoding == 'gzip' else body
@@ -0,0 +1,165 @@
+from collections import deque
+
+import pandas as pd
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - pure-Python automaton is used instead
+    ahocorasick = None
+
+# Category keywords, checked in order; the first category with a match wins
+CATEGORY_KEYWORDS = {
+    'Dress': ['dress', 'gown'],
+    'Top': ['top', 'shirt', 'blouse', 'cami', 'tank', 'corset', 'vest', 'halter'],
+    'Bottom': ['pant', 'jean', 'short', 'skirt', 'trouser', 'capri'],
+    'Swimwear': ['bikini', 'swim', 'bathing'],
+    'Activewear': ['sport', 'athletic', 'workout', 'gym'],
+    'Outerwear': ['jacket', 'coat', 'blazer', 'cardigan', 'sweater'],
+    'Lingerie': ['bra', 'underwear', 'lingerie', 'intimate'],
+    'Accessories': ['bag', 'purse', 'wallet', 'jewelry', 'scarf', 'hat']
+}
+
+# Same keyword lists as the backend ProductScraper
+FABRIC_KEYWORDS = [
+    'cotton', 'polyester', 'nylon', 'spandex', 'elastane', 'wool',
+    'silk', 'linen', 'rayon', 'viscose', 'lyocell', 'modal'
+]
+CONSTRUCTION_KEYWORDS = [
+    'ribbed', 'knit', 'woven', 'double-lined', 'lined', 'unlined',
+    'structured', 'stretch', 'non-stretch', 'seamless'
+]
+FIT_KEYWORDS = [
+    'slim', 'regular', 'loose', 'oversized', 'fitted', 'relaxed',
+    'straight', 'skinny', 'wide', 'cropped', 'classic'
+]
+CARE_KEYWORDS = [
+    'machine wash', 'hand wash', 'dry clean', 'tumble dry',
+    'iron', 'do not bleach', 'gentle cycle', 'cold water'
+]
+
+TAXONOMIES = {
+    'category': CATEGORY_KEYWORDS,
+    'fabric': FABRIC_KEYWORDS,
+    'construction': CONSTRUCTION_KEYWORDS,
+    'fit': FIT_KEYWORDS,
+    'care': CARE_KEYWORDS,
+}
+
+
+class KeywordTagger:
+    """
+    Find keywords from several taxonomies in one pass over a text.
+
+    A taxonomy is either a list of keywords, where each keyword is its own
+    label, or a dict of label -> keywords. All keywords go into a single
+    Aho-Corasick automaton, so scanning costs the same however many terms
+    the taxonomies hold. Matching is case-insensitive substring matching,
+    like the scraper's extractKeywords.
+    """
+
+    def __init__(self, taxonomies):
+        self.taxonomies = {}
+        payloads = {}
+        for taxonomy, labels in taxonomies.items():
+            if not isinstance(labels, dict):
+                labels = {keyword: [keyword] for keyword in labels}
+            self.taxonomies[taxonomy] = list(labels)
+            for label_index, keywords in enumerate(labels.values()):
+                for keyword in keywords:
+                    payloads.setdefault(keyword.lower(), []).append((taxonomy, label_index))
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, payload in payloads.items():
+                self._automaton.add_word(keyword, tuple(payload))
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build(payloads)
+
+    def _build(self, payloads):
+        """Build goto, failure and output tables for the pure-Python automaton"""
+        self._goto = [{}]
+        self._output = [[]]
+        for keyword, payload in payloads.items():
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].extend(payload)
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def matches(self, text):
+        """Set of (taxonomy, label_index) pairs found in the text"""
+        text = text.lower()
+        found = set()
+        if self._automaton is not None:
+            if len(self._automaton):
+                for _, payload in self._automaton.iter(text):
+                    found.update(payload)
+            return found
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def tag(self, text):
+        """Labels found in the text for every taxonomy, in taxonomy order"""
+        found = self.matches(text) if isinstance(text, str) else set()
+        tags = {taxonomy: [] for taxonomy in self.taxonomies}
+        for taxonomy, label_index in sorted(found, key=lambda match: match[1]):
+            tags[taxonomy].append(self.taxonomies[taxonomy][label_index])
+        return tags
+
+    def tag_column(self, texts):
+        """
+        Tag every text in a column.
+
+        Each distinct text is scanned once. Returns a frame with one column of
+        label lists per taxonomy, aligned with `texts`.
+        """
+        tags = {text: self.tag(text) for text in texts.dropna().unique()}
+        empty = self.tag(None)
+        return pd.DataFrame(
+            {
+                taxonomy: [tags.get(text, empty)[taxonomy] if isinstance(text, str) else [] for text in texts]
+                for taxonomy in self.taxonomies
+            },
+            index=texts.index,
+        )
+
+    def first_label_column(self, texts, taxonomy, default):
+        """First matching label of one taxonomy for every text, or `default`"""
+        labels = {}
+        for text in texts.dropna().unique():
+            first = min((i for t, i in self.matches(text) if t == taxonomy), default=None)
+            labels[text] = default if first is None else self.taxonomies[taxonomy][first]
+        return texts.map(labels).fillna(default).astype(object)
+
+
+DEFAULT_TAGGER = KeywordTagger(TAXONOMIES)
+
+
+def tag_column(texts, tagger=DEFAULT_TAGGER):
+    """Tag a column of names or descriptions with every default taxonomy"""
+    return tagger.tag_column(texts)
@@ -0,0 +1,176 @@
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from data_cleaner import extract_products, format_cleaned_frame
+from revolve_data_cleaner import EXPECTED_COLUMNS, build_revolve_frame, finalize_revolve_frame
+from streaming import CsvAppender, SeenKeys, peak_memory_mb
+
+DEFAULT_PARTITION_BYTES = 64 * 1024 * 1024
+SCAN_BLOCK_BYTES = 1024 * 1024
+
+
+def find_row_boundaries(path, partition_bytes=DEFAULT_PARTITION_BYTES):
+    """
+    Split a CSV file into byte ranges that start and end on row boundaries.
+
+    Returns (header_end, ranges). A newline only ends a row when an even
+    number of quote characters precede it, so quoted fields containing
+    newlines are never split. Ranges depend only on the file and
+    partition_bytes, not on how many workers will clean them.
+    """
+    size = os.path.getsize(path)
+    # The first boundary ends the header row
+    boundaries = []
+    next_target = 0
+    parity = 0
+    offset = 0
+
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            # Quotes up to `pos` are already counted in `parity`
+            pos = 0
+            while True:
+                newline = block.find(b'\n', max(pos, next_target - offset))
+                if newline == -1:
+                    break
+                parity = (parity + block.count(b'"', pos, newline)) % 2
+                pos = newline + 1
+                if parity == 0:
+                    boundaries.append(offset + pos)
+                    next_target = offset + pos + partition_bytes
+            parity = (parity + block.count(b'"', pos)) % 2
+            offset += len(block)
+
+    if not boundaries:
+        return size, []
+    header_end = boundaries[0]
+    if boundaries[-1] != size:
+        boundaries.append(size)
+    ranges = list(zip(boundaries[:-1], boundaries[1:]))
+    return header_end, ranges
+
+
+def read_partition(path, header_end, start, end):
+    """Parse one byte range of a CSV file, using the file's own header"""
+    with open(path, 'rb') as f:
+        header = f.read(header_end)
+        f.seek(start)
+        data = f.read(end - start)
+    return pd.read_csv(io.BytesIO(header + data), dtype=str)
+
+
+def clean_products_partition(job):
+    path, header_end, start, end, timestamp = job
+    return extract_products(read_partition(path, header_end, start, end))
+
+
+def clean_revolve_partition(job):
+    path, header_end, start, end, timestamp = job
+    cleaned = build_revolve_frame(read_partition(path, header_end, start, end), timestamp)
+    return cleaned.drop_duplicates(subset=['brand', 'name'])
+
+
+def clean_files_parallel(cleaner, input_files, output_file, workers=None,
+                         partition_bytes=DEFAULT_PARTITION_BYTES):
+    """
+    Clean several exports in a process pool and merge them into one CSV.
+
+    Files are split into row-aligned byte ranges, cleaned in parallel and
+    written in input order, so the output is the same for any worker count.
+    Revolve rows are deduplicated on (brand, name) across all partitions
+    as they are merged.
+    """
+    if cleaner == 'revolve':
+        timestamp = datetime.now().isoformat()
+        clean_partition = clean_revolve_partition
+    else:
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        clean_partition = clean_products_partition
+
+    jobs = []
+    for path in input_files:
+        if not os.path.exists(path):
+            print(f"⚠️  Skipping missing file: {path}")
+            continue
+        header_end, ranges = find_row_boundaries(path, partition_bytes)
+        jobs.extend((path, header_end, start, end, timestamp) for start, end in ranges)
+
+    print(f"🚀 Cleaning {len(jobs)} partitions from {len(input_files)} files with {workers or os.cpu_count()} workers")
+
+    seen = SeenKeys(['brand', 'name'])
+    output = CsvAppender(output_file)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() yields results in job order, whatever order they finish in
+        for cleaned in executor.map(clean_partition, jobs):
+            if cleaner == 'revolve':
+                output.write(finalize_revolve_frame(seen.drop_seen(cleaned)))
+            else:
+                output.write(format_cleaned_frame(
+                    cleaned,
+                    start_id=output.rows_written + 1,
+                    current_time=timestamp
+                ))
+
+    # Empty input still gets a header
+    if not output.started:
+        if cleaner == 'revolve':
+            output.write(pd.DataFrame(columns=EXPECTED_COLUMNS))
+        else:
+            output.write(format_cleaned_frame(pd.DataFrame()))
+
+    print(f"✅ Wrote {output.rows_written} cleaned rows to {output_file}")
+    return output.rows_written
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Clean scrape exports in parallel across files and partitions.")
+    parser.add_argument(
+        "files",
+        nargs='+',
+        help="Scrape exports to clean, merged into one output in this order.",
+    )
+    parser.add_argument(
+        "--cleaner",
+        choices=['products', 'revolve'],
+        default='products',
+        help="products uses data_cleaner, revolve uses revolve_data_cleaner.",
+    )
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="Where to write the merged cleaned CSV.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--partition-mb",
+        type=float,
+        default=DEFAULT_PARTITION_BYTES / (1024 * 1024),
+        help="Target partition size in MB for splitting large files.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    clean_files_parallel(
+        args.cleaner,
+        args.files,
+        args.output,
+        workers=args.workers,
+        partition_bytes=int(args.partition_mb * 1024 * 1024),
+    )
+    print(f"Peak memory: {peak_memory_mb():.1f} MB")
@@ -0,0 +1,98 @@
+import argparse
+import time
+
+import pandas as pd
+
+from add_affiliate_link import add_affiliate_link_to_frame
+from catalog_store import is_catalog_file, write_catalog
+from data_cleaner import extract_products, format_cleaned_frame
+from fabric_parser import normalize_fabric
+from near_duplicates import drop_near_duplicates, mark_near_duplicates
+from remove_price_signs import strip_price_signs
+from revolve_data_cleaner import clean_revolve_frame
+from url_index import collapse_with_default_index
+
+# Post-cleaning transforms, each taking and returning a DataFrame
+STAGES = {}
+
+DEFAULT_STAGES = ['remove_price_signs', 'add_affiliate_link']
+
+
+def register_stage(name, transform):
+    """Register a DataFrame -> DataFrame transform under a stage name"""
+    STAGES[name] = transform
+    return transform
+
+
+register_stage('remove_price_signs', strip_price_signs)
+register_stage('add_affiliate_link', add_affiliate_link_to_frame)
+register_stage('normalize_fabric', normalize_fabric)
+register_stage('mark_near_duplicates', mark_near_duplicates)
+register_stage('drop_near_duplicates', drop_near_duplicates)
+register_stage('collapse_url_variants', collapse_with_default_index)
+
+
+def load_frame(input_file, cleaner=None):
+    """Parse the input once, cleaning it first when a cleaner is given"""
+    df = pd.read_csv(input_file)
+    if cleaner == 'products':
+        return format_cleaned_frame(extract_products(df))
+    if cleaner == 'revolve':
+        return clean_revolve_frame(df)
+    return df
+
+
+def run_pipeline(input_file, output_file, stages=DEFAULT_STAGES, cleaner=None):
+    """
+    Run registered stages over one in-memory frame and write it once.
+
+    This replaces running remove_price_signs.py, remove_revolve_price_signs.py
+    and add_affiliate_link.py one after another, each of which re-reads and
+    re-writes the whole CSV.
+    """
+    unknown = [name for name in stages if name not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages: {unknown}. Available: {sorted(STAGES)}")
+
+    start = time.perf_counter()
+    df = load_frame(input_file, cleaner)
+    print(f"📖 Loaded {len(df)} rows from {input_file} ({time.perf_counter() - start:.2f}s)")
+
+    for name in stages:
+        start = time.perf_counter()
+        df = STAGES[name](df)
+        print(f"🔧 {name} ({time.perf_counter() - start:.2f}s)")
+
+    if is_catalog_file(output_file):
+        write_catalog(df, output_file)
+    else:
+        df.to_csv(output_file, index=False)
+    print(f"✅ Wrote {len(df)} rows to {output_file}")
+    return df
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Clean and post-process a catalog in a single pass.")
+    parser.add_argument("input_file", help="Scrape export, or an already cleaned CSV when --cleaner is not set.")
+    parser.add_argument(
+        "output_file",
+        help="Where to write the result. A .parquet, .arrow or .feather path writes a typed catalog instead of CSV.",
+    )
+    parser.add_argument(
+        "--cleaner",
+        choices=['products', 'revolve'],
+        default=None,
+        help="Clean the input with data_cleaner (products) or revolve_data_cleaner (revolve) first.",
+    )
+    parser.add_argument(
+        "--stages",
+        nargs='*',
+        default=DEFAULT_STAGES,
+        help=f"Stages to run, in order. Available: {', '.join(sorted(STAGES))}.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_pipeline(args.input_file, args.output_file, args.stages, args.cleaner)
@@ -0,0 +1,280 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from catalog_loader import COLUMN_LIMITS, REST_PATH
+from json_payloads import MIN_COMPRESS_SIZE, compress, decompress
+
+DEFAULT_PORT = 54321
+# Columns that reject a second row with the same value, as in the products table
+UNIQUE_COLUMNS = ['url']
+
+# Query parameters that are not column filters
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+OPERATORS = {
+    'eq': lambda value, operand: value == operand,
+    'neq': lambda value, operand: value != operand,
+    'gt': lambda value, operand: value is not None and value > operand,
+    'gte': lambda value, operand: value is not None and value >= operand,
+    'lt': lambda value, operand: value is not None and value < operand,
+    'lte': lambda value, operand: value is not None and value <= operand,
+    'is': lambda value, operand: value is None,
+}
+
+
+def parse_filter(column, expression):
+    """A PostgREST filter such as gt.100 or in.(a,b) as a (column, test) pair"""
+    operator, _, operand = expression.partition('.')
+    if operator == 'in':
+        members = {item.strip('"') for item in operand.strip('()').split(',')}
+        # Ids arrive as text in the query; compare them as text too
+        return column, lambda value: (str(value) if isinstance(value, int) else value) in members
+
+    def test(value):
+        # Compare ids as numbers, everything else as text
+        return OPERATORS[operator](value, int(operand) if isinstance(value, int) else operand)
+    return column, test
+
+
+def column_filters(pairs):
+    """Filters from query parameter pairs; a column may be filtered more than once, e.g. id=gt.1&id=lte.9"""
+    return [parse_filter(col, value) for col, value in pairs if col not in RESERVED_PARAMS]
+
+
+class StandinTable:
+    """An in-memory table with a serial id, unique columns and length-limited columns"""
+
+    def __init__(self, unique=UNIQUE_COLUMNS, limits=COLUMN_LIMITS):
+        self.rows = {}
+        self.limits = limits
+        # Unique column -> value -> id of the row holding it
+        self.unique = {col: {} for col in unique}
+        self.next_id = 1
+        self.writes = 0
+
+    def write(self, records, on_conflict=None):
+        """
+        Insert rows all or none, returning Postgres' error code and message on a bad row.
+
+        With `on_conflict`, a row whose value in that column already exists
+        updates the existing row instead, as ON CONFLICT DO UPDATE does.
+        """
+        seen = {col: set() for col in self.unique}
+        for record in records:
+            for col, limit in self.limits.items():
+                if isinstance(record.get(col), str) and len(record[col]) > limit:
+                    return '22001', f'value too long for type character varying({limit})'
+            for col, ids in self.unique.items():
+                value = record.get(col)
+                if value is None:
+                    continue
+                if value in seen[col] or (value in ids and col != on_conflict):
+                    return '23505', f'duplicate key value violates unique constraint "products_{col}_key"'
+                seen[col].add(value)
+
+        for record in records:
+            existing = self.unique.get(on_conflict, {}).get(record.get(on_conflict))
+            if existing is not None:
+                self.rows[existing].update(record)
+            else:
+                row = {'id': self.next_id, **record}
+                self.rows[row['id']] = row
+                self.next_id += 1
+                for col, ids in self.unique.items():
+                    if row.get(col) is not None:
+                        ids[row[col]] = row['id']
+            self.writes += 1
+        return None
+
+    def delete(self, filters):
+        doomed = [row for row in self.rows.values() if all(test(row.get(col)) for col, test in filters)]
+        for row in doomed:
+            del self.rows[row['id']]
+            for col, ids in self.unique.items():
+                ids.pop(row.get(col), None)
+        self.writes += len(doomed)
+
+    def select(self, filters, order=None, limit=None):
+        """The matching rows, up to `limit` of them, and how many rows matched in all"""
+        rows = [row for row in self.rows.values() if all(test(row.get(col)) for col, test in filters)]
+        if order:
+            col, _, direction = order.partition('.')
+            rows.sort(key=lambda row: (row.get(col) is None, row.get(col)), reverse=direction == 'desc')
+        return (rows if limit is None else rows[:limit]), len(rows)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    A PostgREST-compatible stand-in for testing the loaders locally.
+
+    Serves bulk inserts, upserts (on_conflict), filtered and ordered
+    selects and filtered deletes under /rest/v1/<table> with keep-alive
+    connections. Faults can be injected: `latency` seconds per
+    request, a `fail_rate` share of 503 replies and a `throttle_rate` share
+    of 429 replies carrying Retry-After. Gzipped request bodies are read
+    unless `accept_gzip` is off, when they get PostgREST's invalid-body
+    400; replies are gzipped for clients that ask. `max_rows` caps the
+    rows of every select, as PostgREST's db-max-rows does, and selects
+    report their range and, under Prefer: count=exact, the total in
+    Content-Range.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, latency=0.0, fail_rate=0.0, throttle_rate=0.0, retry_after=1, seed=0,
+                 accept_gzip=True, max_rows=None):
+        super().__init__(('127.0.0.1', port), StandinHandler)
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.accept_gzip = accept_gzip
+        self.max_rows = max_rows
+        self.bytes_received = 0
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.connections = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def table(self, name):
+        with self.lock:
+            return self.tables.setdefault(name, StandinTable())
+
+    def start(self):
+        """Serve from a background thread; returns the server"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, payload=None, headers=None):
+        data = b'' if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        if len(data) >= MIN_COMPRESS_SIZE and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            data = compress(data)
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def route(self):
+        """The table named in the path and the query parameter pairs, after any injected fault"""
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            roll = server.random.random()
+        if server.latency:
+            time.sleep(server.latency)
+
+        self.body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with server.lock:
+            server.bytes_received += len(self.body)
+        parts = urlsplit(self.path)
+        if not parts.path.startswith(REST_PATH):
+            self.reply(404, {'message': f'no route {parts.path}'})
+            return None, None
+        if roll < server.throttle_rate:
+            self.reply(429, {'message': 'too many requests'}, {'Retry-After': str(server.retry_after)})
+            return None, None
+        if roll < server.throttle_rate + server.fail_rate:
+            self.reply(503, {'message': 'service unavailable'})
+            return None, None
+        encoding = self.headers.get('Content-Encoding')
+        if encoding:
+            if not server.accept_gzip:
+                self.reply(400, {'code': 'PGRST102', 'message': 'Empty or invalid json'})
+                return None, None
+            self.body = decompress(self.body, encoding)
+        return parts.path[len(REST_PATH):], parse_qsl(parts.query)
+
+    def do_POST(self):
+        name, pairs = self.route()
+        if name is None:
+            return
+        params = dict(pairs)
+        records = json.loads(self.body)
+        records = records if isinstance(records, list) else [records]
+        table = self.server.table(name)
+        merge = 'merge-duplicates' in self.headers.get('Prefer', '')
+        with self.server.lock:
+            error = table.write(records, params.get('on_conflict') if merge else None)
+        if error:
+            code, message = error
+            self.reply(409 if code == '23505' else 400, {'code': code, 'message': message})
+        else:
+            self.reply(201)
+
+    def do_GET(self):
+        name, pairs = self.route()
+        if name is None:
+            return
+        params = dict(pairs)
+        table = self.server.table(name)
+        filters = column_filters(pairs)
+        limit = int(params['limit']) if 'limit' in params else None
+        if self.server.max_rows is not None:
+            limit = self.server.max_rows if limit is None else min(limit, self.server.max_rows)
+        with self.server.lock:
+            rows, matched = table.select(filters, params.get('order'), limit)
+        columns = params.get('select', '*')
+        if columns != '*':
+            rows = [{col: row.get(col) for col in columns.split(',')} for row in rows]
+        # As PostgREST: the range returned, with the total only under Prefer: count=exact; 206 for part of it
+        exact = 'count=exact' in self.headers.get('Prefer', '')
+        shown = f"0-{len(rows) - 1}" if rows else '*'
+        total = matched if exact else '*'
+        status = 206 if exact and len(rows) < matched else 200
+        self.reply(status, rows, {'Content-Range': f"{shown}/{total}"})
+
+    def do_DELETE(self):
+        name, pairs = self.route()
+        if name is None:
+            return
+        table = self.server.table(name)
+        with self.server.lock:
+            table.delete(column_filters(pairs))
+        self.reply(204)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve an in-memory PostgREST stand-in for testing uploads locally.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT}).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before every reply.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 503.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429.")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429 replies.")
+    parser.add_argument("--no-gzip", action="store_true", help="Refuse gzipped request bodies, as plain PostgREST does.")
+    parser.add_argument("--max-rows", type=int, help="Most rows any select returns, as PostgREST's db-max-rows (default: no cap).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = StandinServer(
+        args.port, args.latency, args.fail_rate, args.throttle_rate, args.retry_after,
+        accept_gzip=not args.no_gzip, max_rows=args.max_rows,
+    )
+    print(f"🧪 PostgREST stand-in on {server.url} (use it as SUPABASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
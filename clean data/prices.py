@@ -0,0 +1,165 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CURRENCY = 'USD'
+
+# Symbols as they appear in scraped prices, matched in any case; longer ones first so "US$" wins
+# over "$". "kr" is shared by the Nordic crowns and read as Swedish; Norwegian and Danish shops
+# are told apart by their codes
+CURRENCY_SYMBOLS = {
+    'US$': 'USD', 'CA$': 'CAD', 'C$': 'CAD', 'AU$': 'AUD', 'A$': 'AUD',
+    '$': 'USD', '€': 'EUR', '£': 'GBP', '¥': 'JPY', '₩': 'KRW', '₹': 'INR', 'kr': 'SEK',
+}
+SYMBOLS_BY_CURRENCY = {'USD': '$', 'CAD': 'C$', 'AUD': 'A$', 'EUR': '€', 'GBP': '£', 'JPY': '¥', 'KRW': '₩', 'INR': '₹'}
+
+# USD per unit of each currency. A local table, so cleaning never waits on a
+# rates API; refresh it when rates move enough to matter for price filters.
+USD_RATES = {
+    'USD': 1.0,
+    'CAD': 0.73,
+    'AUD': 0.66,
+    'EUR': 1.08,
+    'GBP': 1.27,
+    'JPY': 0.0067,
+    'KRW': 0.00074,
+    'INR': 0.012,
+    'SEK': 0.095,
+    'NOK': 0.093,
+    'DKK': 0.145,
+    'CHF': 1.13,
+}
+
+# ISO 4217 minor-unit exponent of currencies without two decimals; yen and won have no cents
+MINOR_UNITS = {'JPY': 0, 'KRW': 0}
+DEFAULT_MINOR_UNIT = 2
+
+# An amount may start at its decimal point ("$.99") or group thousands with spaces ("1 200,50 €")
+_AMOUNT = r'(?:\d{1,3}(?:[ \u00a0\u202f]\d{3})+(?:[.,]\d+)?|\d[\d,.]*|\.\d+)'
+_SYMBOL = '|'.join(re.escape(symbol) for symbol in sorted(CURRENCY_SYMBOLS, key=len, reverse=True))
+_CODE = '|'.join(USD_RATES)
+# The first amount marked with a currency symbol or code; a bare number only
+# when it is the whole cell, so "3 for $39" reads as $39
+PRICE_PATTERN = re.compile(
+    rf'(?P<symbol>{_SYMBOL})\s*(?P<symbol_amount>{_AMOUNT})'
+    rf'|\b(?P<code>{_CODE})\s*(?P<code_amount>{_AMOUNT})'
+    rf'|(?P<amount_code>{_AMOUNT})\s*(?P<trailing_code>{_CODE})\b'
+    rf'|(?P<amount_symbol>{_AMOUNT})\s*(?P<trailing_symbol>{_SYMBOL})'
+    rf'|^\s*(?P<bare>{_AMOUNT})\s*$',
+    re.IGNORECASE,
+)
+# "45,99" or "1.299,00": a comma before exactly two final digits is the decimal point
+DECIMAL_COMMA = re.compile(r'\d{1,3}(?:\.\d{3})*,\d{2}|\d+,\d{2}')
+# "1.000" or "12,500": in a currency without decimals, separators before groups of three only group thousands
+GROUPED_THOUSANDS = re.compile(r'\d{1,3}(?:[.,]\d{3})+')
+
+
+def parse_prices(prices, default_currency=DEFAULT_CURRENCY):
+    """
+    Parse a column of scraped prices into integer cents and a currency code.
+
+    Returns a frame aligned with `prices` with a nullable Int64 `price_cents`
+    column (hundredths of the currency unit) and a `currency` column holding
+    an ISO 4217 code. Cells without a price are <NA> / None. Unmarked
+    amounts get `default_currency`. Each distinct cell is parsed once.
+    Amounts are rounded to their currency's minor unit, so "¥1000.4" is
+    ¥1000, and "¥1.000" reads as a thousand yen.
+    """
+    codes, uniques = pd.factorize(prices.astype('string'))
+    parsed = _parse_distinct(pd.Series(uniques, dtype='string'), default_currency)
+    # Code -1 (missing) picks the trailing missing entry
+    cents = np.append(parsed['price_cents'].to_numpy(dtype=object, na_value=pd.NA), pd.NA)
+    currencies = np.append(parsed['currency'].to_numpy(dtype=object), None)
+    return pd.DataFrame({
+        'price_cents': pd.array(cents[codes], dtype='Int64'),
+        'currency': currencies[codes],
+    }, index=prices.index)
+
+
+def _parse_distinct(prices, default_currency):
+    text = prices.str.strip()
+    found = text.str.extract(PRICE_PATTERN)
+
+    amounts = (
+        found['symbol_amount'].fillna(found['code_amount']).fillna(found['amount_code'])
+        .fillna(found['amount_symbol']).fillna(found['bare'])
+        .str.rstrip('.,').str.replace(r'\s', '', regex=True)
+    )
+    symbols = found['symbol'].fillna(found['trailing_symbol']).str.upper()
+    codes = found['code'].fillna(found['trailing_code']).str.upper()
+    currencies = codes.fillna(symbols.map({symbol.upper(): code for symbol, code in CURRENCY_SYMBOLS.items()}))
+    currencies = currencies.where(currencies.notna(), default_currency).where(amounts.notna())
+
+    exponents = currencies.map(MINOR_UNITS).fillna(DEFAULT_MINOR_UNIT)
+    grouped = amounts.str.fullmatch(GROUPED_THOUSANDS).fillna(False).astype(bool) & exponents.eq(0)
+    decimal_comma = amounts.str.fullmatch(DECIMAL_COMMA).fillna(False).astype(bool) & ~grouped
+    dot_decimal = amounts.str.replace(',', '', regex=False)
+    comma_decimal = amounts.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    ungrouped = amounts.str.replace(r'[.,]', '', regex=True)
+    text = comma_decimal.where(decimal_comma, dot_decimal).where(~grouped, ungrouped)
+    values = pd.to_numeric(text, errors='coerce')
+    # Round to the minor unit, then count hundredths as for every other currency
+    minor = 10.0 ** exponents
+    cents = (np.round(values * minor) * (100 / minor)).round().astype('Int64')
+    return pd.DataFrame({
+        'price_cents': cents,
+        'currency': currencies.astype(object).where(cents.notna(), None),
+    })
+
+
+def price_to_cents(prices, default_currency=DEFAULT_CURRENCY):
+    """Parse price strings such as "$54", "70.00" or "$1,200" into nullable integer cents"""
+    return parse_prices(prices, default_currency)['price_cents']
+
+
+def to_usd_cents(cents, currencies, rates=USD_RATES):
+    """Convert cents in each row's currency to USD cents using a local rates table"""
+    rate = currencies.map(rates).astype(float)
+    return np.round(cents.astype(float) * rate).astype('Int64')
+
+
+def cents_to_price(cents):
+    """Format integer cents back into "70.00" strings, None where missing"""
+    cents = cents.astype('Int64')
+    formatted = (cents // 100).astype(str) + '.' + (cents % 100).astype(str).str.zfill(2)
+    return formatted.astype(object).where(cents.notna(), None)
+
+
+def usd_display_prices(prices, always_cents=True, default_currency=DEFAULT_CURRENCY):
+    """
+    A column of scraped prices as "$54.00" USD display prices, converted
+    with the local rates table. With `always_cents=False`, whole amounts
+    drop their ".00" ("$54"). Unparseable prices become None.
+    """
+    parsed = parse_prices(prices, default_currency)
+    usd = to_usd_cents(parsed['price_cents'], parsed['currency'])
+    return format_prices(usd, pd.Series(DEFAULT_CURRENCY, index=prices.index), always_cents)
+
+
+@lru_cache(maxsize=65536)
+def usd_display_price(price, always_cents=True):
+    """
+    usd_display_prices for a single scraped price, for the row-wise
+    cleaners. Cached, since a catalog repeats a few hundred prices and a
+    one-row parse costs as much as a few thousand rows.
+    """
+    return usd_display_prices(pd.Series([price], dtype=object), always_cents)[0]
+
+
+def format_prices(cents, currencies, always_cents=True):
+    """
+    Format cents and currency codes as display prices such as "$54.00" or "€45.99".
+
+    With `always_cents=False`, whole amounts drop their ".00" ("$54").
+    Currencies without a minor unit never show decimals ("¥1000").
+    Missing prices become None.
+    """
+    amounts = cents_to_price(cents)
+    whole = (cents // 100).astype(str)
+    if not always_cents:
+        amounts = amounts.where((cents % 100 != 0).fillna(True), whole)
+    amounts = amounts.where(~currencies.map(MINOR_UNITS).eq(0), whole)
+    symbols = currencies.map(SYMBOLS_BY_CURRENCY).fillna(currencies.astype(str) + ' ')
+    return (symbols + amounts).astype(object).where(cents.notna(), None)
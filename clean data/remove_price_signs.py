@@ -1,12 +1,29 @@
 import pandas as pd
 import re
 
+from prices import cents_to_price, parse_prices, to_usd_cents
+
+def strip_price_signs(df):
+    """
+    Drop the "$" from the price column, leaving missing or unparseable prices as they were.
+
+    A bare amount has no currency left, so "€45.99" or "C$20.00" is
+    converted to a "54.00" USD amount first rather than read as dollars later.
+    """
+    prices = df['price']
+    parsed = parse_prices(prices)
+    converted = cents_to_price(to_usd_cents(parsed['price_cents'], parsed['currency']))
+    dollars = parsed['currency'] == 'USD'
+    df['price'] = prices.where(~dollars, prices.astype(str).str.replace('$', '', regex=False))
+    df['price'] = df['price'].where(dollars | converted.isna(), converted)
+    return df
+
 def remove_price_signs():
     # Read the cleaned products CSV
     df = pd.read_csv('cleaned_products.csv')
     
     # Remove dollar signs from price column
-    df['price'] = df['price'].astype(str).str.replace('$', '', regex=False)
+    df = strip_price_signs(df)
     
     # Save the updated data
     df.to_csv('cleaned_products.csv', index=False)
@@ -1,12 +1,14 @@
 import pandas as pd
 import re
 
+from remove_price_signs import strip_price_signs
+
 def remove_revolve_price_signs():
     # Read the cleaned Revolve products CSV
     df = pd.read_csv('cleaned_revolve_products.csv')
     
     # Remove dollar signs from price column
-    df['price'] = df['price'].astype(str).str.replace('$', '', regex=False)
+    df = strip_price_signs(df)
     
     # Save the updated data
     df.to_csv('cleaned_revolve_products.csv', index=False)
@@ -0,0 +1,180 @@
+import argparse
+
+import pandas as pd
+
+from catalog_loader import (
+    COLUMN_LIMITS,
+    CONFLICT_COLUMN,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_KEY_ENV,
+    DEFAULT_REJECT_FILE,
+    DEFAULT_TABLE,
+    LOAD_MODES,
+    RejectFile,
+    frame_records,
+    open_loader,
+    with_retries,
+)
+from retailers import canonical_url
+
+# Urls per existence lookup; urls are long, so fewer per request than hashes
+URL_LOOKUP_SIZE = 100
+
+
+def row_problems(df, limits=COLUMN_LIMITS):
+    """Why each row would be refused again, '' for rows that look loadable"""
+    problems = pd.Series('', index=df.index, dtype=object)
+    for col, limit in limits.items():
+        if col in df.columns:
+            lengths = df[col].map(lambda value: len(value) if isinstance(value, str) else 0)
+            problems[lengths.gt(limit) & problems.eq('')] = f"{col} longer than {limit} characters"
+    return problems
+
+
+def quoted(value):
+    """A value quoted for a PostgREST in.(...) list, so commas in urls survive"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def existing_urls(loader, urls):
+    """The subset of `urls` already in the table"""
+    urls = list(urls)
+    found = set()
+    for start in range(0, len(urls), URL_LOOKUP_SIZE):
+        chunk = ','.join(map(quoted, urls[start:start + URL_LOOKUP_SIZE]))
+        rows = with_retries(
+            lambda: loader.session.select(loader.table, CONFLICT_COLUMN, **{CONFLICT_COLUMN: f"in.({chunk})"}),
+            retries=loader.retries,
+        )
+        found.update(row[CONFLICT_COLUMN] for row in rows)
+    return found
+
+
+def recorded_mode(entries):
+    """upsert if any of the rows was refused in an upsert, else insert"""
+    return 'upsert' if any(entry.get('mode') == 'upsert' for entry in entries) else 'insert'
+
+
+def replay_rejects(loader, dead_letters, dry_run=False):
+    """
+    Re-validate the dead letters of loader.table and resubmit the valid ones in bulk.
+
+    Every row is cleaned again, so rows fixed by hand in the file are
+    normalised like a fresh load. Rows that would be refused again stay
+    dead without a request: values longer than their column and, in
+    insert mode, urls the table already holds. The rest go through the
+    loader's adaptive batches and bisection, so the replay costs requests
+    in proportion to the dead letters, not the catalog. Rows whose url is
+    a variant of another dead letter's are not sent; they stay dead,
+    naming the url replayed in their place. The dead-letter file is then
+    rewritten to hold only what is still dead, with the new error for
+    rows refused again. `loader.rejects` must be a scratch file other
+    than `dead_letters`; it is emptied before the replay. Returns the
+    entries still dead.
+    """
+    entries = dead_letters.entries()
+    others = [entry for entry in entries if entry.get('table', loader.table) != loader.table]
+    pending = [entry for entry in entries if entry.get('table', loader.table) == loader.table]
+    if not pending:
+        print(f"✨ No dead letters for {loader.table} in {dead_letters.path}")
+        return others
+
+    # The prepared frame keeps the pending positions as its index
+    df = loader.prepare(pd.DataFrame([entry['row'] for entry in pending]))
+    problems = row_problems(df)
+    if loader.mode == 'insert' and CONFLICT_COLUMN in df.columns:
+        taken = df[CONFLICT_COLUMN].isin(existing_urls(loader, df[CONFLICT_COLUMN].dropna().unique())) & problems.eq('')
+        problems[taken] = f"{CONFLICT_COLUMN} already in the table; replay with --mode upsert to update it"
+    ready = df[problems.eq('')]
+
+    # Rows prepare collapsed into another dead letter's url, named by the url it was replayed under
+    def product(i):
+        return canonical_url(pending[i]['row'][CONFLICT_COLUMN], pending[i]['row'].get('color') or '')
+
+    replayed_as = {product(i): df.at[i, CONFLICT_COLUMN] for i in df.index if df.at[i, CONFLICT_COLUMN]}
+    problems = problems.reindex(range(len(pending)))
+    for i in problems.index[problems.isna()]:
+        problems[i] = f"{CONFLICT_COLUMN} is a variant of {replayed_as.get(product(i))}, which another dead letter replays"
+    print(f"🔁 {len(pending)} dead letters for {loader.table}: {len(ready)} to resubmit, "
+          f"{len(pending) - len(ready)} still invalid")
+    for reason, count in problems[problems.ne('')].value_counts().items():
+        print(f"  ⚠️  {count} × {reason}")
+    if dry_run:
+        return entries
+
+    still = [{**pending[i], 'replay_error': problems[i]} for i in problems.index[problems.ne('')]]
+    refused = loader.rejects
+    # Left over from an interrupted replay, those would be taken for this replay's rejects
+    refused.replace([])
+    loader.source = dead_letters.path
+    loader.load_records(frame_records(ready))
+
+    # Rejects of the replay point at replay positions; put back each row's origin
+    again = []
+    for entry in refused.entries():
+        origin = pending[ready.index[entry['position']]]
+        again.append({
+            **entry,
+            'source': origin.get('source'),
+            'position': origin.get('position'),
+            'replays': origin.get('replays', 0) + 1,
+        })
+    refused.replace([])
+
+    remaining = others + still + again
+    dead_letters.replace(remaining)
+    print(f"✅ Replayed {loader.rows_loaded + loader.rows_unchanged} of {len(pending)} dead letters; "
+          f"{len(still) + len(again)} left in {dead_letters.path}")
+    return remaining
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-validate and resubmit the rows an upload rejected.")
+    parser.add_argument(
+        "--reject-file",
+        default=DEFAULT_REJECT_FILE,
+        help=f"Dead-letter file written by the uploads (default: {DEFAULT_REJECT_FILE}).",
+    )
+    parser.add_argument("--table", default=DEFAULT_TABLE, help=f"Replay the rows refused by this table (default: {DEFAULT_TABLE}).")
+    parser.add_argument(
+        "--mode",
+        choices=LOAD_MODES,
+        help="insert or upsert (default: upsert if any row was refused in an upsert, else insert).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows in the first request (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Requests in flight at once (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be resubmitted.")
+    parser.add_argument("--key-env", default=DEFAULT_KEY_ENV, help=f"Environment variable holding the API key (default: {DEFAULT_KEY_ENV}).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    dead_letters = RejectFile(args.reject_file)
+    pending = [entry for entry in dead_letters.entries() if entry.get('table', args.table) == args.table]
+    loader = open_loader(
+        args.key_env,
+        table=args.table,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        mode=args.mode or recorded_mode(pending),
+        rejects=RejectFile(f"{args.reject_file}.replay"),
+        # Replays are small and rewrite the dead-letter file instead
+        journal=None,
+    )
+    if loader is None:
+        raise SystemExit(1)
+    remaining = replay_rejects(loader, dead_letters, args.dry_run)
+    if not args.dry_run and any(entry.get('table', args.table) == args.table for entry in remaining):
+        raise SystemExit(1)
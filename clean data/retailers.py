@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+
+import pandas as pd
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# scheme://[user@]host — the host is the first capture group
+HOST_PATTERN = re.compile(r'^[a-z][a-z0-9+.-]*://(?:[^/?#@]*@)?([^/?#:]+)', re.IGNORECASE)
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'srsltid'}
+TRACKING_PREFIXES = ('utm_',)
+
+RETAILERS_BY_DOMAIN = {}
+RETAILERS_BY_NAME = {}
+
+
+class Retailer:
+    """
+    A retailer whose scrape exports we know how to clean.
+
+    `columns` maps field names to column positions in the export and
+    `patterns` holds the regexes its extractors use, compiled once here.
+    `canonicalize`, if given, rewrites the split product URL so every
+    variant of one product maps to the same canonical URL; it also gets
+    the row's colour, for retailers that put the colourway in the path.
+    """
+
+    def __init__(self, name, domains, columns, patterns, extract_row, extract_columns, canonicalize=None):
+        self.name = name
+        self.domains = [domain.lower() for domain in domains]
+        self.columns = dict(columns)
+        self.patterns = {key: re.compile(pattern) for key, pattern in patterns.items()}
+        self._extract_row = extract_row
+        self._extract_columns = extract_columns
+        self._canonicalize = canonicalize
+
+    def extract_row(self, row, url):
+        """Extract one product dict from a row of the export"""
+        return self._extract_row(row, url, self)
+
+    def extract_columns(self, rows, urls):
+        """Extract a product frame from a group of rows of the export"""
+        return self._extract_columns(rows, urls, self)
+
+    def canonicalize(self, parts, color=''):
+        """Apply the retailer's URL rule to a urlsplit() result"""
+        if self._canonicalize is None:
+            return parts
+        return self._canonicalize(parts, self, color)
+
+    def __repr__(self):
+        return f"Retailer({self.name!r}, domains={self.domains!r})"
+
+
+def register_retailer(name, domains, columns, patterns, extract_row, extract_columns, canonicalize=None):
+    """Register a retailer under each of its registrable domains"""
+    retailer = Retailer(name, domains, columns, patterns, extract_row, extract_columns, canonicalize)
+    for domain in retailer.domains:
+        RETAILERS_BY_DOMAIN[domain] = retailer
+    RETAILERS_BY_NAME[name] = retailer
+    retailer_for_host.cache_clear()
+    canonical_url.cache_clear()
+    return retailer
+
+
+def hostname_from_url(url):
+    """Lower-cased hostname of a URL, or None if it has none"""
+    match = HOST_PATTERN.match(url)
+    return match.group(1).lower() if match else None
+
+
+@lru_cache(maxsize=4096)
+def retailer_for_host(host):
+    """
+    Find the retailer for a hostname with dict lookups on its parent domains.
+
+    shop.lululemon.com is looked up as shop.lululemon.com, then lululemon.com,
+    so the cost depends on the number of labels, not the number of retailers.
+    """
+    if not host:
+        return None
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        retailer = RETAILERS_BY_DOMAIN.get('.'.join(labels[i:]))
+        if retailer is not None:
+            return retailer
+    return None
+
+
+def find_retailer(url):
+    """Find the retailer for a product URL"""
+    return retailer_for_host(hostname_from_url(url))
+
+
+def retailer_names(urls):
+    """Retailer name for every URL in a column, 'Unknown' where none is registered"""
+    hosts = urls.str.extract(HOST_PATTERN, expand=False).str.lower()
+
+    # One registry lookup per distinct host
+    names = {}
+    for host in hosts.dropna().unique():
+        retailer = retailer_for_host(host)
+        names[host] = retailer.name if retailer else 'Unknown'
+
+    return hosts.map(names).fillna('Unknown')
+
+
+def is_tracking_param(key):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+@lru_cache(maxsize=65536)
+def canonical_url(url, color=''):
+    """
+    Canonical form of a product URL.
+
+    The scheme and host are lower-cased, the fragment and tracking
+    parameters are dropped and the remaining parameters sorted; then the
+    retailer's own rule, if any, strips whatever else varies between
+    variants of one product (the `color` slug, listing-page parameters).
+    """
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not is_tracking_param(key))
+    parts = parts._replace(
+        scheme=parts.scheme.lower(),
+        netloc=parts.netloc.lower(),
+        query=urlencode(query),
+        fragment='',
+    )
+    retailer = retailer_for_host(parts.hostname)
+    if retailer is not None:
+        parts = retailer.canonicalize(parts, color)
+    return urlunsplit(parts)
+
+
+def canonical_urls(urls, colors=None):
+    """Canonical URL for every URL in a column, and the row's colour if given, canonicalizing each distinct pair once"""
+    if colors is None:
+        canonical = {url: canonical_url(url) for url in urls.dropna().unique()}
+        return urls.map(canonical)
+    pairs = pd.Series(list(zip(urls, colors.where(colors.notna(), '').astype(str))), index=urls.index)
+    pairs = pairs[urls.notna()]
+    canonical = {pair: canonical_url(*pair) for pair in pairs.unique()}
+    return pairs.map(canonical).reindex(urls.index)
@@ -1,8 +1,24 @@
+import argparse
 import pandas as pd
 import re
 from datetime import datetime
 import uuid
 
+from prices import usd_display_price, usd_display_prices
+from keyword_tagger import CATEGORY_KEYWORDS, KeywordTagger
+from streaming import DEFAULT_CHUNK_SIZE, CsvAppender, SeenKeys, peak_memory_mb, read_csv_chunks
+
+# Columns of cleaned_revolve_products.csv, in output order (without color)
+EXPECTED_COLUMNS = [
+    'brand', 'name', 'fabric', 'price', 'url', 'image', 'category', 
+    'source', 'description', 'created_at', 'updated_at', 'title', 
+    'image_url'
+]
+
+PRODUCT_ID_PATTERN = re.compile(r'/dp/([A-Z]+-[A-Z0-9]+)/')
+WHITESPACE = re.compile(r'\s+')
+CATEGORY_TAGGER = KeywordTagger({'category': CATEGORY_KEYWORDS})
+
 def clean_revolve_data(input_file, output_file):
     """
     Clean and transform Revolve product data from Sheet4
@@ -15,89 +31,7 @@ def clean_revolve_data(input_file, output_file):
     print(f"Original data shape: {df.shape}")
     print(f"Original columns: {list(df.columns)}")
     
-    # Clean the data
-    cleaned_data = []
-    
-    for index, row in df.iterrows():
-        try:
-            # Extract product ID from URL
-            url = row['js-plp-pdp-link href']
-            product_id = extract_product_id(url)
-            
-            # Clean price - keep as string to match table schema
-            price_str = str(row['plp_price']).strip()
-            price = clean_price_string(price_str)
-            
-            # Clean brand name
-            brand = clean_text(str(row['product-brand']))
-            
-            # Clean product name
-            name = clean_text(str(row['product-name']))
-            
-            # Extract image URL
-            image_url = str(row['plp-image src'])
-            if image_url == 'nan' or 'data:image/gif' in image_url:
-                image_url = None
-            
-            # Determine category based on product name
-            category = determine_category(name)
-            
-            # Create description
-            description = f"{brand} {name}"
-            
-            # Create title
-            title = f"{brand} {name}"
-            
-            # Create cleaned record - match exact table schema (without color)
-            cleaned_record = {
-                'brand': brand,
-                'name': name,
-                'fabric': None,  # Not available in this data
-                'price': price,
-                'url': url,
-                'image': image_url,
-                'category': category,
-                'source': 'Revolve',
-                'description': description,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat(),
-                'title': title,
-                'image_url': image_url
-            }
-            
-            cleaned_data.append(cleaned_record)
-            
-        except Exception as e:
-            print(f"Error processing row {index}: {e}")
-            continue
-    
-    # Create DataFrame
-    cleaned_df = pd.DataFrame(cleaned_data)
-    
-    # Remove duplicates based on brand + name combination
-    cleaned_df = cleaned_df.drop_duplicates(subset=['brand', 'name'])
-    
-    # Remove rows with missing essential data
-    cleaned_df = cleaned_df.dropna(subset=['brand', 'name', 'price'])
-    
-    # Ensure all columns exist and are in the correct order (without color)
-    expected_columns = [
-        'brand', 'name', 'fabric', 'price', 'url', 'image', 'category', 
-        'source', 'description', 'created_at', 'updated_at', 'title', 
-        'image_url'
-    ]
-    
-    # Add missing columns with None values
-    for col in expected_columns:
-        if col not in cleaned_df.columns:
-            cleaned_df[col] = None
-    
-    # Reorder columns to match table schema
-    cleaned_df = cleaned_df[expected_columns]
-    
-    # Convert price to string if it's numeric
-    if 'price' in cleaned_df.columns:
-        cleaned_df['price'] = cleaned_df['price'].astype(str)
+    cleaned_df = clean_revolve_frame(df)
     
     print(f"Cleaned data shape: {cleaned_df.shape}")
     print(f"Cleaned columns: {list(cleaned_df.columns)}")
@@ -112,13 +46,116 @@ def clean_revolve_data(input_file, output_file):
     
     return cleaned_df
 
+def clean_revolve_data_streaming(input_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Clean Revolve data chunk by chunk, appending each cleaned chunk to the output.
+    
+    Duplicates across chunks are dropped with a compact set of (brand, name)
+    key hashes, so only that set grows with the input, not the rows.
+    """
+    print(f"Streaming data from {input_file} in chunks of {chunk_size} rows...")
+    
+    timestamp = datetime.now().isoformat()
+    seen = SeenKeys(['brand', 'name'])
+    output = CsvAppender(output_file)
+    
+    for chunk in read_csv_chunks(input_file, chunk_size):
+        cleaned_chunk = build_revolve_frame(chunk, timestamp)
+        cleaned_chunk = cleaned_chunk.drop_duplicates(subset=['brand', 'name'])
+        cleaned_chunk = seen.drop_seen(cleaned_chunk)
+        output.write(finalize_revolve_frame(cleaned_chunk))
+    
+    # Empty input still gets a header
+    if not output.started:
+        output.write(pd.DataFrame(columns=EXPECTED_COLUMNS))
+    
+    print(f"Cleaned data saved to {output_file}")
+    print(f"Cleaned rows: {output.rows_written} ({len(seen)} distinct brand/name keys)")
+    
+    return output.rows_written
+
+def clean_revolve_frame(df, timestamp=None):
+    """
+    Clean a frame of raw Revolve listings with whole-column operations.
+    
+    Every row in the batch is stamped with the same timestamp.
+    """
+    cleaned_df = build_revolve_frame(df, timestamp)
+    
+    # Remove duplicates based on brand + name combination
+    cleaned_df = cleaned_df.drop_duplicates(subset=['brand', 'name'])
+    
+    return finalize_revolve_frame(cleaned_df)
+
+def build_revolve_frame(df, timestamp=None):
+    """Map raw Revolve listing columns onto the products schema, before deduplication"""
+    if timestamp is None:
+        timestamp = datetime.now().isoformat()
+    
+    brand = clean_text_column(df['product-brand'])
+    name = clean_text_column(df['product-name'])
+    
+    # Drop placeholder gifs and missing images
+    image_url = df['plp-image src'].astype(str)
+    image_url = image_url.where(
+        (image_url != 'nan') & ~image_url.str.contains('data:image/gif', regex=False),
+        None
+    )
+    
+    # Description and title are "<brand> <name>"
+    title = brand.fillna('None') + ' ' + name.fillna('None')
+    
+    return pd.DataFrame({
+        'brand': brand,
+        'name': name,
+        'fabric': None,  # Not available in this data
+        'price': clean_price_column(df['plp_price']),
+        'url': df['js-plp-pdp-link href'],
+        'image': image_url,
+        'category': determine_category_column(name),
+        'source': 'Revolve',
+        'description': title,
+        'created_at': timestamp,
+        'updated_at': timestamp,
+        'title': title,
+        'image_url': image_url
+    }, index=df.index)
+
+def finalize_revolve_frame(cleaned_df):
+    """Drop incomplete rows and put columns in table order"""
+    # Remove rows with missing essential data
+    cleaned_df = cleaned_df.dropna(subset=['brand', 'name', 'price'])
+    
+    # Reorder columns to match table schema
+    cleaned_df = cleaned_df[EXPECTED_COLUMNS]
+    
+    # Convert price to string if it's numeric
+    cleaned_df['price'] = cleaned_df['price'].astype(str)
+    
+    return cleaned_df
+
+def clean_price_column(prices):
+    """Clean a column of prices into "$0.00" USD strings, None where unparseable"""
+    return usd_display_prices(prices)
+
+def clean_text_column(texts):
+    """Collapse whitespace in a text column, None for missing values"""
+    missing = texts.isna()
+    texts = texts.astype(str)
+    cleaned = texts.str.strip().str.replace(WHITESPACE, ' ', regex=True)
+    return cleaned.where(~missing & (texts != 'nan'), None)
+
+def determine_category_column(names):
+    """Determine the category of every product name in a column"""
+    return CATEGORY_TAGGER.first_label_column(names, 'category', default='Clothing')
+
 def extract_product_id(url):
     """Extract product ID from Revolve URL"""
     if pd.isna(url) or url == 'nan':
         return str(uuid.uuid4())
     
     # Try to extract from URL pattern like /product-name/dp/PRODUCT-ID/
-    match = re.search(r'/dp/([A-Z]+-[A-Z0-9]+)/', url)
+    match = PRODUCT_ID_PATTERN.search(url)
     if match:
         return match.group(1)
     
@@ -127,20 +164,9 @@ def extract_product_id(url):
 
 def clean_price_string(price_str):
     """Clean price and return as string to match table schema"""
-    if pd.isna(price_str) or price_str == 'nan':
-        return None
-    
-    # Remove $ and any other non-numeric characters except decimal point
-    price_clean = re.sub(r'[^\d.]', '', str(price_str))
-    
-    try:
-        if price_clean:
-            # Convert to float first to validate, then back to string
-            price_float = float(price_clean)
-            return f"${price_float:.2f}"
-        return None
-    except ValueError:
+    if pd.isna(price_str):
         return None
+    return usd_display_price(price_str)
 
 def clean_text(text):
     """Clean text by removing extra whitespace and special characters"""
@@ -148,7 +174,7 @@ def clean_text(text):
         return None
     
     # Remove extra whitespace
-    cleaned = re.sub(r'\s+', ' ', str(text).strip())
+    cleaned = WHITESPACE.sub(' ', str(text).strip())
     return cleaned
 
 def determine_category(product_name):
@@ -156,30 +182,37 @@ def determine_category(product_name):
     if pd.isna(product_name):
         return 'Clothing'
     
-    name_lower = product_name.lower()
-    
-    # Category keywords
-    categories = {
-        'Dress': ['dress', 'gown'],
-        'Top': ['top', 'shirt', 'blouse', 'cami', 'tank', 'corset', 'vest', 'halter'],
-        'Bottom': ['pant', 'jean', 'short', 'skirt', 'trouser', 'capri'],
-        'Swimwear': ['bikini', 'swim', 'bathing'],
-        'Activewear': ['sport', 'athletic', 'workout', 'gym'],
-        'Outerwear': ['jacket', 'coat', 'blazer', 'cardigan', 'sweater'],
-        'Lingerie': ['bra', 'underwear', 'lingerie', 'intimate'],
-        'Accessories': ['bag', 'purse', 'wallet', 'jewelry', 'scarf', 'hat']
-    }
-    
-    for category, keywords in categories.items():
-        for keyword in keywords:
-            if keyword in name_lower:
-                return category
-    
-    return 'Clothing'  # Default category
+    categories = CATEGORY_TAGGER.tag(product_name)['category']
+    return categories[0] if categories else 'Clothing'  # Default category
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Clean a Revolve listing export.")
+    parser.add_argument(
+        "input_file",
+        nargs="?",
+        default="Dupes I like - Sheet4.csv",
+        help="Revolve export to clean.",
+    )
+    parser.add_argument(
+        "output_file",
+        nargs="?",
+        default="cleaned_revolve_products.csv",
+        help="Where to write the cleaned CSV.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Stream the export in chunks of this many rows instead of loading it whole.",
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    input_file = "Dupes I like - Sheet4.csv"
-    output_file = "cleaned_revolve_products.csv"
-    
-    cleaned_data = clean_revolve_data(input_file, output_file)
-    print(f"\nSuccessfully cleaned {len(cleaned_data)} products!") 
\ No newline at end of file
+    args = parse_args()
+    
+    if args.chunk_size:
+        cleaned_count = clean_revolve_data_streaming(args.input_file, args.output_file, args.chunk_size)
+        print(f"Peak memory: {peak_memory_mb():.1f} MB")
+    else:
+        cleaned_count = len(clean_revolve_data(args.input_file, args.output_file))
+    print(f"\nSuccessfully cleaned {cleaned_count} products!")
@@ -1,28 +1,21 @@
-import pandas as pd
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-import json
 
-# Load environment variables
-load_dotenv()
+from catalog_loader import PRESETS, open_loader, prepare_frame
+
+PRESET = PRESETS['products']
+
+# Kept under its old name for callers of this script
+clean_data_for_supabase = prepare_frame
 
 def create_table_in_supabase():
     """
     Create the products table in Supabase
     """
     try:
-        # Supabase configuration
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("❌ Error: Missing Supabase credentials!")
+        loader = open_loader(PRESET['key_env'])
+        if loader is None:
             return False
         
-        # Initialize Supabase client
-        supabase: Client = create_client(supabase_url, supabase_key)
-        
         # SQL to create the table
         create_table_sql = """
         CREATE TABLE IF NOT EXISTS products (
@@ -45,7 +38,7 @@ def create_table_in_supabase():
         """
         
         print("🔨 Creating products table in Supabase...")
-        result = supabase.rpc('exec_sql', {'sql': create_table_sql}).execute()
+        loader.session.rpc('exec_sql', {'sql': create_table_sql})
         print("✅ Table created successfully!")
         return True
         
@@ -54,80 +47,20 @@ def create_table_in_supabase():
         print("Note: You may need to create the table manually in the Supabase dashboard")
         return False
 
-def clean_data_for_supabase(df):
-    """
-    Clean and prepare data for Supabase upload
-    """
-    # Create a copy of the dataframe
-    df_clean = df.copy()
-    
-    # Remove the 'id' column since Supabase will auto-generate it
-    if 'id' in df_clean.columns:
-        df_clean = df_clean.drop('id', axis=1)
-    
-    # Clean up text fields - remove newlines and extra spaces
-    text_columns = ['name', 'title', 'description']
-    for col in text_columns:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].astype(str).str.replace('\n', ' ').str.replace('\r', ' ').str.strip()
-    
-    # Convert empty strings to None for better database handling
-    df_clean = df_clean.replace('', None)
-    
-    return df_clean
-
 def upload_to_supabase(csv_file, table_name="products"):
     """
     Upload cleaned CSV data to Supabase
     """
     try:
-        # Supabase configuration
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("❌ Error: Missing Supabase credentials!")
+        loader = open_loader(PRESET['key_env'], table=table_name)
+        if loader is None:
             return False
         
-        # Initialize Supabase client
-        supabase: Client = create_client(supabase_url, supabase_key)
-        
-        # Read the CSV file
-        print(f"📖 Reading CSV file: {csv_file}")
-        df = pd.read_csv(csv_file)
-        
-        # Clean the data for upload
-        print("🧹 Cleaning data for upload...")
-        df_clean = clean_data_for_supabase(df)
-        
-        # Convert DataFrame to list of dictionaries
-        records = df_clean.to_dict('records')
-        
-        print(f"📊 Found {len(records)} products to upload")
-        
-        # Upload data to Supabase
         print(f"🚀 Uploading to Supabase table: {table_name}")
+        successful_uploads = loader.load_file(csv_file)
         
-        # Try uploading all at once first
-        try:
-            result = supabase.table(table_name).insert(records).execute()
-            print(f"🎉 Successfully uploaded all {len(records)} products to Supabase!")
-            return True
-        except Exception as bulk_error:
-            print(f"Bulk upload failed, trying individual uploads: {bulk_error}")
-            
-            # If bulk upload fails, try individual uploads
-            successful_uploads = 0
-            for i, record in enumerate(records):
-                try:
-                    result = supabase.table(table_name).insert(record).execute()
-                    successful_uploads += 1
-                    print(f"✅ Uploaded product {i + 1}/{len(records)}")
-                except Exception as single_error:
-                    print(f"❌ Failed to upload product {i + 1}: {single_error}")
-            
-            print(f"🎉 Successfully uploaded {successful_uploads}/{len(records)} products to Supabase!")
-            return successful_uploads > 0
+        print(f"🎉 Successfully uploaded {successful_uploads}/{successful_uploads + loader.rows_failed} products to Supabase!")
+        return successful_uploads > 0
         
     except Exception as e:
         print(f"❌ Error uploading to Supabase: {e}")
@@ -138,17 +71,11 @@ def test_connection():
     Test the Supabase connection
     """
     try:
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("❌ Error: Missing Supabase credentials!")
+        loader = open_loader(PRESET['key_env'])
+        if loader is None:
             return False
         
-        supabase: Client = create_client(supabase_url, supabase_key)
-        
-        # Try a simple query to test connection
-        result = supabase.table('products').select('*').limit(1).execute()
+        loader.check_table()
         print("✅ Supabase connection successful!")
         return True
         
@@ -1,54 +1,24 @@
-import pandas as pd
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from catalog_loader import PRESETS, open_loader
+
+PRESET = PRESETS['products']
 
 def upload_products():
     """
     Simple upload script for products
     """
     try:
-        # Supabase configuration
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("❌ Error: Missing Supabase credentials!")
+        loader = open_loader(PRESET['key_env'])
+        if loader is None:
             return False
         
-        # Initialize Supabase client
-        supabase: Client = create_client(supabase_url, supabase_key)
-        
-        # Read the CSV file
-        print("📖 Reading cleaned_products.csv...")
-        df = pd.read_csv("cleaned_products.csv")
-        
-        # Remove the id column (let Supabase auto-generate)
-        if 'id' in df.columns:
-            df = df.drop('id', axis=1)
-        
-        # Clean up text fields
-        df['name'] = df['name'].astype(str).str.replace('\n', ' ').str.strip()
-        df['title'] = df['title'].astype(str).str.replace('\n', ' ').str.strip()
-        
-        # Convert empty strings to None
-        df = df.replace('', None)
-        
-        # Convert to records
-        records = df.to_dict('records')
-        
-        print(f"📊 Preparing to upload {len(records)} products...")
-        
-        # Upload all records at once
-        result = supabase.table('products').insert(records).execute()
+        uploaded = loader.load_file(PRESET['files'][0])
         
-        print(f"🎉 Successfully uploaded {len(records)} products to Supabase!")
+        print(f"🎉 Successfully uploaded {uploaded} products to Supabase!")
         print("✅ Check your Supabase dashboard to see the data!")
         
-        return True
+        return loader.rows_failed == 0
         
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -72,4 +42,4 @@ if __name__ == "__main__":
             print("\n🎉 Upload successful!")
             print("📱 Go to your Supabase dashboard > Table Editor > products")
         else:
-            print("\n❌ Upload failed. Please check the troubleshooting steps above.") 
\ No newline at end of file
+            print("\n❌ Upload failed. Please check the troubleshooting steps above.")
@@ -0,0 +1,91 @@
+import resource
+import sys
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def read_csv_chunks(input_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read a scrape export in fixed-size chunks.
+
+    Every cell is read as a string so a chunk's dtypes do not depend on
+    which rows happen to land in it.
+    """
+    return pd.read_csv(input_file, chunksize=chunk_size, dtype=str)
+
+
+class CsvAppender:
+    """Write frames to one CSV file, with the header only on the first write"""
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.rows_written = 0
+        self.started = False
+
+    def write(self, df):
+        df.to_csv(
+            self.output_file,
+            mode='a' if self.started else 'w',
+            header=not self.started,
+            index=False,
+        )
+        self.started = True
+        self.rows_written += len(df)
+
+
+class SeenKeys:
+    """
+    Compact set of row keys seen in earlier chunks.
+
+    Keys are stored as 64-bit hashes, so memory is O(unique keys) at 8
+    bytes per key regardless of how long the brand and name strings are.
+    New keys go into sorted runs that are merged like the digits of a
+    binary counter: a run is merged into the one before it once it is as
+    large, so there are at most log2(keys) runs and each key is copied
+    O(log keys) times over the whole stream, instead of the whole set
+    being rebuilt for every chunk.
+    """
+
+    def __init__(self, subset):
+        self.subset = subset
+        # Sorted, disjoint runs of hashes, largest first
+        self.runs = []
+
+    def drop_seen(self, df):
+        """Drop rows whose key appeared in an earlier chunk and remember the rest"""
+        hashes = key_hashes(df, self.subset)
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes)
+            in_range = positions < len(run)
+            seen[in_range] |= run[positions[in_range]] == hashes[in_range]
+
+        self._add(np.unique(hashes[~seen]))
+        return df[~seen]
+
+    def _add(self, run):
+        while self.runs and len(self.runs[-1]) <= len(run):
+            # Disjoint sorted runs; the stable sort merges them in linear time
+            run = np.sort(np.concatenate([self.runs.pop(), run]), kind='stable')
+        if len(run):
+            self.runs.append(run)
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+
+def key_hashes(df, subset):
+    """64-bit hash of the `subset` columns of every row"""
+    return pd.util.hash_pandas_object(df[subset], index=False).to_numpy()
+
+
+def peak_memory_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
@@ -0,0 +1,265 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# Rows generated and written per block, so 10M-row exports never sit in memory
+BLOCK_ROWS = 100_000
+
+REVOLVE_BRANDS = [
+    "LEVI'S", 'LIONESS', 'AGOLDE', 'superdown', 'SAYLOR', 'ASTR the Label',
+    'Show Me Your Mumu', 'LSPACE', 'Free People', 'Lovers and Friends',
+    'Camila Coelho', 'MORE TO COME', 'Tularosa', 'GRLFRND', 'Steve Madden',
+]
+STYLE_NAMES = [
+    'Blythe', 'Darian', 'Jasmine', 'Martine', 'Parker', 'Leo', 'Original Sin',
+    'Make Waves', 'Harlow', 'Sienna', 'Delilah', 'Margot', 'Ivy', 'Juno',
+]
+ADJECTIVES = ['Mini', 'Midi', 'Maxi', 'Cropped', 'High Rise', 'Ribbed', 'Linen', 'Satin', 'Lace', 'Knit']
+GARMENTS = [
+    'Dress', 'Top', 'Short', 'Skirt', 'Pant', 'Jean', 'Bikini Top', 'Cardigan',
+    'Blazer', 'Bodysuit', 'Tank', 'Sweater', 'Jacket', 'Bag', 'Corset',
+]
+REVOLVE_HEADER = [
+    'js-plp-pdp-link href', 'plp-image src', 'product-name', 'product-brand', 'plp_price',
+    'pill-badges href', 'image-badge__text', 'u-screen-reader', 'image-hover__btn',
+    'image-hover__btn href', 'product-swatches__image src', 'product-swatches__image src 2',
+    'js-swatch-toggle-text', 'u-screen-reader 2',
+]
+PLACEHOLDER_IMAGE = 'data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=='
+PLP_SRC = '%2Fr%2FBrands.jsp%3FaliasURL%3Dclothing%2Fbr%2F3699fc%26s%3Dc%26c%3DClothing'
+
+SKIMS_COLLECTIONS = ['FITS EVERYBODY', 'COTTON RIB', 'SIGNATURE SWIM', 'SKIMS ULTIMATE', 'COTTON FLEECE', 'SOFT LOUNGE']
+SKIMS_ITEMS = ['T-SHIRT BRA', 'THONG', 'TANK', 'BOXER', 'BODYSUIT', 'TRIANGLE BIKINI TOP', 'STRAIGHT LEG PANT', 'LONG SLIP DRESS']
+SKIMS_COLORS = ['onyx', 'clay', 'ruby', 'sand', 'mica', 'cocoa', 'sienna', 'jasper', 'snow-strawberry-print']
+SKIMS_HEADER = [
+    'select-none href', 'inline-block src', 'inline-block src 2', 'sr-only', 'sr-only 2', 'sr-only 3',
+    'sr-only 4', 'sr-only 5', 'sr-only 6', 'sr-only 7', 'sr-only 8', 'sr-only 9', 'sr-only 10',
+    'label-4', 'text-brown', 'Price', 'flex', 'absolute src', 'absolute src 2', 'sr-only 11', 'sr-only 12',
+]
+
+LULULEMON_STYLES = [
+    ('women-tanks', 'Swiftly Tech Racerback Tank Top 2.0'), ('womens-leggings', 'Align High-Rise Pant 25"'),
+    ('women-shorts', 'Hotty Hot High-Rise Short'), ('jackets-and-hoodies-jackets', 'Define Jacket Nulu'),
+    ('tops-short-sleeve', 'Swiftly Tech Short-Sleeve Shirt 2.0'), ('women-sports-bras', 'Energy Bra'),
+]
+LULULEMON_LENGTHS = ['Waist Length', 'Hip Length', '', '']
+FABRICS = ['76% polyamide / 24% elastane', '81% Nylon, 19% Lycra', '100% cotton', '88% polyester, 12% spandex']
+LULULEMON_HEADER = [
+    'link href', 'color-swatch_colorSwatchImg__dndG_ src', 'color-swatch_colorSwatchImg__dndG_ src 2',
+    'swatch-carousel__link href 3', 'color-swatch_colorSwatchImg__dndG_ src 3',
+    'color-swatch_colorSwatchImg__dndG_ src 4', 'color-swatch_colorSwatchImg__dndG_ src 5',
+    'color-swatch_colorSwatchImg__dndG_ src 6', 'color-swatch_colorSwatchImg__dndG_ src 7',
+    'swatch-carousel__link href 8', 'color-swatch_colorSwatchImg__dndG_ src 8',
+    'color-swatch_colorSwatchImg__dndG_ src 9', 'swatch-carousel__link href 10',
+    'color-swatch_colorSwatchImg__dndG_ src 1', 'product-tile-gift-badge_badgeText__oGION', 'link',
+    'price_price__dr4sr', 'lll-hidden-visually', 'swatch-carousel__link href 11',
+    'color-swatch_colorSwatchImg__dndG_ src 1', 'swatch-carousel__link href 12',
+    'color-swatch_colorSwatchImg__dndG_ src 1',
+]
+
+# Width of the multi-retailer export (Sheet2)
+PRODUCTS_COLUMNS = 22
+# Sections of the multi-retailer export and their share of rows; the
+# Revolve section is shifted four columns right, as in Sheet2
+PRODUCTS_SECTIONS = {'skims': 0.3, 'lululemon': 0.3, 'revolve': 0.4}
+
+
+def pick(rng, values, size):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+
+
+def product_ids(rng, start, size, duplicate_rate):
+    """Sequential product ids, with `duplicate_rate` of rows repeating an earlier product"""
+    ids = np.arange(start, start + size)
+    repeat = rng.random(size) < duplicate_rate
+    ids[repeat] = rng.integers(0, np.maximum(ids[repeat], 1))
+    return ids
+
+
+def with_missing(rng, values, rate):
+    """Replace `rate` of the values with NaN"""
+    values = pd.Series(values, dtype=object)
+    return values.mask(rng.random(len(values)) < rate)
+
+
+def revolve_block(rng, start, size, duplicate_rate):
+    """Rows of a Revolve listing export (Sheet4 layout)"""
+    ids = product_ids(rng, start, size, duplicate_rate)
+    # Mixed-radix digits of the id, so every product id gets its own brand + name
+    brand, rest = np.divmod(ids, len(REVOLVE_BRANDS))[::-1]
+    style, rest = np.divmod(rest, len(STYLE_NAMES))[::-1]
+    adjective, rest = np.divmod(rest, len(ADJECTIVES))[::-1]
+    garment, version = np.divmod(rest, len(GARMENTS))[::-1]
+    brands = np.asarray(REVOLVE_BRANDS, dtype=object)[brand]
+    names = (
+        pd.Series(np.asarray(STYLE_NAMES, dtype=object)[style])
+        + ' ' + np.asarray(ADJECTIVES, dtype=object)[adjective]
+        + ' ' + np.asarray(GARMENTS, dtype=object)[garment]
+    )
+    names = names.where(version == 0, names + ' ' + pd.Series(version + 1).astype(str))
+    codes = pd.Series(brands).str.upper().str.replace(r'[^A-Z]', '', regex=True).str[:4]
+    skus = codes + '-W' + pd.Series(ids).map('{:06d}'.format)
+    slugs = (pd.Series(brands) + ' ' + names).str.lower().str.replace(r'[^a-z0-9]+', '-', regex=True)
+
+    pages = pd.Series(rng.integers(1, 40, size)).astype(str)
+    row_numbers = pd.Series(rng.integers(1, 100, size)).astype(str)
+    urls = (
+        'https://www.revolve.com/' + slugs + '/dp/' + skus + '/?d=Womens&page=' + pages
+        + '&lc=1&plpSrc=' + PLP_SRC + '&itrownum=' + row_numbers + '&itcurrpage=' + pages + '&itview=05'
+    )
+    images = ('https://is4.revolveassets.com/images/p4/n/tv/' + skus + '_V1.jpg').where(
+        rng.random(size) > 0.3, PLACEHOLDER_IMAGE
+    )
+    prices = '$' + pd.Series(40 + (ids * 37) % 400).astype(str)
+    badges = pick(rng, ['BEST SELLER', 'Sustainable', 'NEW', None, None, None], size)
+
+    return pd.DataFrame({
+        0: with_missing(rng, urls, 0.01),
+        1: images,
+        2: with_missing(rng, names, 0.01),
+        3: with_missing(rng, brands, 0.01),
+        4: with_missing(rng, prices, 0.02),
+        5: pd.Series(np.where(pd.isna(badges), None, 'https://www.revolve.com/bestSeller/all-best-sellers/br/2022d4/?navsrc=plp')),
+        6: badges,
+        7: 'favorite ' + names,
+        8: 'QUICK VIEW',
+        9: 'https://www.revolve.com/clothing/br/3699fc/?navsrc=subclothing',
+        10: with_missing(rng, pd.Series(PLACEHOLDER_IMAGE, index=range(size)), 0.8),
+        11: with_missing(rng, pd.Series(PLACEHOLDER_IMAGE, index=range(size)), 0.8),
+        12: with_missing(rng, pd.Series('show more colors for', index=range(size)), 0.8),
+        13: with_missing(rng, 'favorite ' + names, 0.9),
+    })
+
+
+def skims_block(rng, start, size, duplicate_rate):
+    """Rows of the Skims section of the multi-retailer export"""
+    ids = product_ids(rng, start, size, duplicate_rate)
+    collections = np.asarray(SKIMS_COLLECTIONS, dtype=object)[ids % len(SKIMS_COLLECTIONS)]
+    items = np.asarray(SKIMS_ITEMS, dtype=object)[(ids // len(SKIMS_COLLECTIONS)) % len(SKIMS_ITEMS)]
+    colors = np.asarray(SKIMS_COLORS, dtype=object)[(ids // 5) % len(SKIMS_COLORS)]
+    slugs = (pd.Series(collections) + ' ' + items).str.lower().str.replace(r'[^a-z0-9]+', '-', regex=True)
+
+    block = pd.DataFrame(index=range(size), columns=range(PRODUCTS_COLUMNS), dtype=object)
+    block[0] = 'https://skims.com/products/' + slugs + '-' + colors
+    block[1] = 'https://skims.imgix.net/s/files/1/0259/5448/4284/products/SKIMS-' + pd.Series(ids).astype(str) + '.jpg?v=1711846780&auto=format&w=600'
+    block[2] = with_missing(rng, block[1], 0.2)
+    for col in range(3, 13):
+        block[col] = with_missing(rng, 'Select ' + pd.Series(pick(rng, SKIMS_COLORS, size)) + ' swatch', 0.3)
+    block[13] = collections
+    block[14] = items
+    block[15] = with_missing(rng, '$' + pd.Series(18 + (ids * 13) % 120).astype(str), 0.02)
+    block[16] = pick(rng, ['3 for $39', None, None], size)
+    block[17] = with_missing(rng, pd.Series(FABRICS[0], index=range(size)), 0.9)
+    return block
+
+
+def lululemon_block(rng, start, size, duplicate_rate):
+    """Rows of the Lululemon section of the multi-retailer export"""
+    ids = product_ids(rng, start, size, duplicate_rate)
+    styles = [LULULEMON_STYLES[i % len(LULULEMON_STYLES)] for i in ids.tolist()]
+    categories = pd.Series([category for category, _ in styles])
+    names = pd.Series([name for _, name in styles])
+    colors = pd.Series(40000 + (ids * 7919) % 30000).astype(str)
+    slugs = names.str.replace(r'[^A-Za-z0-9]+', '-', regex=True).str.strip('-')
+    urls = (
+        'https://shop.lululemon.com/p/' + categories + '/' + slugs + '/_/prod'
+        + pd.Series(9000000 + ids).astype(str) + '?color=' + colors
+    )
+    images = 'https://images.lululemon.com/is/image/lululemon/' + colors
+
+    block = pd.DataFrame(index=range(size), columns=range(PRODUCTS_COLUMNS), dtype=object)
+    block[0] = urls
+    block[1] = images
+    block[2] = with_missing(rng, images, 0.3)
+    for col in (3, 9, 12):
+        block[col] = with_missing(rng, urls, 0.5)
+    for col in (4, 5, 6, 7, 8, 10, 11, 13):
+        block[col] = with_missing(rng, images, 0.5)
+    block[14] = pick(rng, ['TRENDING', 'NEW', None, None], size)
+    lengths = pd.Series(pick(rng, LULULEMON_LENGTHS, size))
+    block[15] = (names + ' \n' + lengths).where(lengths != '', names)
+    block[16] = with_missing(rng, '$' + pd.Series(38 + (ids * 11) % 130).astype(str), 0.02)
+    block[17] = with_missing(rng, 'Select for product comparison, ' + names, 0.5)
+    block[18] = with_missing(rng, pd.Series(pick(rng, FABRICS, size)), 0.7)
+    return block
+
+
+def header_row(header, width, offset=0):
+    row = [None] * width
+    row[offset:offset + len(header)] = header
+    return pd.DataFrame([row], columns=range(width), dtype=object)
+
+
+def products_block(rng, start, size, duplicate_rate):
+    """One section of the multi-retailer export: a scraper header row and its listings"""
+    section = rng.choice(list(PRODUCTS_SECTIONS), p=list(PRODUCTS_SECTIONS.values()))
+    if section == 'skims':
+        return pd.concat([header_row(SKIMS_HEADER, PRODUCTS_COLUMNS), skims_block(rng, start, size, duplicate_rate)])
+    if section == 'lululemon':
+        return pd.concat([header_row(LULULEMON_HEADER, PRODUCTS_COLUMNS), lululemon_block(rng, start, size, duplicate_rate)])
+
+    # Revolve listings scraped into the same sheet land four columns over
+    listings = revolve_block(rng, start, size, duplicate_rate)
+    listings.columns = listings.columns + 4
+    listings = listings.reindex(columns=range(PRODUCTS_COLUMNS))
+    return pd.concat([header_row(REVOLVE_HEADER, PRODUCTS_COLUMNS, offset=4), listings])
+
+
+def generate_export(kind, output_file, rows, seed=0, duplicate_rate=0.05, junk_rate=0.01):
+    """
+    Write a deterministic synthetic scrape export.
+
+    `kind` is 'products' for the multi-retailer Sheet2 layout (Skims,
+    Lululemon and column-shifted Revolve sections, each under its own
+    scraper header row) or 'revolve' for the Sheet4 layout. About
+    `duplicate_rate` of listings repeat an earlier product and `junk_rate`
+    of rows are blank. The same arguments always produce the same file.
+    """
+    rng = np.random.default_rng(seed)
+    written = 0
+    first = True
+
+    while written < rows:
+        if kind == 'revolve':
+            size = min(BLOCK_ROWS, rows - written)
+            block = revolve_block(rng, written, size, duplicate_rate)
+            block.columns = REVOLVE_HEADER
+        else:
+            # Sections are a few hundred to a few thousand rows, like separate scrapes
+            size = min(int(rng.integers(200, 5000)), rows - written)
+            block = products_block(rng, written, size, duplicate_rate).iloc[:rows - written]
+
+        block = block.reset_index(drop=True).astype(object)
+        block.iloc[np.flatnonzero(rng.random(len(block)) < junk_rate)] = None
+
+        if kind == 'revolve':
+            block.to_csv(output_file, mode='w' if first else 'a', header=first, index=False)
+        else:
+            # Sheet2 has no header of its own; its first line is blank
+            if first:
+                pd.DataFrame(columns=[''] * PRODUCTS_COLUMNS).to_csv(output_file, index=False)
+            block.to_csv(output_file, mode='a', header=False, index=False)
+        first = False
+        written += len(block)
+
+    return written
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic scrape export.")
+    parser.add_argument("kind", choices=['products', 'revolve'], help="products: Sheet2 layout, revolve: Sheet4 layout.")
+    parser.add_argument("output_file", help="Where to write the export.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of rows to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same file.")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Share of listings repeating an earlier product.")
+    parser.add_argument("--junk-rate", type=float, default=0.01, help="Share of blank rows.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = time.perf_counter()
+    written = generate_export(args.kind, args.output_file, args.rows, args.seed, args.duplicate_rate, args.junk_rate)
+    print(f"✅ Wrote {written} {args.kind} rows to {args.output_file} ({time.perf_counter() - start:.1f}s)")
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# The scripts import each other by module name from the clean data directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_loader import RestSession  # noqa: E402
+from postgrest_standin import StandinServer  # noqa: E402
+
+
+@pytest.fixture
+def standin():
+    """Start stand-ins on free ports, e.g. standin(max_rows=100); they are shut down after the test"""
+    servers = []
+
+    def start(**options):
+        server = StandinServer(port=0, **options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def session_for():
+    sessions = []
+
+    def connect(server, **options):
+        session = RestSession(server.url, 'test-key', **options)
+        sessions.append(session)
+        return session
+
+    yield connect
+    for session in sessions:
+        session.close()
@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmark_cleaners import SUITE_CLEANERS, find_regressions
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmark_cleaners.py')
+
+
+def suite(tmp_path, *options):
+    return subprocess.run(
+        [sys.executable, SCRIPT, '--suite', '--sizes', '300', '--data-dir', str(tmp_path / 'data'), *options],
+        capture_output=True, text=True, timeout=300,
+    )
+
+
+def test_the_suite_fails_only_against_a_faster_baseline(tmp_path):
+    results = tmp_path / 'results.json'
+    run = suite(tmp_path, '--json', str(results))
+    assert run.returncode == 0, run.stderr
+    cases = json.loads(results.read_text())
+    assert [(case['cleaner'], case['rows']) for case in cases] == [(cleaner, 300) for cleaner in SUITE_CLEANERS]
+    assert all(case['rows_per_s'] > 0 and case['stages'] for case in cases)
+
+    # A run is no regression against itself, but is against a baseline ten times faster
+    assert find_regressions(cases, cases, 0.2) == []
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps([{**case, 'rows_per_s': case['rows_per_s'] * 10} for case in cases]))
+    run = suite(tmp_path, '--baseline', str(baseline))
+    assert run.returncode == 1
+    assert run.stdout.count('❌') == len(SUITE_CLEANERS)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from data_cleaner import extract_price_from_row, extract_products, extract_products_rowwise
+from revolve_data_cleaner import (
+    clean_price_column,
+    clean_price_string,
+    clean_text,
+    clean_text_column,
+    determine_category,
+    determine_category_column,
+)
+from synthetic_exports import generate_export
+
+
+def test_extract_price_from_row_returns_empty_text_without_a_price():
+    row = pd.Series(['Bra', '$54', np.nan])
+    assert extract_price_from_row(row, 1) == '$54'
+    assert extract_price_from_row(row, 2) == ''
+    assert extract_price_from_row(row, 7) == ''
+
+
+def test_columnar_and_rowwise_extraction_agree_on_every_retailer(tmp_path):
+    path = str(tmp_path / 'export.csv')
+    generate_export('products', path, 6000, seed=1, junk_rate=0.05)
+    df = pd.read_csv(path).iloc[::4]
+    # Revolve rows with the url first, as the Revolve extractors expect
+    revolve = pd.DataFrame([
+        ['https://www.revolve.com/levi-s-blythe-mini-dress/dp/LEVI-W1/', None, None,
+         'https://is4.revolveassets.com/images/p4/n/tv/LEVI-W1_V1.jpg', 'Blythe Mini Dress', "LEVI'S", '$40'],
+        ['https://www.revolve.com/agolde-riley-jean/dp/AGOL-W2/', None, None, None, 'Riley Jean', 'AGOLDE', '€50'],
+        ['https://www.revolve.com/frame-le-crop/dp/FRAM-W3/', None, None, None, 'Le Crop', 'FRAME', None],
+    ])
+    revolve.columns = df.columns[:revolve.shape[1]]
+    df = pd.concat([df, revolve], ignore_index=True)
+
+    columnar = extract_products(df)
+    assert set(columnar['source']) == {'Skims', 'Lululemon', 'Revolve'}
+    pd.testing.assert_frame_equal(columnar.reset_index(drop=True), extract_products_rowwise(df))
+
+
+def test_revolve_column_helpers_agree_with_their_row_versions():
+    cells = pd.Series(['  Mini \n Dress ', None, np.nan, 'nan', '$54', '€50', 'tank top', 'Leather Bag', 'sold out'],
+                      dtype=object)
+    assert clean_text_column(cells).tolist() == [clean_text(cell) for cell in cells]
+    assert clean_price_column(cells).tolist() == [clean_price_string(cell) for cell in cells]
+    assert determine_category_column(cells).tolist() == [determine_category(cell) for cell in cells]
@@ -0,0 +1,66 @@
+import csv
+import itertools
+
+import pytest
+
+import catalog_export
+from catalog_export import ExportError, export_table
+
+
+def fill(server, rows, table='products'):
+    server.table(table).write([{'url': f'https://example.com/p/{i}', 'brand': f'brand {i % 7}'} for i in range(rows)])
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_export_writes_every_row_under_a_row_cap(standin, session_for, tmp_path, workers):
+    server = standin(max_rows=100)
+    fill(server, 471)
+    path = tmp_path / 'products.csv'
+    assert export_table(session_for(server), str(path), columns=['url', 'brand'], workers=workers) == 471
+    rows = read_csv(path)
+    assert [int(row['id']) for row in rows] == list(range(1, 472))
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_export_fails_on_a_short_read(standin, session_for, tmp_path, monkeypatch, workers):
+    server = standin(max_rows=100)
+    fill(server, 471)
+    # A pager that stops at the first capped page, as keyset_pages once did
+    pages = catalog_export.keyset_pages
+    monkeypatch.setattr(catalog_export, 'keyset_pages', lambda *args: itertools.islice(pages(*args), 1))
+    with pytest.raises(ExportError, match='wrote 100 rows'):
+        export_table(session_for(server), str(tmp_path / 'products.csv'), columns=['url'], workers=workers)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_count_reads_the_exact_total(standin, session_for):
+    server = standin(max_rows=100)
+    fill(server, 471)
+    session = session_for(server)
+    assert session.count('products') == 471
+    assert session.count('products', [('id', 'gt.400')]) == 71
+    assert session.count('missing') == 0
+
+
+def test_check_products_counts_past_the_sample(standin, monkeypatch, capsys):
+    pytest.importorskip('requests')
+    pytest.importorskip('dotenv')
+    from check_products import check_products
+
+    server = standin(max_rows=100)
+    fill(server, 471)
+    monkeypatch.setenv('SUPABASE_URL', server.url)
+    monkeypatch.setenv('SUPABASE_SERVICE_KEY', 'test-key')
+    monkeypatch.setenv('SUPABASE_ANON_KEY', 'test-key')
+    check_products()
+    out = capsys.readouterr().out
+    assert 'Status: 206' in out
+    assert 'Found 471 products' in out
+    assert 'and 466 more products' in out
+    assert 'can read 471 products' in out
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from fabric_parser import FIBERS, fiber_vectors, normalize_fabric
+
+
+def normalized(*fabrics):
+    return normalize_fabric(pd.DataFrame({'fabric': list(fabrics)}))['fabric'].tolist()
+
+
+def test_text_that_names_no_fiber_is_left_unchanged():
+    assert normalized('save 20% today', '20% off everything', 'Machine wash cold', None) == [
+        'save 20% today', '20% off everything', 'Machine wash cold', None,
+    ]
+
+
+def test_known_fibers_are_normalized():
+    assert normalized('76% Nylon, 24% Spandex', 'Cotton 100%', '70% recycled polyester 30% bamboo') == [
+        '76% polyamide, 24% elastane', '100% cotton', '70% polyester, 30% bamboo',
+    ]
+
+
+def test_percentages_and_order_are_kept_as_written():
+    assert normalized('52.5% Lyocell 47.5% Cotton', '5% spandex 95% cotton') == [
+        '52.5% lyocell, 47.5% cotton', '5% elastane, 95% cotton',
+    ]
+
+
+def test_multi_part_and_partial_labels_are_left_as_written():
+    labels = [
+        'Shell: 100% cotton; Lining: 100% polyester',
+        'Spandex: 10%',
+        '80% nylon 20% spandex; 100% Polyester lining',
+        'Body: 60% cotton 40% modal; Trim: 60% cotton 40% modal',
+    ]
+    assert normalized(*labels) == labels
+
+
+def test_fiber_vectors_pool_multi_part_labels_for_similarity():
+    vectors = fiber_vectors(pd.Series(['Shell: 100% cotton; Lining: 100% polyester', 'Spandex: 10%']))
+    assert np.allclose(vectors[0][[FIBERS.index('cotton'), FIBERS.index('polyester')]], [0.5, 0.5])
+    assert vectors[1][FIBERS.index('elastane')] == 1
+
+
+def test_a_percentage_next_to_a_fiber_word_that_is_not_its_share_is_left_alone():
+    assert normalized('20% off silk blouses') == ['20% off silk blouses']
@@ -0,0 +1,41 @@
+import pytest
+
+from catalog_loader import LoaderError
+
+
+def rows(count, brand='brand'):
+    # Long enough that the body is gzipped
+    return [{'url': f'https://example.com/p/{i}', 'brand': brand, 'name': 'x' * 40} for i in range(count)]
+
+
+def test_gzip_is_used_when_the_server_reads_it(standin, session_for):
+    server = standin()
+    session = session_for(server)
+    session.insert('products', rows(50))
+    assert session.gzip_accepted is True
+    assert server.requests == 1
+    assert len(server.table('products').rows) == 50
+
+
+def test_a_server_without_gzip_gets_plain_bodies(standin, session_for):
+    server = standin(accept_gzip=False)
+    session = session_for(server)
+    session.insert('products', rows(50))
+    assert session.gzip_accepted is False
+    assert len(server.table('products').rows) == 50
+    session.insert('products', rows(100)[50:])
+    # One refused gzip probe, then plain bodies only
+    assert server.requests == 3
+
+
+def test_a_row_refusal_is_not_taken_for_a_gzip_refusal(standin, session_for):
+    server = standin()
+    session = session_for(server)
+    with pytest.raises(LoaderError) as refused:
+        session.insert('products', rows(50, brand='b' * 300))
+    assert refused.value.status == 400
+    # Sent once, and gzip still on trial rather than switched off
+    assert server.requests == 1
+    assert session.gzip_accepted is None
+    session.insert('products', rows(50))
+    assert session.gzip_accepted is True
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental_cleaner import clean_incremental, manifest_path
+from revolve_data_cleaner import clean_revolve_frame
+from synthetic_exports import generate_export
+
+KEY = ['brand', 'name']
+
+
+def listing(rows):
+    """A Revolve export from (brand, name, price, url) tuples; a price of None is missing"""
+    return pd.DataFrame({
+        'product-brand': [row[0] for row in rows],
+        'product-name': [row[1] for row in rows],
+        'plp_price': [row[2] for row in rows],
+        'js-plp-pdp-link href': [row[3] for row in rows],
+        'plp-image src': 'https://is4.revolveassets.com/images/p4/n/tv/X.jpg',
+    })
+
+
+def rebuilt(source, path):
+    """What a full clean of the source writes, read back as the incremental output is"""
+    clean_revolve_frame(pd.read_csv(source, dtype=str)).to_csv(path, index=False)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def comparable(df):
+    return df.drop(columns=['created_at', 'updated_at']).sort_values(KEY).reset_index(drop=True)
+
+
+def assert_matches_rebuild(source, output, tmp_path):
+    incremental = pd.read_csv(output, dtype=str, keep_default_na=False)
+    pd.testing.assert_frame_equal(comparable(incremental), comparable(rebuilt(source, tmp_path / 'full.csv')))
+
+
+def test_a_duplicate_comes_back_when_its_unpriced_claimant_leaves(tmp_path):
+    source, output = str(tmp_path / 'export.csv'), str(tmp_path / 'cleaned.csv')
+    rows = [
+        ("LEVI'S", 'Parker High Rise Dress', None, 'https://www.revolve.com/a/dp/LEVI-WD1/'),
+        ("LEVI'S", 'Parker High Rise Dress', '$98', 'https://www.revolve.com/b/dp/LEVI-WD2/'),
+        ('AGOLDE', 'Riley Jean', '$198', 'https://www.revolve.com/c/dp/AGOL-WJ1/'),
+    ]
+    listing(rows).to_csv(source, index=False)
+    clean_incremental('revolve', source, output)
+    # The unpriced row claims the key, so neither Levi's row is emitted
+    assert_matches_rebuild(source, output, tmp_path)
+
+    listing(rows[1:]).to_csv(source, index=False)
+    clean_incremental('revolve', source, output)
+    assert_matches_rebuild(source, output, tmp_path)
+    assert "LEVI'S" in pd.read_csv(output)['brand'].tolist()
+
+
+def test_an_unpriced_claimant_still_holds_its_key_against_new_rows(tmp_path):
+    source, output = str(tmp_path / 'export.csv'), str(tmp_path / 'cleaned.csv')
+    rows = [
+        ('AGOLDE', 'Riley Jean', None, 'https://www.revolve.com/c/dp/AGOL-WJ1/'),
+        ('FRAME', 'Le Crop Mini Boot', '$228', 'https://www.revolve.com/d/dp/FRAM-WJ2/'),
+    ]
+    listing(rows).to_csv(source, index=False)
+    clean_incremental('revolve', source, output)
+
+    listing(rows + [('AGOLDE', 'Riley Jean', '$198', 'https://www.revolve.com/e/dp/AGOL-WJ3/')]).to_csv(source, index=False)
+    clean_incremental('revolve', source, output)
+    assert_matches_rebuild(source, output, tmp_path)
+    assert pd.read_csv(output)['brand'].tolist() == ['FRAME']
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_incremental_revolve_clean_matches_a_full_rebuild_after_deletes_and_edits(tmp_path, seed):
+    source, output = str(tmp_path / 'export.csv'), str(tmp_path / 'cleaned.csv')
+    generate_export('revolve', source, 8000, seed=seed, duplicate_rate=0.2, junk_rate=0.05)
+    clean_incremental('revolve', source, output)
+
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(source, dtype=str)
+    df = df[rng.random(len(df)) > 0.1]
+    df.loc[rng.random(len(df)) < 0.05, 'plp_price'] = '$99'
+    df.to_csv(source, index=False)
+    clean_incremental('revolve', source, output)
+
+    assert_matches_rebuild(source, output, tmp_path)
+    assert len(pd.read_csv(manifest_path(output))) == len(df)
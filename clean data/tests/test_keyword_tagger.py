@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import keyword_tagger
+from keyword_tagger import TAXONOMIES, KeywordTagger
+from synthetic_exports import ADJECTIVES, GARMENTS, SKIMS_ITEMS
+
+TEXTS = [
+    'Cotton Rib Tank', 'Shirtdress in Silk Linen', 'Cobra Print Bikini Top', 'Oversized Wool Blazer Coat',
+    'Machine wash cold water, do not bleach; tumble dry', 'Non-Stretch Double-Lined Pant', 'Unlined Seamless Bra',
+    'SPORTS BRA', 'Hatch Swim Short', 'Brand', 'Gownless', '', 'Évasée Jupe', 'Relaxed Straight Jean 2',
+] + [f'{adjective} {garment}' for adjective in ADJECTIVES for garment in GARMENTS + SKIMS_ITEMS]
+
+
+def pure_python_tagger(monkeypatch):
+    monkeypatch.setattr(keyword_tagger, 'ahocorasick', None)
+    return KeywordTagger(TAXONOMIES)
+
+
+def substring_tags(text):
+    """What a keyword-by-keyword `in` check finds, in taxonomy order"""
+    text = text.lower()
+    tags = {}
+    for taxonomy, labels in TAXONOMIES.items():
+        if not isinstance(labels, dict):
+            labels = {keyword: [keyword] for keyword in labels}
+        tags[taxonomy] = [label for label, keywords in labels.items() if any(k in text for k in keywords)]
+    return tags
+
+
+def test_the_pure_python_automaton_finds_every_substring_match(monkeypatch):
+    tagger = pure_python_tagger(monkeypatch)
+    assert tagger._automaton is None
+    for text in TEXTS:
+        assert tagger.tag(text) == substring_tags(text), text
+
+
+def test_the_pure_python_automaton_agrees_with_pyahocorasick(monkeypatch):
+    pytest.importorskip('ahocorasick')
+    compiled = KeywordTagger(TAXONOMIES)
+    assert compiled._automaton is not None
+    pure = pure_python_tagger(monkeypatch)
+    texts = pd.Series(TEXTS + [None] + [text.upper() for text in TEXTS])
+    pd.testing.assert_frame_equal(pure.tag_column(texts), compiled.tag_column(texts))
+    assert pure.first_label_column(texts, 'category', 'Clothing').tolist() == \
+        compiled.first_label_column(texts, 'category', 'Clothing').tolist()
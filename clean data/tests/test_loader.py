@@ -0,0 +1,103 @@
+import pandas as pd
+import pytest
+
+from catalog_loader import CatalogLoader, LoaderError, RejectFile, with_retries
+from upload_journal import UploadJournal
+
+
+def catalog(count, long_brands=()):
+    """A cleaned catalog frame; rows in `long_brands` carry a brand too long for its column"""
+    return pd.DataFrame({
+        'url': [f'https://example.com/p/{i}' for i in range(count)],
+        'brand': ['b' * 300 if i in long_brands else 'brand' for i in range(count)],
+        'name': [f'product {i}' for i in range(count)],
+        'price': '$10.00',
+    })
+
+
+def loader_for(session, tmp_path, **options):
+    options = {'rejects': RejectFile(str(tmp_path / 'rejects.jsonl')), 'retries': 0, 'verbose': False, **options}
+    return CatalogLoader(session, **options)
+
+
+def test_a_refused_batch_is_bisected_down_to_its_bad_rows(standin, session_for, tmp_path):
+    server = standin()
+    loader = loader_for(session_for(server), tmp_path, batch_size=64, max_batch_size=64)
+    assert loader.load_frame(catalog(64, long_brands={5, 40})) == 62
+    assert len(server.table('products').rows) == 62
+    assert sorted(entry['position'] for entry in loader.rejects.entries()) == [5, 40]
+    assert {entry['code'] for entry in loader.rejects.entries()} == {'22001'}
+    # One refused batch, then two paths of log2(64) halvings rather than a request per row
+    assert loader.requests <= 1 + 2 * 2 * 6
+    assert (loader.rows_loaded, loader.rows_failed) == (62, 2)
+
+
+def test_throttled_requests_wait_as_long_as_retry_after_says(standin, session_for):
+    server = standin(throttle_rate=1.0, retry_after=3)
+    session = session_for(server)
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        if len(waits) == 2:
+            server.throttle_rate = 0.0
+
+    with_retries(session.insert, 'products', [{'url': 'https://example.com/p/0'}], sleep=sleep)
+    assert waits == [3.0, 3.0]
+    assert server.requests == 3
+    assert len(server.table('products').rows) == 1
+
+
+def test_throttling_past_the_retries_is_raised(standin, session_for):
+    session = session_for(standin(throttle_rate=1.0))
+    with pytest.raises(LoaderError) as throttled:
+        with_retries(session.insert, 'products', [{'url': 'https://example.com/p/0'}], retries=2, sleep=lambda _: None)
+    assert throttled.value.status == 429
+
+
+def test_an_upsert_rerun_writes_only_what_changed(standin, session_for, tmp_path):
+    server = standin()
+    table = server.table('products')
+    df = catalog(30)
+    loader_for(session_for(server), tmp_path, mode='upsert').load_frame(df)
+    writes = table.writes
+
+    rerun = loader_for(session_for(server), tmp_path, mode='upsert')
+    rerun.load_frame(df)
+    assert (rerun.rows_loaded, rerun.rows_unchanged) == (0, 30)
+    assert table.writes == writes
+
+    df.loc[7, 'price'] = '$12.00'
+    changed = loader_for(session_for(server), tmp_path, mode='upsert')
+    changed.load_frame(df)
+    assert (changed.rows_loaded, changed.rows_unchanged) == (1, 29)
+    assert len(table.rows) == 30
+    assert [row['price'] for row in table.rows.values() if row['url'].endswith('/p/7')] == ['$12.00']
+
+
+def test_a_resumed_load_sends_only_unacknowledged_rows(standin, session_for, tmp_path, monkeypatch):
+    server = standin()
+    path = str(tmp_path / 'catalog.csv')
+    catalog(50).to_csv(path, index=False)
+    journal = UploadJournal(str(tmp_path / 'journal.jsonl'))
+
+    session = session_for(server)
+    insert, sent = session.insert, []
+
+    def dies_after_three_batches(table, records):
+        if len(sent) == 3:
+            raise LoaderError(503, 'connection lost')
+        sent.append(records)
+        return insert(table, records)
+
+    monkeypatch.setattr(session, 'insert', dies_after_three_batches)
+    crashed = loader_for(session, tmp_path, batch_size=10, max_batch_size=10, journal=journal)
+    with pytest.raises(LoaderError):
+        crashed.load_file(path)
+    assert len(server.table('products').rows) == 30
+
+    resumed = loader_for(session_for(server), tmp_path, batch_size=10, max_batch_size=10, journal=journal, resume=True)
+    assert resumed.load_file(path) == 20
+    assert resumed.requests == 2
+    urls = sorted(row['url'] for row in server.table('products').rows.values())
+    assert urls == sorted(f'https://example.com/p/{i}' for i in range(50))
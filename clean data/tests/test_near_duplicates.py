@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from near_duplicates import (
+    DUPLICATE_COLUMN,
+    MAX_COMPONENT_SIZE,
+    capped_components,
+    complete_clusters,
+    drop_near_duplicates,
+    exact_jaccard,
+    garment_types,
+    mark_near_duplicates,
+    shingle_sets,
+)
+
+# Distinct products from cleaned_revolve_products.csv that an earlier version merged
+DISTINCT_PAIRS = [
+    (('LIONESS', 'Field Of Dreams Dress', '$109.00', 'Dress'), ('LIONESS', 'Field Of Dreams Top', '$49.00', 'Top')),
+    (('Lovers and Friends', 'Chasing Sunsets Top', '$98.00', 'Top'),
+     ('Lovers and Friends', 'Chasing Sunsets Bottom', '$88.00', 'Clothing')),
+    (('Helsa', 'The Siren Dress in Silk Chiffon', '$528.00', 'Dress'),
+     ('Helsa', 'The Sabine Dress in Silk Chiffon', '$528.00', 'Dress')),
+    (('Katie May', 'Surreal Gown', '$250.00', 'Dress'), ('Katie May', 'Surreal Dress', '$250.00', 'Dress')),
+    (('LIONESS', 'In Your Dreams Top', '$59.00', 'Top'), ('LIONESS', 'In Your Dreams Skirt', '$79.00', 'Bottom')),
+]
+
+
+def catalog(rows):
+    df = pd.DataFrame(rows, columns=['brand', 'name', 'price', 'category'])
+    df['url'] = [f'https://example.com/p/{i}' for i in range(len(df))]
+    return df
+
+
+def test_distinct_products_of_one_line_are_kept():
+    df = catalog([row for pair in DISTINCT_PAIRS for row in pair])
+    assert len(drop_near_duplicates(df)) == len(df)
+    assert mark_near_duplicates(df)[DUPLICATE_COLUMN].isna().all()
+
+
+def test_the_same_product_from_two_sources_is_marked():
+    df = catalog([
+        ('LIONESS', 'Field Of Dreams Dress', '$109.00', 'Dress'),
+        ('Lioness', 'Field of Dreams Dress', '109', 'Dress'),
+        ('LIONESS', 'Field Of Dreams Top', '$49.00', 'Top'),
+    ])
+    marked = mark_near_duplicates(df)
+    assert marked[DUPLICATE_COLUMN].tolist() == [None, 'https://example.com/p/0', None]
+    assert len(marked) == len(df)
+    assert drop_near_duplicates(df)['name'].tolist() == ['Field Of Dreams Dress', 'Field Of Dreams Top']
+
+
+def test_prices_far_apart_are_different_products():
+    df = catalog([
+        ('LIONESS', 'Field Of Dreams Dress', '$109.00', 'Dress'),
+        ('LIONESS', 'Field Of Dreams Dress', '$249.00', 'Dress'),
+    ])
+    assert mark_near_duplicates(df)[DUPLICATE_COLUMN].isna().all()
+
+
+def test_garment_type_comes_from_the_name_before_the_category():
+    df = catalog([
+        ('A', 'Surreal Gown', '', 'Dress'),
+        ('A', 'Chasing Sunsets Bottoms', '', 'Clothing'),
+        ('A', 'Rhode', '', 'Bottom'),
+    ])
+    assert garment_types(df).tolist() == ['gown', 'bottom', 'bottom']
+
+
+def test_similarity_is_not_chained_through_a_middle_row():
+    # 0~1 and 1~2, but 0 and 2 differ: 2 must not join 0's cluster
+    similar_pairs = {(0, 1), (1, 2)}
+
+    def similar(rows, row):
+        return np.array([(min(other, row), max(other, row)) in similar_pairs for other in rows])
+
+    clusters = complete_clusters(np.array([0, 0, 0]), similar, keys=[0, 1, 2])
+    assert clusters.tolist() == [0, 0, 2]
+
+
+def test_a_pair_minhash_overestimates_is_checked_exactly():
+    # 64-permutation MinHash puts these at 0.92; their shingle sets only share 0.81
+    df = catalog([
+        ('LIONESS', 'Darian Knit Top', '$98.00', 'Top'),
+        ('LIONESS', 'Darian Knit Tee', '$98.00', 'Top'),
+    ])
+    assert mark_near_duplicates(df)[DUPLICATE_COLUMN].isna().all()
+
+
+def test_names_differing_in_a_number_are_different_products():
+    df = catalog([
+        ('AGOLDE', 'Blythe Mini Dress', '', 'Dress'),
+        ('AGOLDE', 'Blythe Mini Dress 2', '$414.00', 'Dress'),
+        ('lululemon', 'Swiftly Tech Racerback Tank Top 2.0', '$68.00', 'Top'),
+        ('lululemon', 'Swiftly Tech Racerback Tank Top', '$68.00', 'Top'),
+    ])
+    assert mark_near_duplicates(df)[DUPLICATE_COLUMN].isna().all()
+
+
+def test_exact_jaccard_matches_set_jaccard():
+    texts = ['lioness darian knit top', 'lioness darian knit tee', 'abc', 'aaaaaaaa']
+
+    def shingles(text):
+        text = text.ljust(5)
+        return {text[i:i + 5] for i in range(len(text) - 4)}
+
+    left, right = np.array([0, 0, 2, 3]), np.array([1, 0, 3, 3])
+    shingled, offsets = shingle_sets(texts)
+    expected = [len(shingles(texts[u]) & shingles(texts[v])) / len(shingles(texts[u]) | shingles(texts[v]))
+                for u, v in zip(left, right)]
+    assert np.allclose(exact_jaccard(shingled, offsets, left, right), expected)
+
+
+def test_exact_copies_and_long_components_are_clustered():
+    df = catalog([('LIONESS', 'Field Of Dreams Dress', '$109.00', 'Dress')] * 500)
+    assert mark_near_duplicates(df)[DUPLICATE_COLUMN].eq('https://example.com/p/0').sum() == 499
+    sizes = np.bincount(capped_components(np.zeros(2 * MAX_COMPONENT_SIZE + 3, dtype=np.int64)))
+    assert sizes.tolist() == [MAX_COMPONENT_SIZE, MAX_COMPONENT_SIZE, 3]
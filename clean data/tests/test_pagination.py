@@ -0,0 +1,34 @@
+from catalog_loader import keyset_pages
+from catalog_sync import remote_index
+
+
+def fill(server, rows, table='products'):
+    server.table(table).write([{'url': f'https://example.com/p/{i}', 'content_hash': f'{i:016x}', 'source': 'test'}
+                               for i in range(rows)])
+
+
+def test_keyset_pages_reads_past_a_row_cap(standin, session_for):
+    server = standin(max_rows=100)
+    fill(server, 471)
+    pages = list(keyset_pages(session_for(server), 'products', 'id,url', page_size=1000))
+    assert [len(page) for page in pages] == [100, 100, 100, 100, 71]
+    assert [row['id'] for page in pages for row in page] == list(range(1, 472))
+
+
+def test_keyset_pages_respects_the_key_range(standin, session_for):
+    server = standin(max_rows=100)
+    fill(server, 471)
+    pages = keyset_pages(session_for(server), 'products', 'id', page_size=1000, after=150, until=420)
+    assert [row['id'] for page in pages for row in page] == list(range(151, 421))
+
+
+def test_remote_index_sees_every_row_under_a_row_cap(standin, session_for):
+    server = standin(max_rows=100)
+    fill(server, 471)
+    remote = remote_index(session_for(server))
+    assert len(remote) == 471
+    assert remote['url'].is_unique
+
+
+def test_keyset_pages_on_an_empty_table(standin, session_for):
+    assert list(keyset_pages(session_for(standin()), 'products', 'id')) == []
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from parallel_cleaner import clean_files_parallel, find_row_boundaries
+from synthetic_exports import generate_export
+
+TIMESTAMPS = ['created_at', 'updated_at']
+
+
+def cleaned(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False).drop(columns=TIMESTAMPS)
+
+
+@pytest.mark.parametrize('kind', ['products', 'revolve'])
+def test_the_output_is_the_same_for_one_or_several_workers(tmp_path, kind):
+    files = [str(tmp_path / f'{kind}_{seed}.csv') for seed in range(2)]
+    for seed, path in enumerate(files):
+        generate_export(kind, path, 2000, seed=seed, duplicate_rate=0.2, junk_rate=0.05)
+
+    outputs = {}
+    for workers in [1, 3]:
+        outputs[workers] = str(tmp_path / f'cleaned_{workers}.csv')
+        clean_files_parallel(kind, files, outputs[workers], workers=workers, partition_bytes=128 * 1024)
+    assert len(find_row_boundaries(files[0], 128 * 1024)[1]) > 2
+
+    single, several = cleaned(outputs[1]), cleaned(outputs[3])
+    assert len(single) > 0
+    pd.testing.assert_frame_equal(single, several)
+    if kind == 'revolve':
+        # Duplicates are dropped across partitions and files, not only within one
+        assert not single.duplicated(['brand', 'name']).any()
+
+
+def test_partitions_never_split_a_quoted_newline(tmp_path):
+    path = str(tmp_path / 'quoted.csv')
+    pd.DataFrame({'url': [f'https://example.com/p/{i}' for i in range(200)],
+                  'name': [f'line one\nline two {i}' for i in range(200)]}).to_csv(path, index=False)
+    header_end, ranges = find_row_boundaries(path, partition_bytes=100)
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data[:header_end] == b'url,name\n'
+    parts = [data[start:end] for start, end in ranges]
+    assert b''.join(parts) == data[header_end:]
+    assert all(part.count(b'"') % 2 == 0 and part.startswith(b'https://') for part in parts)
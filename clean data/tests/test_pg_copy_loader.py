@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+import pytest
+
+from url_index import UrlIndex
+
+# Runs against a real Postgres only: PG_DSN=postgresql://... python -m pytest
+psycopg = pytest.importorskip('psycopg')
+DSN = os.getenv('PG_DSN')
+pytestmark = pytest.mark.skipif(not DSN, reason="set PG_DSN to a scratch Postgres database")
+
+from pg_copy_loader import copy_load  # noqa: E402
+
+TABLE = 'products_copy_test'
+
+
+@pytest.fixture
+def table():
+    """A scratch products table with the url key and content hash from add_content_hash.sql"""
+    with psycopg.connect(DSN, autocommit=True) as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.execute(f"""
+            CREATE TABLE {TABLE} (
+                id SERIAL PRIMARY KEY,
+                brand VARCHAR(255),
+                name TEXT,
+                price VARCHAR(50),
+                url TEXT UNIQUE,
+                updated_at TIMESTAMP DEFAULT NOW(),
+                content_hash TEXT
+            )
+        """)
+        yield conn
+        conn.execute(f"DROP TABLE {TABLE}")
+
+
+def rows(conn):
+    return {url: (id, price, content_hash)
+            for id, url, price, content_hash in conn.execute(f"SELECT id, url, price, content_hash FROM {TABLE}")}
+
+
+def test_copy_merges_on_url_and_rewrites_only_changed_rows(table, tmp_path):
+    path = str(tmp_path / 'catalog.csv')
+    df = pd.DataFrame({
+        'url': [f'https://example.com/p/{i}' for i in range(40)],
+        'brand': 'brand',
+        'name': [f'product {i}' for i in range(40)],
+        'price': '$10.00',
+    })
+    df.to_csv(path, index=False)
+    index = UrlIndex(str(tmp_path / 'url_index.csv'))
+
+    assert copy_load(DSN, [path], TABLE, chunk_size=16, url_index=index) == 40
+    first = rows(table)
+    assert len(first) == 40
+
+    # Unchanged content: the IS DISTINCT FROM guard skips every conflicting row
+    assert copy_load(DSN, [path], TABLE, url_index=index) == 0
+    assert rows(table) == first
+
+    df.loc[3, 'price'] = '$12.00'
+    df.loc[40] = ['https://example.com/p/40', 'brand', 'product 40', '$10.00']
+    df.to_csv(path, index=False)
+    assert copy_load(DSN, [path], TABLE, url_index=index) == 2
+    after = rows(table)
+    assert len(after) == 41
+    changed = 'https://example.com/p/3'
+    assert after[changed][:2] == (first[changed][0], '$12.00')
+    assert after[changed][2] != first[changed][2]
+    assert {url: row for url, row in after.items() if url != changed and url in first} == \
+        {url: row for url, row in first.items() if url != changed}
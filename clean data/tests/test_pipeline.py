@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+import pipeline
+from add_affiliate_link import add_affiliate_link_to_frame
+from pipeline import STAGES, run_pipeline
+from remove_price_signs import strip_price_signs
+
+
+def catalog(path):
+    pd.DataFrame({
+        'brand': ['Skims', 'Revolve', 'Skims'],
+        'price': ['$54', '€50', '$120.00'],
+        'url': [f'https://example.com/p/{i}' for i in range(3)],
+    }).to_csv(path, index=False)
+
+
+def test_stages_run_in_the_order_given_on_one_frame_read_and_written_once(tmp_path, monkeypatch):
+    source, output = str(tmp_path / 'catalog.csv'), str(tmp_path / 'out.csv')
+    catalog(source)
+    calls = []
+
+    def stage(name):
+        def transform(df):
+            calls.append((name, list(df.columns)))
+            df[name] = len(calls)
+            return df
+        return transform
+
+    for name in ['first', 'second', 'third']:
+        monkeypatch.setitem(STAGES, name, stage(name))
+    reads, writes = [], []
+    read_csv, to_csv = pd.read_csv, pd.DataFrame.to_csv
+    monkeypatch.setattr(pipeline.pd, 'read_csv', lambda *args, **kw: reads.append(args) or read_csv(*args, **kw))
+    monkeypatch.setattr(pd.DataFrame, 'to_csv', lambda self, *args, **kw: writes.append(args) or to_csv(self, *args, **kw))
+
+    df = run_pipeline(source, output, ['third', 'first', 'second'])
+    # Each stage sees the columns the stages before it added
+    assert calls == [
+        ('third', ['brand', 'price', 'url']),
+        ('first', ['brand', 'price', 'url', 'third']),
+        ('second', ['brand', 'price', 'url', 'third', 'first']),
+    ]
+    assert (df['third'].iloc[0], df['first'].iloc[0], df['second'].iloc[0]) == (1, 2, 3)
+    assert (len(reads), len(writes)) == (1, 1)
+
+
+def test_the_default_stages_strip_prices_then_add_affiliate_links(tmp_path):
+    source, output = str(tmp_path / 'catalog.csv'), str(tmp_path / 'out.csv')
+    catalog(source)
+    run_pipeline(source, output)
+    expected = add_affiliate_link_to_frame(strip_price_signs(pd.read_csv(source)))
+    pd.testing.assert_frame_equal(pd.read_csv(output, dtype=str), expected.astype(str))
+    # Written once, so "54" is not re-read as 54.0 between the steps
+    assert pd.read_csv(output, dtype=str)['price'].tolist()[::2] == ['54', '120.00']
+
+
+def test_unknown_stages_are_refused_before_anything_is_read(tmp_path):
+    with pytest.raises(ValueError, match='Unknown pipeline stages'):
+        run_pipeline(str(tmp_path / 'missing.csv'), str(tmp_path / 'out.csv'), ['remove_price_signs', 'nope'])
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from catalog_store import read_catalog_frame, write_catalog
+from data_cleaner import extract_price_column
+from prices import USD_RATES, format_prices, parse_prices
+from remove_price_signs import strip_price_signs
+from revolve_data_cleaner import clean_price_column
+
+
+def test_strip_price_signs_keeps_dollars_as_written_and_converts_other_currencies():
+    df = pd.DataFrame({'price': ['$54', '$54.00', '€45.99', 'C$20.00', '', 'ask in store', None]})
+    stripped = strip_price_signs(df)['price'].tolist()
+    assert stripped[:2] == ['54', '54.00']
+    assert stripped[2] == f"{round(4599 * USD_RATES['EUR']) / 100:.2f}"
+    assert stripped[3] == f"{round(2000 * USD_RATES['CAD']) / 100:.2f}"
+    assert stripped[4:6] == ['', 'ask in store']
+    assert pd.isna(stripped[6])
+
+
+def test_cleaners_show_every_currency_as_dollars():
+    prices = pd.Series(['$54', '$54.50', '€50', 'C$20', 'sold out'])
+    assert extract_price_column(prices.to_frame(), 0).tolist() == ['$54', '$54.50', '$54', '$14.60', '']
+    assert clean_price_column(prices).tolist() == ['$54.00', '$54.50', '$54.00', '$14.60', None]
+
+
+def test_parse_prices_reads_space_grouped_thousands_and_nordic_crowns():
+    parsed = parse_prices(pd.Series(['1 200 $', '1\u00a0299,00 €', 'kr 100', '100 KR', 'NOK 250', 'DKK 1 000', 'CHF 89.90']))
+    assert parsed['price_cents'].tolist() == [120000, 129900, 10000, 10000, 25000, 100000, 8990]
+    assert parsed['currency'].tolist() == ['USD', 'EUR', 'SEK', 'SEK', 'NOK', 'DKK', 'CHF']
+
+
+def test_catalog_prices_read_back_in_usd(tmp_path):
+    path = str(tmp_path / 'catalog.parquet')
+    write_catalog(pd.DataFrame({'url': ['a', 'b', 'c'], 'price': ['$70.00', '€45.99', None]}), path)
+    df = read_catalog_frame(path)
+    assert df['price'].tolist() == ['70.00', f"{round(4599 * USD_RATES['EUR']) / 100:.2f}", None]
+    assert list(df.columns) == ['url', 'price']
+
+
+def test_parse_prices_reads_a_leading_decimal_point():
+    parsed = parse_prices(pd.Series(['$.99', '.5', '$0.99']))
+    assert parsed['price_cents'].tolist() == [99, 50, 99]
+
+
+def test_zero_decimal_currencies_round_and_format_without_cents():
+    parsed = parse_prices(pd.Series(['¥1000', '¥1,000', '¥1.000', '¥1000.4', '₩12,500', '€1.299,00']))
+    assert parsed['price_cents'].tolist() == [100000, 100000, 100000, 100000, 1250000, 129900]
+    formatted = format_prices(parsed['price_cents'], parsed['currency'])
+    assert formatted.tolist() == ['¥1000', '¥1000', '¥1000', '¥1000', '₩12500', '€1299.00']
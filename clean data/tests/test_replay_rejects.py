@@ -0,0 +1,33 @@
+from catalog_loader import CatalogLoader, RejectFile
+from replay_rejects import replay_rejects
+
+
+def dead_letter(position, url, brand='brand'):
+    return {'table': 'products', 'mode': 'insert', 'source': 'catalog.csv', 'position': position,
+            'row': {'url': url, 'brand': brand, 'name': f'product {position}', 'price': '$10.00'}}
+
+
+def test_replay_keeps_url_variants_and_ignores_stale_scratch_rejects(standin, session_for, tmp_path):
+    server = standin()
+    dead_letters = RejectFile(str(tmp_path / 'rejects.jsonl'))
+    dead_letters.replace([
+        dead_letter(3, 'https://example.com/p/3'),
+        dead_letter(4, 'https://example.com/p/3?utm_source=mail'),
+        dead_letter(8, 'https://example.com/p/8', brand='b' * 300),
+        dead_letter(9, 'https://example.com/p/9'),
+    ])
+    scratch = RejectFile(str(tmp_path / 'rejects.jsonl.replay'))
+    # An interrupted replay left a reject behind
+    scratch.replace([{**dead_letter(0, 'https://example.com/p/0'), 'position': 0}])
+    loader = CatalogLoader(session_for(server), rejects=scratch, retries=0, verbose=False)
+
+    remaining = replay_rejects(loader, dead_letters)
+
+    assert sorted(row['url'] for row in server.table('products').rows.values()) == \
+        ['https://example.com/p/3', 'https://example.com/p/9']
+    assert {entry['position']: entry['replay_error'] for entry in remaining} == {
+        4: "url is a variant of https://example.com/p/3, which another dead letter replays",
+        8: "brand longer than 255 characters",
+    }
+    assert dead_letters.entries() == remaining
+    assert scratch.entries() == []
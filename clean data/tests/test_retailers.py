@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+import retailers
+from data_cleaner import extract_products, extract_products_rowwise, product_frame
+from retailers import find_retailer, register_retailer, retailer_names
+
+
+@pytest.fixture
+def registered():
+    """Register retailers for one test and take them out of the registry afterwards"""
+    names = []
+
+    def register(name, domains, **options):
+        names.append(name)
+        return register_retailer(name, domains, **options)
+
+    yield register
+    for name in names:
+        retailer = retailers.RETAILERS_BY_NAME.pop(name)
+        for domain in retailer.domains:
+            retailers.RETAILERS_BY_DOMAIN.pop(domain)
+    retailers.retailer_for_host.cache_clear()
+    retailers.canonical_url.cache_clear()
+
+
+def test_hosts_resolve_through_their_parent_domains():
+    assert find_retailer('https://shop.lululemon.com/p/women-leggings/Align/_/prod1?color=0001').name == 'Lululemon'
+    assert find_retailer('HTTPS://WWW.SKIMS.COM/products/cotton-rib-tank').name == 'Skims'
+    assert find_retailer('https://user@www.revolve.com:443/dp/LEVI-W1/').name == 'Revolve'
+    assert find_retailer('https://notskims.com/products/x') is None
+    assert find_retailer('not a url') is None
+    urls = pd.Series(['https://www.skims.com/a', 'https://example.com/b', 'https://shop.lululemon.com/c'])
+    assert retailer_names(urls).tolist() == ['Skims', 'Unknown', 'Lululemon']
+
+
+def test_a_registered_retailer_is_dispatched_by_both_extractors(registered):
+    def extract_row(row, url, retailer):
+        return {**product_frame(pd.Series([url])).iloc[0].to_dict(),
+                'name': row.iloc[retailer.columns['name']], 'source': retailer.name}
+
+    def extract_columns(rows, urls, retailer):
+        return product_frame(urls, name=rows.iloc[:, retailer.columns['name']], source=retailer.name)
+
+    registered('Aritzia', ['aritzia.com'], columns={'name': 1}, patterns={},
+               extract_row=extract_row, extract_columns=extract_columns)
+    df = pd.DataFrame([
+        ['https://www.aritzia.com/us/en/product/contour-tank/1', 'Contour Tank'],
+        ['https://example.com/p/2', 'Unknown Tank'],
+        ['https://www.aritzia.com/us/en/product/effortless-pant/3', 'Effortless Pant'],
+    ])
+    products = extract_products(df)
+    assert products['name'].tolist() == ['Contour Tank', 'Effortless Pant']
+    assert products['source'].tolist() == ['Aritzia', 'Aritzia']
+    pd.testing.assert_frame_equal(products.reset_index(drop=True), extract_products_rowwise(df))
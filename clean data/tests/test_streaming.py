@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from streaming import SeenKeys
+
+
+def test_seen_keys_drops_keys_of_earlier_chunks_only():
+    rng = np.random.default_rng(0)
+    seen, expected = SeenKeys(['brand', 'name']), set()
+    for size in [1, 7, 300, 50, 2000, 3, 900]:
+        chunk = pd.DataFrame({'brand': rng.integers(0, 3, size).astype(str), 'name': rng.integers(0, 400, size).astype(str)})
+        kept = seen.drop_seen(chunk)
+        keys = list(zip(chunk['brand'], chunk['name']))
+        assert list(zip(kept['brand'], kept['name'])) == [key for key in keys if key not in expected]
+        expected.update(keys)
+        assert len(seen) == len(expected)
+    # Runs stay few: one per set bit of the key count at most
+    assert len(seen.runs) <= len(expected).bit_length()
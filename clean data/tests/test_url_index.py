@@ -0,0 +1,84 @@
+import pandas as pd
+
+from catalog_loader import CatalogLoader, RestSession, prepare_frame
+from catalog_sync import sync_catalogs
+from data_cleaner import extract_products, extract_products_rowwise
+from url_index import UrlIndex
+
+SWATCHES = ['Select onyx swatch', 'Select heather-grey swatch', 'Select light-heather-grey swatch']
+
+
+def export(urls):
+    """Export rows as the scraper writes them: the url first, swatch labels further along"""
+    return pd.DataFrame([[url, None, *SWATCHES, 'COTTON', 'TANK'] + [None] * 8 + ['$48'] for url in urls])
+
+
+def test_skims_colourways_come_from_the_rows_swatches():
+    df = export([
+        'https://skims.com/products/cotton-rib-tank-light-heather-grey',
+        'https://skims.com/products/cotton-rib-tank-onyx',
+        'https://skims.com/products/fits-everybody-t-shirt-bra',
+    ])
+    products = extract_products(df)
+    assert products['name'].tolist() == ['Cotton Rib Tank', 'Cotton Rib Tank', 'Fits Everybody T Shirt Bra']
+    assert products['color'].tolist() == ['Light Heather Grey', 'Onyx', '']
+    pd.testing.assert_frame_equal(products.reset_index(drop=True), extract_products_rowwise(df))
+
+
+def test_colour_variants_collapse_under_a_real_url():
+    df = pd.DataFrame({
+        'url': ['https://skims.com/products/cotton-rib-tank-light-heather-grey',
+                'https://skims.com/products/cotton-rib-tank-onyx?utm_source=x',
+                'https://skims.com/products/fits-everybody-t-shirt-bra'],
+        'color': ['Light Heather Grey', 'Onyx', ''],
+    })
+    prepared = prepare_frame(df)
+    # The canonical slug without a colour is only a key; the link stays one that exists
+    assert prepared['url'].tolist() == ['https://skims.com/products/cotton-rib-tank-light-heather-grey',
+                                        'https://skims.com/products/fits-everybody-t-shirt-bra']
+
+
+def test_the_loader_keeps_the_first_real_url_across_runs(tmp_path):
+    path = str(tmp_path / 'url_index.csv')
+    session = RestSession('http://127.0.0.1:9', 'test-key')
+    first = pd.DataFrame({'url': ['https://skims.com/products/cotton-rib-tank-onyx'], 'color': ['Onyx']})
+    CatalogLoader(session, url_index=UrlIndex(path), verbose=False).prepare(first)
+
+    # A later run sees the same product under another colour and gets its id and url back
+    later = pd.DataFrame({'url': ['https://skims.com/products/cotton-rib-tank-clay'], 'color': ['Clay']})
+    prepared = CatalogLoader(session, url_index=UrlIndex(path), verbose=False).prepare(later)
+    assert prepared['url'].tolist() == ['https://skims.com/products/cotton-rib-tank-onyx']
+    index = UrlIndex(path)
+    assert index.get('https://skims.com/products/cotton-rib-tank') == 1
+    assert len(index) == 1
+
+
+def test_an_index_without_urls_is_rewritten_with_them(tmp_path):
+    path = str(tmp_path / 'url_index.csv')
+    pd.DataFrame({'canonical_url': ['https://skims.com/products/cotton-rib-tank'], 'product_id': [7]}).to_csv(
+        path, index=False)
+    index = UrlIndex(path)
+    df = pd.DataFrame({'url': ['https://skims.com/products/cotton-rib-tank-onyx', 'https://example.com/p/1'],
+                       'color': ['Onyx', '']})
+    assert prepare_frame(df, index)['url'].tolist() == df['url'].tolist()
+    index.save()
+    saved = pd.read_csv(path)
+    assert saved.to_dict('list') == {
+        'canonical_url': ['https://skims.com/products/cotton-rib-tank', 'https://example.com/p/1'],
+        'product_id': [7, 8],
+        'url': ['https://skims.com/products/cotton-rib-tank-onyx', 'https://example.com/p/1'],
+    }
+
+
+def test_a_dry_run_sync_plans_against_the_saved_index_without_writing_it(standin, session_for, tmp_path):
+    path, catalog = str(tmp_path / 'url_index.csv'), str(tmp_path / 'catalog.csv')
+    CatalogLoader(RestSession('http://127.0.0.1:9', 'test-key'), url_index=UrlIndex(path), verbose=False).prepare(
+        pd.DataFrame({'url': ['https://skims.com/products/cotton-rib-tank-onyx'], 'color': ['Onyx']}))
+    saved = open(path).read()
+
+    pd.DataFrame({'url': ['https://skims.com/products/cotton-rib-tank-clay', 'https://example.com/p/1'],
+                  'color': ['Clay', ''], 'price': '$10.00'}).to_csv(catalog, index=False)
+    loader = CatalogLoader(session_for(standin()), url_index=UrlIndex(path, read_only=True), mode='upsert', verbose=False)
+    plan = sync_catalogs(loader, [catalog], dry_run=True)
+    assert plan['insert']['url'].tolist() == ['https://skims.com/products/cotton-rib-tank-onyx', 'https://example.com/p/1']
+    assert open(path).read() == saved
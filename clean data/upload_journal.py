@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_JOURNAL_FILE = 'upload_journal.jsonl'
+FINGERPRINT_BLOCK = 1 << 20
+
+
+def file_fingerprint(path):
+    """Hash of a file's bytes, so a resumed load only trusts checkpoints taken on the same input"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(FINGERPRINT_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def position_runs(positions):
+    """Row positions as [start, end) runs of consecutive positions"""
+    if isinstance(positions, range):
+        return [[positions.start, positions.stop]] if len(positions) else []
+    positions = np.asarray(positions, dtype=np.int64)
+    if not len(positions):
+        return []
+    breaks = np.flatnonzero(np.diff(positions) != 1) + 1
+    starts = positions[np.r_[0, breaks]]
+    ends = positions[np.r_[breaks - 1, len(positions) - 1]] + 1
+    return np.column_stack([starts, ends]).tolist()
+
+
+class UploadJournal:
+    """
+    Append-only checkpoint log of an upload.
+
+    Every acknowledged batch appends the row ranges it covered, keyed by
+    the target table and the input file's fingerprint, and is flushed to
+    disk before the next batch counts as done. A resumed load replays the
+    log and sends only the rows no batch acknowledged. Rows the server
+    refused count as acknowledged: they are in the reject file. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def _append(self, entry):
+        line = json.dumps(entry) + '\n'
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def entries(self):
+        """Every complete entry in the journal; a line torn by a crash is skipped"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def state(self, key):
+        """(acknowledged runs, finished) recorded for a load key"""
+        runs, finished = [], False
+        for entry in self.entries():
+            if entry.get('key') != key:
+                continue
+            if entry['event'] == 'start' and not entry.get('resume'):
+                runs, finished = [], False
+            elif entry['event'] == 'ack':
+                runs.extend(entry['runs'])
+            elif entry['event'] == 'done':
+                finished = True
+        return runs, finished
+
+    def begin(self, key, source, rows, resume=False):
+        """
+        Record the start of a load and return a mask of the rows still to send.
+
+        Without `resume`, earlier checkpoints for the key are discarded and
+        every row is sent.
+        """
+        pending = np.ones(rows, dtype=bool)
+        if resume:
+            runs, finished = self.state(key)
+            if finished:
+                pending[:] = False
+            for start, end in runs:
+                pending[start:end] = False
+        self._append({'event': 'start', 'key': key, 'source': source, 'rows': rows, 'resume': resume})
+        return pending
+
+    def ack(self, key, positions):
+        self._append({'event': 'ack', 'key': key, 'runs': position_runs(positions)})
+
+    def finish(self, key):
+        self._append({'event': 'done', 'key': key})
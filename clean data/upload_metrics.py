@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+DEFAULT_METRICS_FILE = 'upload_metrics.prom'
+DEFAULT_SUMMARY_FILE = 'upload_summary.json'
+# Seconds between rewrites of the metrics textfile
+DEFAULT_INTERVAL = 15.0
+
+# Stages of an upload, in pipeline order; read and transform are timed per file, the rest per batch
+STAGES = ['read', 'transform', 'lookup', 'serialize', 'request', 'ack', 'batch']
+QUANTILES = [0.5, 0.95, 0.99]
+# Histogram bucket bounds in seconds, from a fast ack to a slow retried batch
+BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+PREFIX = 'catalog_upload'
+
+
+class UploadMetrics:
+    """
+    Stage timings, row counts and throughput of an upload.
+
+    Every timed call of a stage is kept, so p50/p95/p99 are exact rather
+    than estimated from buckets; a load makes one sample per batch, which
+    stays small. `start` rewrites a Prometheus textfile (for node_exporter's
+    textfile collector) every `interval` seconds until `stop`, and
+    `write_summary` leaves a JSON summary of the run. Safe to share between
+    threads.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.rows = Counter()
+        self.gauges = {}
+        self.started = time.time()
+        self.clock = time.perf_counter()
+        # Rows done and clock reading at the last textfile write, for the recent rate
+        self.window = (0, self.clock)
+        self.path = None
+        self.stopping = None
+        self.writer = None
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.samples[stage].append(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        """Time the body of a with block as one call of `stage`"""
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - began)
+
+    def count(self, outcome, rows):
+        """Add rows to an outcome: loaded, unchanged or failed"""
+        if rows:
+            with self.lock:
+                self.rows[outcome] += rows
+
+    def set(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def rows_done(self):
+        with self.lock:
+            return sum(self.rows.values())
+
+    def rows_per_second(self):
+        """Rows loaded, skipped or refused per second since the metrics were created"""
+        elapsed = time.perf_counter() - self.clock
+        return self.rows_done() / elapsed if elapsed > 0 else 0.0
+
+    def stage_stats(self):
+        """count, total, p50/p95/p99 and max seconds of every stage timed so far"""
+        with self.lock:
+            samples = {stage: np.array(values) for stage, values in self.samples.items()}
+        stats = {}
+        for stage in sorted(samples, key=lambda stage: STAGES.index(stage) if stage in STAGES else len(STAGES)):
+            values = samples[stage]
+            stats[stage] = {
+                'count': len(values),
+                'total': round(float(values.sum()), 6),
+                **{f"p{round(q * 100)}": round(float(np.quantile(values, q)), 6) for q in QUANTILES},
+                'max': round(float(values.max()), 6),
+            }
+        return stats
+
+    def prometheus(self):
+        """The metrics in the Prometheus text exposition format"""
+        table = f'table="{self.table}"'
+        with self.lock:
+            # Read and move the window in one step, so concurrent writes never share or skip an interval
+            now = time.perf_counter()
+            done, (window_rows, window_start) = sum(self.rows.values()), self.window
+            self.window = (done, now)
+            rows, gauges = dict(self.rows), dict(self.gauges)
+            samples = {stage: np.array(values) for stage, values in self.samples.items()}
+        recent = (done - window_rows) / (now - window_start) if now > window_start else 0.0
+
+        lines = [
+            f"# HELP {PREFIX}_rows_total Rows handled by the upload, by outcome.",
+            f"# TYPE {PREFIX}_rows_total counter",
+        ]
+        lines += [f'{PREFIX}_rows_total{{{table},outcome="{outcome}"}} {count}' for outcome, count in sorted(rows.items())]
+        lines += [
+            f"# HELP {PREFIX}_rows_per_second Rows per second since the upload started and since the last write.",
+            f"# TYPE {PREFIX}_rows_per_second gauge",
+            f'{PREFIX}_rows_per_second{{{table},window="run"}} {self.rows_per_second():.3f}',
+            f'{PREFIX}_rows_per_second{{{table},window="recent"}} {recent:.3f}',
+        ]
+        for name, value in sorted(gauges.items()):
+            lines += [f"# TYPE {PREFIX}_{name} gauge", f"{PREFIX}_{name}{{{table}}} {value}"]
+
+        lines += [
+            f"# HELP {PREFIX}_stage_seconds Seconds per call of each upload stage.",
+            f"# TYPE {PREFIX}_stage_seconds histogram",
+        ]
+        for stage, values in samples.items():
+            labels = f'{table},stage="{stage}"'
+            counts = np.searchsorted(np.sort(values), BUCKETS, side='right')
+            lines += [f'{PREFIX}_stage_seconds_bucket{{{labels},le="{bound}"}} {n}' for bound, n in zip(BUCKETS, counts)]
+            lines += [
+                f'{PREFIX}_stage_seconds_bucket{{{labels},le="+Inf"}} {len(values)}',
+                f"{PREFIX}_stage_seconds_sum{{{labels}}} {values.sum():.6f}",
+                f"{PREFIX}_stage_seconds_count{{{labels}}} {len(values)}",
+            ]
+        lines += [
+            f"# HELP {PREFIX}_stage_latency_seconds Quantiles of the seconds per call of each upload stage.",
+            f"# TYPE {PREFIX}_stage_latency_seconds summary",
+        ]
+        for stage, values in samples.items():
+            labels = f'{table},stage="{stage}"'
+            lines += [
+                f'{PREFIX}_stage_latency_seconds{{{labels},quantile="{q}"}} {np.quantile(values, q):.6f}'
+                for q in QUANTILES
+            ]
+            lines += [
+                f"{PREFIX}_stage_latency_seconds_sum{{{labels}}} {values.sum():.6f}",
+                f"{PREFIX}_stage_latency_seconds_count{{{labels}}} {len(values)}",
+            ]
+        lines += [
+            f"# TYPE {PREFIX}_last_update_timestamp_seconds gauge",
+            f"{PREFIX}_last_update_timestamp_seconds{{{table}}} {time.time():.3f}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Write the textfile through a rename, so the collector never reads half a file"""
+        scratch = f"{path}.tmp"
+        with open(scratch, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(scratch, path)
+
+    def start(self, path=DEFAULT_METRICS_FILE, interval=DEFAULT_INTERVAL):
+        """Rewrite the textfile every `interval` seconds from a background thread; returns self"""
+        self.path = path
+        self.stopping = threading.Event()
+
+        def run():
+            while not self.stopping.wait(interval):
+                self.write_textfile(path)
+
+        self.writer = threading.Thread(target=run, daemon=True)
+        self.writer.start()
+        return self
+
+    def stop(self):
+        """Stop the periodic writes and write the textfile a last time"""
+        if self.writer is None:
+            return
+        self.stopping.set()
+        self.writer.join()
+        self.writer = None
+        self.write_textfile(self.path)
+
+    def summary(self):
+        return {
+            'table': self.table,
+            'started': datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - self.clock, 3),
+            'rows': dict(self.rows),
+            'rows_per_second': round(self.rows_per_second(), 1),
+            **self.gauges,
+            'stages': self.stage_stats(),
+        }
+
+    def write_summary(self, path=DEFAULT_SUMMARY_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def report(self):
+        """Print rows/s and the latency quantiles of every stage"""
+        print(f"⏱️  {self.rows_per_second():.0f} rows/s")
+        for stage, stats in self.stage_stats().items():
+            print(f"   {stage:<9} ×{stats['count']:<5} total {stats['total']:.2f}s  "
+                  f"p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s  p99 {stats['p99']:.3f}s")
@@ -1,52 +1,26 @@
-import pandas as pd
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from catalog_loader import PRESETS, open_loader
+
+PRESET = PRESETS['products']
 
 def upload_to_supabase(csv_file, table_name="products"):
     """
     Upload cleaned CSV data to Supabase
     """
     try:
-        # Supabase configuration
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("❌ Error: Missing Supabase credentials!")
-            print("Please set SUPABASE_URL and SUPABASE_ANON_KEY environment variables")
+        loader = open_loader(PRESET['key_env'], table=table_name)
+        if loader is None:
             print("\nYou can create a .env file with:")
             print("SUPABASE_URL=your_supabase_url")
-            print("SUPABASE_ANON_KEY=your_supabase_anon_key")
+            print(f"{PRESET['key_env']}=your_supabase_anon_key")
             return False
         
-        # Initialize Supabase client
-        supabase: Client = create_client(supabase_url, supabase_key)
-        
-        # Read the CSV file
-        print(f"📖 Reading CSV file: {csv_file}")
-        df = pd.read_csv(csv_file)
-        
-        # Convert DataFrame to list of dictionaries
-        records = df.to_dict('records')
-        
-        print(f"📊 Found {len(records)} products to upload")
-        
-        # Upload data to Supabase
         print(f"🚀 Uploading to Supabase table: {table_name}")
+        successful_uploads = loader.load_file(csv_file)
         
-        # Insert data in batches to avoid timeout
-        batch_size = 10
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i + batch_size]
-            result = supabase.table(table_name).insert(batch).execute()
-            print(f"✅ Uploaded batch {i//batch_size + 1}/{(len(records) + batch_size - 1)//batch_size}")
-        
-        print(f"🎉 Successfully uploaded {len(records)} products to Supabase!")
-        return True
+        print(f"🎉 Successfully uploaded {successful_uploads}/{successful_uploads + loader.rows_failed} products to Supabase!")
+        return loader.rows_failed == 0
         
     except Exception as e:
         print(f"❌ Error uploading to Supabase: {e}")
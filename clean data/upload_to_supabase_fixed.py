@@ -1,92 +1,26 @@
-import pandas as pd
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-import json
 
-# Load environment variables
-load_dotenv()
+from catalog_loader import PRESETS, open_loader
 
-def clean_data_for_supabase(df):
-    """
-    Clean and prepare data for Supabase upload
-    """
-    # Create a copy of the dataframe
-    df_clean = df.copy()
-    
-    # Remove the 'id' column since Supabase will auto-generate it
-    if 'id' in df_clean.columns:
-        df_clean = df_clean.drop('id', axis=1)
-    
-    # Clean up text fields - remove newlines and extra spaces
-    text_columns = ['name', 'title', 'description']
-    for col in text_columns:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].astype(str).str.replace('\n', ' ').str.replace('\r', ' ').str.strip()
-    
-    # Convert empty strings to None for better database handling
-    df_clean = df_clean.replace('', None)
-    
-    return df_clean
+PRESET = PRESETS['products']
 
 def upload_to_supabase(csv_file, table_name="products"):
     """
     Upload cleaned CSV data to Supabase
     """
     try:
-        # Supabase configuration
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("❌ Error: Missing Supabase credentials!")
-            print("Please set SUPABASE_URL and SUPABASE_ANON_KEY environment variables")
+        loader = open_loader(PRESET['key_env'], table=table_name)
+        if loader is None:
+            print("\nYou can create a .env file with:")
+            print("SUPABASE_URL=your_supabase_url")
+            print(f"{PRESET['key_env']}=your_supabase_anon_key")
             return False
         
-        # Initialize Supabase client
-        supabase: Client = create_client(supabase_url, supabase_key)
-        
-        # Read the CSV file
-        print(f"📖 Reading CSV file: {csv_file}")
-        df = pd.read_csv(csv_file)
-        
-        # Clean the data for upload
-        print("🧹 Cleaning data for upload...")
-        df_clean = clean_data_for_supabase(df)
-        
-        # Convert DataFrame to list of dictionaries
-        records = df_clean.to_dict('records')
-        
-        print(f"📊 Found {len(records)} products to upload")
-        
-        # Upload data to Supabase
         print(f"🚀 Uploading to Supabase table: {table_name}")
+        successful_uploads = loader.load_file(csv_file)
         
-        # Insert data in batches to avoid timeout
-        batch_size = 5  # Smaller batch size for better reliability
-        successful_uploads = 0
-        
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i + batch_size]
-            try:
-                # Convert batch to JSON to validate
-                json_data = json.dumps(batch, default=str)
-                result = supabase.table(table_name).insert(batch).execute()
-                successful_uploads += len(batch)
-                print(f"✅ Uploaded batch {i//batch_size + 1}/{(len(records) + batch_size - 1)//batch_size} ({len(batch)} products)")
-            except Exception as batch_error:
-                print(f"❌ Error uploading batch {i//batch_size + 1}: {batch_error}")
-                # Try uploading one by one
-                for j, record in enumerate(batch):
-                    try:
-                        result = supabase.table(table_name).insert(record).execute()
-                        successful_uploads += 1
-                        print(f"  ✅ Uploaded product {i + j + 1}")
-                    except Exception as single_error:
-                        print(f"  ❌ Failed to upload product {i + j + 1}: {single_error}")
-        
-        print(f"🎉 Successfully uploaded {successful_uploads}/{len(records)} products to Supabase!")
-        return True
+        print(f"🎉 Successfully uploaded {successful_uploads}/{successful_uploads + loader.rows_failed} products to Supabase!")
+        return loader.rows_failed == 0
         
     except Exception as e:
         print(f"❌ Error uploading to Supabase: {e}")
@@ -0,0 +1,151 @@
+import argparse
+import os
+
+import pandas as pd
+
+import data_cleaner  # noqa: F401 - registers the retailers and their URL rules
+from retailers import canonical_urls
+
+DEFAULT_INDEX_FILE = "url_index.csv"
+INDEX_COLUMNS = ['canonical_url', 'product_id', 'url']
+
+
+class UrlIndex:
+    """
+    Persistent canonical URL -> product id index.
+
+    Kept as a CSV and loaded into dicts, so each lookup is O(1). Ids are
+    assigned in order of first sighting and never reused, so a product
+    keeps its id however many URL variants it is seen under. The index
+    also keeps the real URL each product was first seen under: canonical
+    URLs are only keys, and may not exist on the retailer's site (a Skims
+    slug without its colour). A `read_only` index loads the file but never
+    writes it back.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_FILE, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.ids = {}
+        self.urls = {}
+        self.new_entries = []
+        # Indexes written before the url column are rewritten whole on save
+        self.rewrite = False
+        if path and os.path.exists(path):
+            saved = pd.read_csv(path, dtype={'canonical_url': str, 'product_id': 'int64', 'url': str})
+            self.ids = dict(zip(saved['canonical_url'], saved['product_id'].tolist()))
+            if 'url' in saved.columns:
+                known = saved[saved['url'].notna()]
+                self.urls = dict(zip(known['canonical_url'], known['url']))
+            else:
+                self.rewrite = True
+        self.next_id = max(self.ids.values(), default=0) + 1
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, canonical_url):
+        return canonical_url in self.ids
+
+    def get(self, canonical_url):
+        return self.ids.get(canonical_url)
+
+    def product_id(self, canonical_url, url=None):
+        """Id of a canonical URL, assigning the next id if it is new; `url` is the real URL it was seen under"""
+        if url and canonical_url not in self.urls:
+            self.urls[canonical_url] = url
+        product_id = self.ids.get(canonical_url)
+        if product_id is None:
+            product_id = self.ids[canonical_url] = self.next_id
+            self.new_entries.append((canonical_url, product_id, self.urls.get(canonical_url)))
+            self.next_id += 1
+        return product_id
+
+    def product_ids(self, canonical, urls=None):
+        """Product id for every canonical URL in a column; `urls` are the real URLs of the same rows"""
+        known = canonical.notna().to_numpy()
+        seen = canonical[known]
+        first = {} if urls is None else pd.Series(urls.to_numpy()[known]).groupby(seen.to_numpy(), sort=False).first().to_dict()
+        ids = {url: self.product_id(url, first.get(url)) for url in seen.unique()}
+        return canonical.map(ids).astype('Int64')
+
+    def product_urls(self, canonical):
+        """The real URL every canonical URL in a column was first seen under, NaN where unknown"""
+        return canonical.map(self.urls)
+
+    def save(self):
+        """Append the ids assigned since the index was loaded"""
+        if not self.path or self.read_only:
+            return
+        if self.rewrite:
+            entries = [(canonical, product_id, self.urls.get(canonical)) for canonical, product_id in self.ids.items()]
+            pd.DataFrame(entries, columns=INDEX_COLUMNS).to_csv(self.path, index=False)
+            self.rewrite, self.new_entries = False, []
+            return
+        if not self.new_entries:
+            return
+        exists = os.path.exists(self.path)
+        pd.DataFrame(self.new_entries, columns=INDEX_COLUMNS).to_csv(
+            self.path, mode='a' if exists else 'w', header=not exists, index=False
+        )
+        self.new_entries = []
+
+
+def collapse_url_variants(df, index=None):
+    """
+    Keep one row per canonical product URL.
+
+    Canonical URLs only decide which rows are one product: the url column
+    keeps a real URL, the one the index first saw the product under, so
+    the same product has the same link in every run. When the frame has
+    an id column, ids come from the index so a product keeps the same id
+    across runs. A color column, when present, tells retailers that put
+    the colourway in the path (Skims) which suffix to drop. Without an
+    index, variants are only collapsed within the frame. Rows without a
+    url are kept as they are.
+    """
+    index = index if index is not None else UrlIndex(path=None)
+    canonical = canonical_urls(df['url'], df['color'] if 'color' in df.columns else None)
+    canonical = canonical.where(canonical != '')
+    ids = index.product_ids(canonical, df['url'])
+
+    keep = ids.isna() | ~ids.duplicated()
+    df = df[keep].copy()
+    first_seen = index.product_urls(canonical[keep])
+    df['url'] = first_seen.where(first_seen.notna(), df['url'])
+    if 'id' in df.columns:
+        df['id'] = ids[keep].where(ids[keep].notna(), df['id'])
+    return df
+
+
+def collapse_with_default_index(df):
+    """collapse_url_variants against the index file in the working directory"""
+    index = UrlIndex(DEFAULT_INDEX_FILE)
+    df = collapse_url_variants(df, index)
+    index.save()
+    return df
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collapse product URL variants using the canonical URL index.")
+    parser.add_argument("input_file", help="Cleaned catalog CSV.")
+    parser.add_argument("output_file", help="Where to write the catalog with one row per canonical URL.")
+    parser.add_argument(
+        "--index",
+        default=DEFAULT_INDEX_FILE,
+        help=f"Canonical URL -> product id and first URL index to read and extend (default: {DEFAULT_INDEX_FILE}).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    index = UrlIndex(args.index)
+    known = len(index)
+    df = pd.read_csv(args.input_file, dtype=str, keep_default_na=False)
+    collapsed = collapse_url_variants(df, index)
+    collapsed.to_csv(args.output_file, index=False)
+    index.save()
+    print(f"🔗 {len(df)} rows -> {len(collapsed)} canonical products "
+          f"({len(index) - known} new, {len(index)} in {args.index})")
+    print(f"✅ Saved to {args.output_file}")